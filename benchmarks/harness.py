@@ -0,0 +1,74 @@
+"""
+Shared timing helpers: latency percentiles and machine-readable results.
+"""
+
+import json
+import platform
+import time
+
+import cv2
+import numpy as np
+
+
+def summarize(latencies, items=None, elapsed=None):
+    """
+    Seconds per call → {"calls", "items", "throughput_per_sec", "mean_ms",
+    "p50_ms", "p95_ms", "p99_ms", "max_ms"}
+    """
+    latencies = np.asarray(latencies, dtype=np.float64)
+    if latencies.size == 0:
+        return {"calls": 0}
+
+    elapsed = float(latencies.sum()) if elapsed is None else elapsed
+    items = int(latencies.size) if items is None else items
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+
+    return {
+        "calls": int(latencies.size),
+        "items": items,
+        "throughput_per_sec": items / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": float(latencies.mean() * 1000),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(latencies.max() * 1000),
+    }
+
+
+def measure(fn, inputs, warmup=1):
+    """
+    Time fn(x) for every x in inputs (after `warmup` untimed calls).
+    Returns (summary, outputs).
+    """
+    inputs = list(inputs)
+    for x in inputs[:warmup]:
+        fn(x)
+
+    latencies, outputs = [], []
+    for x in inputs:
+        start = time.perf_counter()
+        outputs.append(fn(x))
+        latencies.append(time.perf_counter() - start)
+
+    return summarize(latencies), outputs
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def write_results(results, path=None):
+    """
+    Print the JSON document (last stdout line) and optionally save it
+    """
+    document = json.dumps(results, indent=2 if path else None, default=str)
+    if path:
+        with open(path, "w") as f:
+            f.write(document)
+    print(json.dumps(results, default=str))
@@ -0,0 +1,92 @@
+# RUN WITH:
+# python -m benchmarks.motion_engines --frames 300 --size 1080 1920
+# python -m benchmarks.motion_engines --engines diff mog2 --scales 0.25 0.5 --output motion.json
+
+"""
+CPU cost per motion engine (modules/motion_detection/engines.py) and
+processing scale, on a synthetic scene with ground truth.
+
+Per configuration: wall latency percentiles, CPU ms per frame (process
+time, so it also counts OpenCV worker threads), the processing grid, and
+how well the gate agrees with the scene: event frames flagged (recall) and
+quiet frames flagged (false alarms) at the given threshold.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.harness import environment, summarize, write_results
+from benchmarks.synthetic import SyntheticScene
+from core.config import settings
+from modules.motion_detection.engines import ENGINES, create_engine
+
+SCALES = (1.0, 0.5, 0.25)
+THRESHOLD = settings.motion.threshold   # moving fraction of the frame area, as the live gate
+WARMUP = 25         # frames the background model gets before scoring
+
+
+def bench_engine(name, scale, frames, truths, threshold=THRESHOLD):
+    engine = create_engine(name, scale)
+
+    latencies, flags = [], []
+    grid = None
+    cpu_start = time.process_time()
+    for frame in frames:
+        start = time.perf_counter()
+        fg_mask, fraction = engine.apply(frame)
+        latencies.append(time.perf_counter() - start)
+        flags.append(fraction > threshold)
+        grid = fg_mask.shape
+    cpu = time.process_time() - cpu_start
+
+    summary = summarize(latencies)
+    summary["cpu_ms_per_frame"] = cpu * 1000 / len(frames)
+    summary["grid"] = list(grid)
+
+    scored = range(WARMUP, len(frames))
+    events = [i for i in scored if truths[i]]
+    quiet = [i for i in scored if not truths[i]]
+    summary["recall"] = float(np.mean([flags[i] for i in events])) if events else None
+    summary["false_alarm_rate"] = float(np.mean([flags[i] for i in quiet])) if quiet else None
+    return summary
+
+
+def run(frames, truths, engines=tuple(ENGINES), scales=SCALES, threshold=THRESHOLD):
+    results = {}
+    for name in engines:
+        for scale in scales:
+            key = f"{name}@{scale:g}"
+            results[key] = summary = bench_engine(name, scale, frames, truths, threshold)
+            print(f"{key:>10}  grid {summary['grid'][1]:>4}x{summary['grid'][0]:<4}  "
+                  f"cpu {summary['cpu_ms_per_frame']:7.2f} ms/frame  "
+                  f"p95 {summary['p95_ms']:7.2f} ms  recall {summary['recall']}  "
+                  f"false alarms {summary['false_alarm_rate']}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU cost per motion engine and scale")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", type=int, nargs=2, default=[1080, 1920], metavar=("H", "W"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=sorted(ENGINES))
+    parser.add_argument("--scales", type=float, nargs="+", default=list(SCALES))
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--output", default=None, help="also write the JSON document here")
+    args = parser.parse_args()
+
+    frames, truths = SyntheticScene(tuple(args.size), args.seed).generate(args.frames)
+
+    write_results({
+        "benchmark": "motion_engines",
+        "input": {"frames": len(frames), "size": args.size, "seed": args.seed,
+                  "threshold": args.threshold},
+        "environment": environment(),
+        "engines": run(frames, truths, args.engines, args.scales, args.threshold),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
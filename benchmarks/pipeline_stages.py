@@ -0,0 +1,215 @@
+# RUN WITH:
+# python -m benchmarks.pipeline_stages --frames 600 --size 720 1280 --output bench.json
+# python -m benchmarks.pipeline_stages --clip demo_videos/sample.mp4 --stages motion roi
+
+"""
+Per-stage benchmark, headless (no camera, no windows).
+
+Each stage reports throughput and p50/p95/p99 latency. Model stages whose
+weights or dependencies are not available on this machine are reported as
+{"skipped": reason} instead of failing the run, so the JSON document has
+the same shape on every box and can be diffed between releases.
+"""
+
+import argparse
+import time
+
+from benchmarks.harness import environment, measure, summarize, write_results
+from benchmarks.synthetic import FPS, ReplayStream, SyntheticScene, load_clip, truth_crops
+from modules.utils.frame_crop import FrameCrop
+
+STAGES = ("motion_probe", "motion", "roi", "objects", "faces", "recognition", "end_to_end")
+EVENT_CHUNK = 30   # frames per offline extract_big_roi call
+
+
+def bench_motion_probe(frames):
+    from modules.visualization.motion_probe import MotionProbe
+
+    probe = MotionProbe()
+    summary, _ = measure(probe.detect, frames, warmup=0)
+    return summary
+
+
+def bench_motion(frames):
+    """
+    run_motion_detection's monitor (MotionMonitor.wait_for_event) over a
+    replayed stream: per-frame latency + per-event ROI counts
+    """
+    from modules.motion_detection.motion_detector import MotionMonitor
+
+    stream = ReplayStream(frames)
+    monitor = MotionMonitor(stream, camera_id="bench", show=False)
+
+    events, rois = [], []
+    start = time.perf_counter()
+    while not stream.ended:
+        event_start = time.perf_counter()
+        crops = monitor.wait_for_event(save_rois=False)
+        if crops:
+            events.append(time.perf_counter() - event_start)
+            rois += crops
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(stream.read_gaps, items=monitor.frames_seen, elapsed=elapsed)
+    summary["events"] = len(events)
+    summary["rois"] = len(rois)
+    return summary, rois
+
+
+def bench_roi(frames):
+    from modules.motion_detection.motion_detector import extract_big_roi
+
+    chunks = [frames[i:i + EVENT_CHUNK] for i in range(0, len(frames), EVENT_CHUNK)]
+    summary, outputs = measure(
+        lambda chunk: extract_big_roi(chunk, save_to_disk=False), chunks, warmup=0
+    )
+    summary["items"] = len(frames)
+    summary["throughput_per_sec"] = len(frames) / (summary["mean_ms"] * summary["calls"] / 1000)
+    summary["rois"] = sum(len(o) for o in outputs)
+    summary["unit"] = f"{EVENT_CHUNK}-frame chunk"
+    return summary
+
+
+def bench_objects(rois, batch_size):
+    from modules.object_detection.yolo_detector import run_object_detection
+
+    batches = [rois[i:i + batch_size] for i in range(0, len(rois), batch_size)]
+    summary, outputs = measure(
+        lambda batch: run_object_detection(batch, save_to_disk=False, batch_size=batch_size),
+        batches
+    )
+    summary["items"] = len(rois)
+    summary["persons"] = sum(len(o["persons"]) for o in outputs)
+    return summary, [p for o in outputs for p in o["persons"]]
+
+
+def bench_faces(crops, batch_size):
+    from modules.face_detection.face_detector import detect_and_extract_faces
+
+    batches = [crops[i:i + batch_size] for i in range(0, len(crops), batch_size)]
+    summary, outputs = measure(
+        lambda batch: detect_and_extract_faces(batch, save_to_disk=False, batch_size=batch_size),
+        batches
+    )
+    summary["items"] = len(crops)
+    summary["faces"] = sum(len(o) for o in outputs)
+    return summary, [f for o in outputs for f in o]
+
+
+def bench_recognition(faces, batch_size):
+    from modules.face_recognition.face_recognizer import initialize_face_database, recognize_faces
+
+    initialize_face_database()
+    batches = [faces[i:i + batch_size] for i in range(0, len(faces), batch_size)]
+    summary, _ = measure(recognize_faces, batches)
+    summary["items"] = len(faces)
+    return summary
+
+
+def bench_end_to_end(frames):
+    """
+    Motion trigger → ROIs → objects → faces → recognition, per event
+    """
+    from modules.motion_detection.motion_detector import MotionMonitor
+    from modules.pipeline.multi_camera import analyse_crops
+
+    stream = ReplayStream(frames)
+    monitor = MotionMonitor(stream, camera_id="bench", show=False)
+
+    latencies = []
+    start = time.perf_counter()
+    while not stream.ended:
+        event_start = time.perf_counter()
+        crops = monitor.wait_for_event(save_rois=False)
+        if crops:
+            analyse_crops(crops)
+            latencies.append(time.perf_counter() - event_start)
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(latencies, items=monitor.frames_seen, elapsed=elapsed)
+    summary["unit"] = "event"
+    return summary
+
+
+def _run(results, name, fn, *args):
+    """
+    Run one stage; unavailable models / deps are recorded, not fatal
+    """
+    try:
+        output = fn(*args)
+    except Exception as e:
+        results[name] = {"skipped": f"{type(e).__name__}: {e}"}
+        print(f"{name:>14}  skipped ({type(e).__name__}: {e})")
+        return None
+
+    summary, extra = output if isinstance(output, tuple) else (output, None)
+    results[name] = summary
+    if summary.get("calls"):
+        print(f"{name:>14}  {summary['throughput_per_sec']:9.1f} items/s  "
+              f"p50 {summary['p50_ms']:7.2f} ms  p95 {summary['p95_ms']:7.2f} ms  "
+              f"p99 {summary['p99_ms']:7.2f} ms")
+    else:
+        print(f"{name:>14}  no input")
+    return extra
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage pipeline latency / throughput")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--size", type=int, nargs=2, default=[720, 1280], metavar=("H", "W"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--assets", default=None, help="person crops to paste into the scene")
+    parser.add_argument("--clip", default=None, help="replay a local clip instead")
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=STAGES)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--output", default=None, help="also write the JSON document here")
+    args = parser.parse_args()
+
+    size = tuple(args.size)
+    if args.clip:
+        frames, truths = load_clip(args.clip, args.frames, size), None
+    else:
+        frames, truths = SyntheticScene(size, args.seed, assets_dir=args.assets).generate(args.frames)
+
+    stages = {}
+    results = {
+        "benchmark": "pipeline_stages",
+        "input": {"frames": len(frames), "size": list(frames[0].shape[:2]), "fps": FPS,
+                  "clip": args.clip, "seed": args.seed},
+        "environment": environment(),
+        "stages": stages,
+    }
+
+    rois, persons, faces = [], [], []
+
+    if "motion_probe" in args.stages:
+        _run(stages, "motion_probe", bench_motion_probe, frames)
+    if "motion" in args.stages:
+        rois = _run(stages, "motion", bench_motion, frames) or []
+    if "roi" in args.stages:
+        _run(stages, "roi", bench_roi, frames)
+
+    if not rois:
+        # No motion stage run: whole frames stand in for ROIs
+        rois = [FrameCrop(f, i + 1, (0, 0, f.shape[1], f.shape[0]))
+                for i, f in enumerate(frames[::EVENT_CHUNK])]
+
+    if "objects" in args.stages:
+        persons = _run(stages, "objects", bench_objects, rois, args.batch_size) or []
+    if "faces" in args.stages:
+        # Synthetic persons rarely pass the YOLO threshold: use ground truth then
+        if not persons and truths is not None:
+            persons = truth_crops(frames, truths, "person")[::5]
+        faces = _run(stages, "faces", bench_faces, persons or rois, args.batch_size) or []
+    if "recognition" in args.stages:
+        if not faces and truths is not None:
+            faces = truth_crops(frames, truths, "face")[::5]
+        _run(stages, "recognition", bench_recognition, faces, args.batch_size)
+    if "end_to_end" in args.stages:
+        _run(stages, "end_to_end", bench_end_to_end, frames)
+
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Synthetic scenes for headless benchmarks: static textured background,
+moving blobs and pasted person / face crops, with ground-truth boxes.
+"""
+
+import os
+import time
+
+import cv2
+import numpy as np
+
+from modules.utils.frame_crop import FrameCrop, load_crops
+
+# ================= CONFIG =================
+FRAME_SIZE = (720, 1280)   # (h, w)
+FPS = 15
+
+
+class SyntheticScene:
+    """
+    Mostly static scene with quiet stretches and intrusion events:
+    random blobs and "persons" (pasted crops from assets_dir, or drawn
+    torso + head) crossing the frame. frames() yields
+    (frame, [("person" | "face" | "blob", (x1, y1, x2, y2)), ...]).
+    """
+
+    def __init__(self, size=FRAME_SIZE, seed=0, blobs=2, persons=1, assets_dir=None,
+                 quiet_frames=60, event_frames=90):
+        self.h, self.w = size
+        self.rng = np.random.default_rng(seed)
+        self.blobs = blobs
+        self.persons = persons
+        self.quiet_frames = quiet_frames
+        self.event_frames = event_frames
+
+        noise = self.rng.integers(0, 40, (self.h // 8, self.w // 8, 3), dtype=np.uint8)
+        texture = cv2.resize(noise, (self.w, self.h), interpolation=cv2.INTER_LINEAR)
+        ground = np.linspace(60, 140, self.h, dtype=np.uint8)[:, None, None]
+        self.background = cv2.add(texture, np.broadcast_to(ground, texture.shape).copy())
+
+        self.assets = []
+        if assets_dir and os.path.isdir(assets_dir):
+            self.assets = [crop.image for crop in load_crops(assets_dir)]
+
+    # ---------------- ACTORS ----------------
+    def _person_sprite(self, height):
+        if self.assets:
+            image = self.assets[int(self.rng.integers(len(self.assets)))]
+            scale = height / image.shape[0]
+            return cv2.resize(image, (max(int(image.shape[1] * scale), 1), height))
+
+        width = max(height // 3, 8)
+        sprite = np.zeros((height, width, 3), dtype=np.uint8)
+        sprite[:] = self.background[0, 0]
+        head = max(height // 7, 4)
+        cv2.rectangle(sprite, (width // 6, head * 2), (width - width // 6, height - 1),
+                      tuple(int(c) for c in self.rng.integers(20, 200, 3)), -1)
+        cv2.ellipse(sprite, (width // 2, head), (head * 2 // 3, head), 0, 0, 360,
+                    (120, 160, 210), -1)
+        return sprite
+
+    def _new_actors(self):
+        actors = []
+        for _ in range(self.persons):
+            height = int(self.rng.integers(self.h // 5, self.h // 2))
+            sprite = self._person_sprite(height)
+            actors.append({
+                "kind": "person", "sprite": sprite,
+                "x": float(self.rng.integers(0, self.w // 4)),
+                "y": float(self.rng.integers(self.h // 3, self.h - height)),
+                "vx": float(self.rng.uniform(4, 12)), "vy": float(self.rng.uniform(-1, 1))
+            })
+        for _ in range(self.blobs):
+            radius = int(self.rng.integers(20, 60))
+            actors.append({
+                "kind": "blob", "radius": radius,
+                "color": tuple(int(c) for c in self.rng.integers(0, 255, 3)),
+                "x": float(self.rng.integers(radius, self.w - radius)),
+                "y": float(self.rng.integers(radius, self.h - radius)),
+                "vx": float(self.rng.uniform(-10, 10)), "vy": float(self.rng.uniform(-6, 6))
+            })
+        return actors
+
+    def _draw(self, frame, actor):
+        x, y = int(actor["x"]), int(actor["y"])
+
+        if actor["kind"] == "blob":
+            r = actor["radius"]
+            cv2.circle(frame, (x, y), r, actor["color"], -1)
+            return [("blob", (x - r, y - r, x + r, y + r))]
+
+        sprite = actor["sprite"]
+        sh, sw = sprite.shape[:2]
+        x1, y1 = max(x, 0), max(y, 0)
+        x2, y2 = min(x + sw, self.w), min(y + sh, self.h)
+        if x2 <= x1 or y2 <= y1:
+            return []
+
+        frame[y1:y2, x1:x2] = sprite[y1 - y:y2 - y, x1 - x:x2 - x]
+        head = max(sh // 7, 4)
+        face = (x + sw // 2 - head, y, x + sw // 2 + head, y + head * 2)
+        return [("person", (x1, y1, x2, y2)), ("face", face)]
+
+    # ---------------- FRAMES ----------------
+    def frames(self, n_frames):
+        actors = []
+        for index in range(n_frames):
+            phase = index % (self.quiet_frames + self.event_frames)
+            if phase == self.quiet_frames:
+                actors = self._new_actors()
+            elif phase == 0:
+                actors = []
+
+            frame = self.background.copy()
+            # Sensor noise, so the background model has something to ignore
+            frame = cv2.add(frame, self.rng.integers(0, 4, frame.shape, dtype=np.uint8))
+
+            truth = []
+            for actor in actors:
+                truth += self._draw(frame, actor)
+                actor["x"] += actor["vx"]
+                actor["y"] += actor["vy"]
+
+            yield frame, truth
+
+    def generate(self, n_frames):
+        frames, truths = [], []
+        for frame, truth in self.frames(n_frames):
+            frames.append(frame)
+            truths.append(truth)
+        return frames, truths
+
+
+def truth_crops(frames, truths, kind):
+    """
+    Ground-truth crops of one kind as FrameCrop (e.g. faces for recognize_faces)
+    """
+    crops = []
+    for frame_id, (frame, truth) in enumerate(zip(frames, truths), start=1):
+        full = FrameCrop(frame, frame_id, (0, 0, frame.shape[1], frame.shape[0]))
+        for label, (x1, y1, x2, y2) in truth:
+            if label == kind:
+                crop = full.sub_crop(x1, y1, x2, y2, label=label)
+                if crop.image.size:
+                    crops.append(crop)
+    return crops
+
+
+def load_clip(path, max_frames=None, size=None):
+    """
+    Replay a local clip instead of a synthetic scene
+    """
+    cap = cv2.VideoCapture(path)
+    frames = []
+    try:
+        while cap.isOpened() and (max_frames is None or len(frames) < max_frames):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if size is not None:
+                frame = cv2.resize(frame, (size[1], size[0]))
+            frames.append(frame)
+    finally:
+        cap.release()
+
+    if not frames:
+        raise RuntimeError(f"❌ No frames read from {path}")
+    return frames
+
+
+class ReplayStream:
+    """
+    CameraStream stand-in serving in-memory frames as fast as the consumer
+    reads them. Records the time between reads, i.e. the consumer's
+    per-frame processing latency.
+    """
+
+    def __init__(self, frames, fps=FPS):
+        self.entries = [(i + 1, i / fps, frame) for i, frame in enumerate(frames)]
+        self.fps = fps
+        self.height, self.width = frames[0].shape[:2]
+        self.ended = False
+        self.read_gaps = []
+        self._last_read = None
+
+    def read(self, after_id=0, timeout=1.0):
+        now = time.perf_counter()
+        if self._last_read is not None:
+            self.read_gaps.append(now - self._last_read)
+        self._last_read = now
+
+        if after_id < len(self.entries):
+            return self.entries[after_id]
+        self.ended = True
+        return None
+
+    def latest(self):
+        return self.entries[-1] if self.entries else None
+
+    def window(self, start, end=None):
+        end = self.entries[-1][1] if end is None else end
+        return [e for e in self.entries if start <= e[1] <= end]
+
+    def start(self):
+        return self
+
+    def stop(self):
+        self.ended = True
@@ -0,0 +1,74 @@
+# RUN WITH:
+# python -m benchmarks.yolo_batching --crops 100 --batch-sizes 1 4 8 16
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from core.config import settings
+from core.model_registry import get_yolo
+from modules.object_detection.batch_inference import INPUT_SIZE, detect_batched
+
+YOLO_WEIGHTS = settings.detection.yolo_weights   # the model the pipeline runs
+
+
+def make_crops(n, seed=0):
+    """
+    ROI-like crops: random sizes/aspect ratios, noisy content
+    """
+    rng = np.random.default_rng(seed)
+    crops = []
+    for _ in range(n):
+        h = int(rng.integers(120, 480))
+        w = int(rng.integers(80, 640))
+        crops.append(rng.integers(0, 255, (h, w, 3), dtype=np.uint8))
+    return crops
+
+
+def per_image_loop(model, crops):
+    """
+    The pre-batching run_object_detection loop: one model(img) call per ROI
+    """
+    for img in crops:
+        model(img, verbose=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-image vs batched YOLO over ROI crops")
+    parser.add_argument("--weights", default=YOLO_WEIGHTS)
+    parser.add_argument("--crops", type=int, default=100)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--imgsz", type=int, default=INPUT_SIZE)
+    args = parser.parse_args()
+
+    model = get_yolo(args.weights)   # loaded + warmed once
+    crops = make_crops(args.crops)
+
+    results = []
+
+    start = time.perf_counter()
+    per_image_loop(model, crops)
+    elapsed = time.perf_counter() - start
+    results.append({"mode": "per_image", "batch_size": 1,
+                    "seconds": elapsed, "crops_per_sec": len(crops) / elapsed})
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        detect_batched(model, crops, batch_size=batch_size, imgsz=args.imgsz)
+        elapsed = time.perf_counter() - start
+        results.append({"mode": "batched", "batch_size": batch_size,
+                        "seconds": elapsed, "crops_per_sec": len(crops) / elapsed})
+
+    baseline = results[0]["crops_per_sec"]
+    for r in results:
+        r["speedup"] = r["crops_per_sec"] / baseline
+        print(f"{r['mode']:>10} bs={r['batch_size']:<3} "
+              f"{r['crops_per_sec']:8.1f} crops/s  x{r['speedup']:.2f}")
+
+    print(json.dumps({"benchmark": "yolo_batching", "crops": len(crops), "results": results}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+import os
+import sys
+import copy
+import dataclasses
+from dataclasses import dataclass, field
+from typing import List, Optional, Union, get_args, get_origin, get_type_hints
+
+import yaml
+
+from core.logger import logger
+
+# ================= CONFIG FILES =================
+CONFIG_DIR = os.environ.get("BORDERSECURITY_CONFIG_DIR", "config")
+SETTINGS_FILE = "settings.yaml"
+PATHS_FILE = "paths.yaml"
+PROFILE_ENV = "BORDERSECURITY_PROFILE"   # overrides `profile:` in settings.yaml
+DEFAULT_PROFILE = "balanced"
+MOTION_ENGINES = ("mog2", "knn", "diff")   # modules/motion_detection/engines.py
+DNN_BACKENDS = ("default", "opencv", "cuda", "inference_engine")   # core/model_registry.py
+DNN_TARGETS = ("cpu", "opencl", "opencl_fp16", "cuda", "cuda_fp16")
+
+
+class ConfigError(ValueError):
+    """
+    Invalid settings.yaml / paths.yaml content
+    """
+
+
+# ================= SECTIONS =================
+@dataclass
+class CaptureConfig:
+    sources: List[Union[int, str]] = field(default_factory=lambda: [0])
+    width: Optional[int] = None          # requested capture resolution (live cameras)
+    height: Optional[int] = None
+    buffer_seconds: float = 10.0
+    reconnect_delay: float = 1.0
+
+
+@dataclass
+class MotionConfig:
+    engine: str = "mog2"                 # mog2 | knn | diff (see motion_detection/engines.py)
+    threshold: float = 0.015             # moving fraction of the frame area
+    process_scale: float = 1.0           # MOG2 runs on frames downscaled by this
+    frame_skip: int = 1                  # analyse every Nth frame
+    bg_warmup_frames: int = 25
+    record_seconds: float = 5.0
+    pre_roll_seconds: float = 2.0
+    archive_clips: bool = False
+    select_keyframes: bool = True
+    roi_min_area: int = 3000
+    roi_padding: int = 10
+    roi_mask_scale: float = 0.25
+    zone_gating: bool = False            # only detect motion inside the zones.json polygons
+    adaptive: bool = False               # duty-cycle the loop while the scene is quiet
+    idle_frame_skip: int = 6             # quiet: analyse every Nth frame ...
+    idle_scale: float = 0.25             # ... on frames downscaled by this
+    idle_after_frames: int = 50          # quiet analysed frames before going idle
+    wake_ratio: float = 0.3              # wake at this fraction of threshold
+
+
+@dataclass
+class DetectionConfig:
+    yolo_weights: str = "yolov8n.pt"     # model variant
+    conf_threshold: float = 0.85
+    input_size: int = 640
+    batch_size: int = 8
+    detect_every: int = 3                # dashboard: YOLO every Nth frame
+
+
+@dataclass
+class FaceConfig:
+    detection_confidence: float = 0.5
+    upper_body_fraction: float = 0.5     # faces are searched in the top part of person boxes
+    ssd_input_size: int = 300
+    ssd_batch_size: int = 16             # person regions per SSD forward
+    dnn_backend: str = "default"         # default | opencv | cuda | inference_engine
+    dnn_target: str = "cpu"              # cpu | opencl | opencl_fp16 | cuda | cuda_fp16
+    recognition_threshold: float = 0.75
+    model_name: str = "Facenet"
+    embed_batch_size: int = 32
+    align_faces: bool = False
+    top_k: int = 3
+
+
+@dataclass
+class DecisionConfig:
+    min_frames: int = 3                  # detections of a track before it can be confirmed
+    min_dwell_seconds: float = 0.5       # time inside a zone before confirmation
+    min_zone_overlap: float = 0.2        # box fraction inside a zone to count as in it
+    track_timeout: float = 2.0           # seconds unseen before a track's state is dropped
+    face_interval: float = 1.0           # seconds between face passes on one track
+    face_attempts: int = 3               # recognised faces before an unknown face is final
+
+
+@dataclass
+class EvidenceConfig:
+    merge_gap_seconds: float = 5.0       # re-triggers within this gap extend the same clip
+    max_gb: float = 5.0                  # disk quota for the evidence directory
+    max_age_days: float = 30             # older sessions are deleted
+
+
+@dataclass
+class RuntimeConfig:
+    headless: bool = False               # no cv2.imshow windows
+    threads: int = 0                     # OpenCV (face SSD included) / BLAS threads, 0 = library default
+    in_memory_pipeline: bool = True
+    concurrent_pipeline: bool = True
+    scheduler_batch_size: int = 8
+    queue_size: int = 4
+    metrics_host: str = "127.0.0.1"     # 0.0.0.0 exposes /metrics to the network
+    metrics_port: int = 9108
+
+
+@dataclass
+class PathsConfig:
+    video_dir: str = "data/raw/chunks"
+    roi_dir: str = "data/processed/roi"
+    detection_dir: str = "data/processed/detection"
+    faces_dir: str = "data/processed/faces"
+    face_database_dir: str = "data/face_database"
+    embedding_cache_dir: str = "data/cache/embeddings"
+    face_proto: str = "models/face_detection/deploy.prototxt"
+    face_model: str = "models/face_detection/res10_300x300_ssd.caffemodel"
+    evidence_dir: str = "evidence"
+    log_dir: str = "logs"
+    demo_videos_dir: str = "demo_videos"
+
+
+@dataclass
+class Settings:
+    profile: str = DEFAULT_PROFILE
+    capture: CaptureConfig = field(default_factory=CaptureConfig)
+    motion: MotionConfig = field(default_factory=MotionConfig)
+    detection: DetectionConfig = field(default_factory=DetectionConfig)
+    face: FaceConfig = field(default_factory=FaceConfig)
+    decision: DecisionConfig = field(default_factory=DecisionConfig)
+    evidence: EvidenceConfig = field(default_factory=EvidenceConfig)
+    runtime: RuntimeConfig = field(default_factory=RuntimeConfig)
+    paths: PathsConfig = field(default_factory=PathsConfig)
+
+
+# ================= PROFILES =================
+# Applied on top of the defaults; explicit values in settings.yaml win.
+PROFILES = {
+    "low_power": {
+        "capture": {"width": 640, "height": 360},
+        "motion": {"engine": "diff", "process_scale": 0.5, "frame_skip": 2, "adaptive": True},
+        "detection": {"yolo_weights": "yolov8n.pt", "input_size": 416,
+                      "batch_size": 4, "detect_every": 5},
+        "face": {"embed_batch_size": 8},
+        "runtime": {"headless": True, "threads": 2, "scheduler_batch_size": 4},
+    },
+    "balanced": {},   # the defaults above
+    "high_accuracy": {
+        "capture": {"width": 1920, "height": 1080},
+        "motion": {"process_scale": 1.0, "frame_skip": 1},
+        "detection": {"yolo_weights": "yolov8s.pt", "input_size": 960,
+                      "batch_size": 8, "detect_every": 1},
+        "face": {"align_faces": True, "embed_batch_size": 32},
+        "decision": {"min_frames": 5},
+        "runtime": {"threads": 0, "scheduler_batch_size": 16},
+    },
+}
+
+
+# ================= VALIDATION =================
+def _coerce(value, annotation, where):
+    origin = get_origin(annotation)
+
+    if origin is Union:
+        options = get_args(annotation)
+        if value is None and type(None) in options:
+            return None
+        for option in options:
+            if option is type(None):
+                continue
+            try:
+                return _coerce(value, option, where)
+            except ConfigError:
+                continue
+        raise ConfigError(f"{where}: {value!r} is not a valid {annotation}")
+
+    if origin in (list, List):
+        if not isinstance(value, list):
+            raise ConfigError(f"{where}: expected a list, got {value!r}")
+        (item_type,) = get_args(annotation)
+        return [_coerce(v, item_type, f"{where}[{i}]") for i, v in enumerate(value)]
+
+    if annotation is bool:
+        if isinstance(value, bool):
+            return value
+        raise ConfigError(f"{where}: expected true/false, got {value!r}")
+
+    if annotation in (int, float):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ConfigError(f"{where}: expected a number, got {value!r}")
+        if annotation is int and float(value) != int(value):
+            raise ConfigError(f"{where}: expected an integer, got {value!r}")
+        return annotation(value)
+
+    if annotation is str:
+        if not isinstance(value, (str, int)):
+            raise ConfigError(f"{where}: expected a string, got {value!r}")
+        return str(value)
+
+    return value
+
+
+def _apply(section, values, where):
+    if not isinstance(values, dict):
+        raise ConfigError(f"{where}: expected a mapping, got {values!r}")
+
+    hints = get_type_hints(type(section))
+    known = {f.name for f in dataclasses.fields(section)}
+
+    for key, value in values.items():
+        if key not in known:
+            raise ConfigError(f"{where}.{key}: unknown setting (known: {sorted(known)})")
+
+        current = getattr(section, key)
+        if dataclasses.is_dataclass(current):
+            _apply(current, value, f"{where}.{key}")
+        else:
+            setattr(section, key, _coerce(value, hints[key], f"{where}.{key}"))
+
+
+def _check(condition, message):
+    if not condition:
+        raise ConfigError(message)
+
+
+def validate(settings):
+    m, d, f, r, c = settings.motion, settings.detection, settings.face, settings.runtime, settings.capture
+
+    _check(settings.profile in PROFILES, f"profile: unknown {settings.profile!r} (use one of {sorted(PROFILES)})")
+    _check(c.sources, "capture.sources: at least one source is required")
+    _check((c.width is None) == (c.height is None), "capture.width/height: set both or neither")
+    _check(c.buffer_seconds >= m.pre_roll_seconds, "capture.buffer_seconds must cover motion.pre_roll_seconds")
+    _check(m.engine in MOTION_ENGINES, f"motion.engine: unknown {m.engine!r} (use one of {list(MOTION_ENGINES)})")
+    _check(0 < m.threshold < 1, "motion.threshold is a fraction of the frame area, in (0, 1)")
+    _check(0 < m.process_scale <= 1, "motion.process_scale must be in (0, 1]")
+    _check(0 < m.roi_mask_scale <= 1, "motion.roi_mask_scale must be in (0, 1]")
+    _check(m.frame_skip >= 1, "motion.frame_skip must be >= 1")
+    _check(m.idle_frame_skip >= 1 and m.idle_after_frames >= 1, "motion.idle_frame_skip / idle_after_frames must be >= 1")
+    _check(0 < m.idle_scale <= 1, "motion.idle_scale must be in (0, 1]")
+    _check(0 < m.wake_ratio <= 1, "motion.wake_ratio must be in (0, 1]")
+    _check(m.record_seconds > 0, "motion.record_seconds must be > 0")
+    _check(0 <= d.conf_threshold <= 1, "detection.conf_threshold must be in [0, 1]")
+    _check(d.input_size > 0 and d.input_size % 32 == 0, "detection.input_size must be a positive multiple of 32")
+    _check(d.batch_size >= 1 and d.detect_every >= 1, "detection.batch_size / detect_every must be >= 1")
+    _check(0 <= f.detection_confidence <= 1, "face.detection_confidence must be in [0, 1]")
+    _check(-1 <= f.recognition_threshold <= 1, "face.recognition_threshold must be a cosine similarity")
+    _check(0 < f.upper_body_fraction <= 1, "face.upper_body_fraction must be in (0, 1]")
+    _check(f.ssd_input_size > 0 and f.ssd_batch_size >= 1, "face.ssd_input_size / ssd_batch_size must be >= 1")
+    _check(f.dnn_backend in DNN_BACKENDS, f"face.dnn_backend: unknown {f.dnn_backend!r} (use one of {list(DNN_BACKENDS)})")
+    _check(f.dnn_target in DNN_TARGETS, f"face.dnn_target: unknown {f.dnn_target!r} (use one of {list(DNN_TARGETS)})")
+    _check(f.embed_batch_size >= 1 and f.top_k >= 1, "face.embed_batch_size / top_k must be >= 1")
+    _check(settings.decision.min_frames >= 1, "decision.min_frames must be >= 1")
+    _check(0 < settings.decision.min_zone_overlap <= 1, "decision.min_zone_overlap must be in (0, 1]")
+    _check(settings.decision.track_timeout > 0, "decision.track_timeout must be > 0")
+    _check(settings.decision.face_interval >= 0 and settings.decision.face_attempts >= 1,
+           "decision.face_interval must be >= 0, face_attempts >= 1")
+    e = settings.evidence
+    _check(e.merge_gap_seconds >= 0, "evidence.merge_gap_seconds must be >= 0")
+    _check(e.max_gb > 0 and e.max_age_days > 0, "evidence.max_gb / max_age_days must be > 0")
+    _check(r.threads >= 0, "runtime.threads must be >= 0")
+    _check(r.scheduler_batch_size >= 1 and r.queue_size >= 1, "runtime batch / queue sizes must be >= 1")
+    _check(r.metrics_host, "runtime.metrics_host must not be empty")
+    return settings
+
+
+# ================= LOADING =================
+def _read_yaml(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        data = yaml.safe_load(f)
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path}: expected a mapping at the top level")
+    return data
+
+
+def load_settings(config_dir=CONFIG_DIR, profile=None):
+    """
+    defaults ← profile ← settings.yaml ← paths.yaml, validated.
+    profile (or $BORDERSECURITY_PROFILE) overrides `profile:` in settings.yaml.
+    """
+    raw = _read_yaml(os.path.join(config_dir, SETTINGS_FILE))
+    paths = _read_yaml(os.path.join(config_dir, PATHS_FILE))
+
+    raw = copy.deepcopy(raw)
+    name = profile or os.environ.get(PROFILE_ENV) or raw.pop("profile", None) or DEFAULT_PROFILE
+    raw.pop("profile", None)
+    if name not in PROFILES:
+        raise ConfigError(f"profile: unknown {name!r} (use one of {sorted(PROFILES)})")
+
+    settings = Settings(profile=name)
+    _apply(settings, PROFILES[name], f"profiles.{name}")
+    _apply(settings, raw, SETTINGS_FILE)
+    _apply(settings.paths, paths, PATHS_FILE)
+    return validate(settings)
+
+
+def apply_runtime(settings):
+    """
+    Process-wide knobs: thread counts for OpenCV and (if loaded) torch
+    """
+    threads = settings.runtime.threads
+    if not threads:
+        return
+
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+    os.environ.setdefault("TF_NUM_INTRAOP_THREADS", str(threads))
+
+    import cv2
+    cv2.setNumThreads(threads)
+
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+
+
+settings = load_settings()
+apply_runtime(settings)
+logger.info(f"⚙ Config profile: {settings.profile}")
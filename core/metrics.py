@@ -0,0 +1,304 @@
+import os
+import time
+import bisect
+import weakref
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.config import settings
+from core.logger import logger
+
+# ================= CONFIG =================
+METRICS_ENABLED = True
+METRICS_HOST = settings.runtime.metrics_host   # loopback by default, scrape through a proxy or set 0.0.0.0
+METRICS_PORT = settings.runtime.metrics_port   # GET http://<host>:9108/metrics (Prometheus text)
+SUMMARY_INTERVAL = 60        # seconds between summary log lines
+PREFIX = "bordersecurity"
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _label_text(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def rss_bytes():
+    """
+    Resident memory of this process (0 when unavailable)
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return 0
+
+
+class Histogram:
+    """
+    Span durations: cumulative bucket counts, sum and count (O(log buckets))
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def snapshot(self):
+        return list(self.counts), self.sum, self.count
+
+
+def quantile(counts, q):
+    """
+    Bucket upper bound holding the q-quantile of bucket counts
+    """
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank, seen = q * total, 0
+    for bound, n in zip(BUCKETS + (float("inf"),), counts):
+        seen += n
+        if seen >= rank:
+            return bound
+    return float("inf")
+
+
+class Metrics:
+    """
+    In-process metrics: spans (latency histograms), counters and gauges,
+    each with optional labels. Recording is a lock + a few arithmetic ops,
+    cheap enough to leave on in production.
+
+    render() → Prometheus text format (served by serve()),
+    summary() → one compact log line over the last interval.
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.histograms = {}   # name → {label key → Histogram}
+        self.counters = {}     # name → {label key → float}
+        self.gauges = {}       # name → {label key → value or callable}
+        self._last_summary = ({}, {}, time.monotonic())
+        self._server = None
+        self._summary_thread = None
+
+        self.gauge_fn("process_resident_memory_bytes", rss_bytes)
+
+    # ---------------- RECORDING ----------------
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            family = self.histograms.setdefault(name, {})
+            key = _key(labels)
+            if key not in family:
+                family[key] = Histogram()
+            family[key].observe(seconds)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        with metrics.span("inference", model="yolo"): ...
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            family = self.counters.setdefault(name, {})
+            key = _key(labels)
+            family[key] = family.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.gauges.setdefault(name, {})[_key(labels)] = value
+
+    def gauge_fn(self, name, fn, owner=None, **labels):
+        """
+        Gauge read at render time. With `owner`, only a weak reference is
+        kept and the gauge disappears with the owner (e.g. a queue).
+        """
+        if owner is not None:
+            ref = weakref.ref(owner)
+
+            def fn(ref=ref, getter=fn):
+                target = ref()
+                return None if target is None else getter(target)
+
+        with self._lock:
+            self.gauges.setdefault(name, {})[_key(labels)] = fn
+
+    def _gauge_values(self):
+        values = {}
+        with self._lock:
+            gauges = {name: dict(family) for name, family in self.gauges.items()}
+
+        for name, family in gauges.items():
+            for key, value in family.items():
+                if callable(value):
+                    try:
+                        value = value()
+                    except Exception:
+                        value = None
+                if value is not None:
+                    values.setdefault(name, {})[key] = float(value)
+        return values
+
+    # ---------------- EXPOSITION ----------------
+    def render(self):
+        lines = []
+
+        with self._lock:
+            counters = {n: dict(f) for n, f in self.counters.items()}
+            histograms = {n: {k: h.snapshot() for k, h in f.items()} for n, f in self.histograms.items()}
+
+        for name, family in sorted(counters.items()):
+            metric = f"{PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for key, value in family.items():
+                lines.append(f"{metric}{_label_text(key)} {value}")
+
+        for name, family in sorted(self._gauge_values().items()):
+            metric = f"{PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            for key, value in family.items():
+                lines.append(f"{metric}{_label_text(key)} {value}")
+
+        for name, family in sorted(histograms.items()):
+            metric = f"{PREFIX}_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for key, (counts, total, count) in family.items():
+                cumulative = 0
+                for bound, n in zip(BUCKETS, counts):
+                    cumulative += n
+                    lines.append(f"{metric}_bucket{_label_text(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{metric}_bucket{_label_text(key, [('le', '+Inf')])} {count}")
+                lines.append(f"{metric}_sum{_label_text(key)} {total}")
+                lines.append(f"{metric}_count{_label_text(key)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """
+        Rates, interval p95 per span and current gauges since the last call
+        """
+        with self._lock:
+            counters = {(n, k): v for n, f in self.counters.items() for k, v in f.items()}
+            histograms = {(n, k): h.snapshot()[0] for n, f in self.histograms.items() for k, h in f.items()}
+
+        last_counters, last_histograms, last_time = self._last_summary
+        now = time.monotonic()
+        elapsed = max(now - last_time, 1e-6)
+        self._last_summary = (counters, histograms, now)
+
+        def label(name, key):
+            return name + ("[" + ",".join(str(v) for _, v in key) + "]" if key else "")
+
+        parts = []
+        for (name, key), value in sorted(counters.items()):
+            rate = (value - last_counters.get((name, key), 0)) / elapsed
+            parts.append(f"{label(name, key)} {rate:.1f}/s")
+
+        for (name, key), counts in sorted(histograms.items()):
+            previous = last_histograms.get((name, key), [0] * len(counts))
+            delta = [a - b for a, b in zip(counts, previous)]
+            if sum(delta):
+                parts.append(f"{label(name, key)} n={sum(delta)} p95≤{quantile(delta, 0.95) * 1000:g}ms")
+
+        for name, family in sorted(self._gauge_values().items()):
+            for key, value in family.items():
+                if name == "process_resident_memory_bytes":
+                    parts.append(f"rss {value / 1024 ** 2:.0f}MB")
+                else:
+                    parts.append(f"{label(name, key)} {value:g}")
+
+        return " | ".join(parts)
+
+    def serve(self, port=METRICS_PORT, host=METRICS_HOST):
+        """
+        Start the pull endpoint (GET /metrics) on a daemon thread
+        """
+        if self._server is not None:
+            return self._server
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass   # scrapes are not worth a log line each
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info(f"📈 Metrics endpoint on http://{host}:{self._server.server_port}/metrics")
+        return self._server
+
+    def start_summary_log(self, interval=SUMMARY_INTERVAL):
+        if self._summary_thread is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                logger.info(f"📈 {self.summary()}")
+
+        self._summary_thread = threading.Thread(target=run, name="metrics-summary", daemon=True)
+        self._summary_thread.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+metrics = Metrics()
+
+
+def start_metrics(port=METRICS_PORT, interval=SUMMARY_INTERVAL, host=METRICS_HOST):
+    """
+    Pull endpoint + periodic summary log line (no-op when disabled)
+    """
+    if not metrics.enabled:
+        return
+    try:
+        metrics.serve(port, host)
+    except OSError as e:
+        logger.warning(f"Metrics endpoint not started on {host}:{port}: {e}")
+    metrics.start_summary_log(interval)
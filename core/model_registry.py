@@ -0,0 +1,157 @@
+import gc
+import threading
+
+import numpy as np
+from core.config import settings
+from core.logger import logger
+
+# ================= DEFAULT WEIGHTS =================
+YOLO_WEIGHTS = settings.detection.yolo_weights   # e.g. "models/yolov8/best.pt"
+FACE_SSD_WEIGHTS = (settings.paths.face_proto, settings.paths.face_model)
+FACENET_MODEL = settings.face.model_name         # same as face_recognizer.MODEL_NAME
+
+# ================= OPENCV DNN =================
+DNN_BACKEND = settings.face.dnn_backend
+DNN_TARGET = settings.face.dnn_target
+
+
+# ================= LOADERS =================
+def _load_yolo(weights):
+    from ultralytics import YOLO
+    return YOLO(weights)
+
+
+def _warm_yolo(model):
+    model(np.zeros((640, 640, 3), dtype=np.uint8), verbose=False)
+
+
+def _load_face_ssd(weights):
+    import cv2
+    proto_path, model_path = weights
+    net = cv2.dnn.readNetFromCaffe(proto_path, model_path)
+
+    backends = {
+        "default": cv2.dnn.DNN_BACKEND_DEFAULT,
+        "opencv": cv2.dnn.DNN_BACKEND_OPENCV,
+        "cuda": cv2.dnn.DNN_BACKEND_CUDA,
+        "inference_engine": cv2.dnn.DNN_BACKEND_INFERENCE_ENGINE,
+    }
+    targets = {
+        "cpu": cv2.dnn.DNN_TARGET_CPU,
+        "opencl": cv2.dnn.DNN_TARGET_OPENCL,
+        "opencl_fp16": cv2.dnn.DNN_TARGET_OPENCL_FP16,
+        "cuda": cv2.dnn.DNN_TARGET_CUDA,
+        "cuda_fp16": cv2.dnn.DNN_TARGET_CUDA_FP16,
+    }
+    net.setPreferableBackend(backends[DNN_BACKEND])
+    net.setPreferableTarget(targets[DNN_TARGET])
+    logger.info(f"🧠 Face SSD on backend={DNN_BACKEND} target={DNN_TARGET}")
+    return net
+
+
+def _warm_face_ssd(net):
+    import cv2
+    blob = cv2.dnn.blobFromImage(
+        np.zeros((300, 300, 3), dtype=np.uint8), 1.0, (300, 300), (104.0, 177.0, 123.0)
+    )
+    net.setInput(blob)
+    net.forward()
+
+
+def _load_facenet(model_name):
+    from deepface import DeepFace
+    # build_model also fills DeepFace's own cache, so DeepFace.represent
+    # calls with the same model_name reuse this instance.
+    return DeepFace.build_model(model_name)
+
+
+def _warm_facenet(model):
+    # Warm the instance that was loaded, whatever its model name
+    h, w = tuple(getattr(model, "input_shape", (160, 160)))
+    model.model.predict_on_batch(np.zeros((1, h, w, 3), dtype=np.float32))
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models.
+
+    Each (kind, weights) pair is loaded once, warmed with a dummy inference
+    and then handed out as a shared handle to every caller.
+    """
+
+    def __init__(self):
+        self._kinds = {}     # kind → (loader, warmup, default weights)
+        self._models = {}    # (kind, weights) → model
+        self._lock = threading.RLock()
+
+    def register(self, kind, loader, warmup=None, default_weights=None):
+        self._kinds[kind] = (loader, warmup, default_weights)
+
+    def get(self, kind, weights=None):
+        if kind not in self._kinds:
+            raise KeyError(f"Unknown model kind: {kind}")
+
+        loader, warmup, default_weights = self._kinds[kind]
+        key = (kind, weights or default_weights)
+
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            logger.info(f"Loading model {kind} ({key[1]})")
+            model = loader(key[1])
+
+            if warmup is not None:
+                try:
+                    warmup(model)
+                except Exception as e:
+                    logger.warning(f"Warm-up failed for {kind}: {e}")
+
+            self._models[key] = model
+            logger.info(f"Model ready: {kind}")
+            return model
+
+    def unload(self, kind=None, weights=None):
+        """
+        Drop cached models: one (kind, weights), every weights of a kind,
+        or everything when kind is None.
+        """
+        with self._lock:
+            for key in list(self._models):
+                if kind is not None and key[0] != kind:
+                    continue
+                if weights is not None and key[1] != weights:
+                    continue
+
+                del self._models[key]
+                logger.info(f"Model unloaded: {key[0]} ({key[1]})")
+
+        gc.collect()
+
+    def loaded(self):
+        with self._lock:
+            return list(self._models)
+
+
+registry = ModelRegistry()
+registry.register("yolo", _load_yolo, _warm_yolo, YOLO_WEIGHTS)
+registry.register("face_ssd", _load_face_ssd, _warm_face_ssd, FACE_SSD_WEIGHTS)
+registry.register("facenet", _load_facenet, _warm_facenet, FACENET_MODEL)
+
+
+# ================= SHORTCUTS =================
+def get_yolo(weights=None):
+    return registry.get("yolo", weights)
+
+
+def get_face_net(weights=None):
+    return registry.get("face_ssd", weights)
+
+
+def get_facenet(model_name=None):
+    return registry.get("facenet", model_name)
+
+
+def unload_models(kind=None, weights=None):
+    registry.unload(kind, weights)
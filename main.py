@@ -1,19 +1,46 @@
 # main.py
 
 import time
-from modules.motion_detection.motion_detector import run_motion_detection
-from modules.object_detection.yolo_detector import run_object_detection
-from modules.face_detection.face_detector import detect_and_extract_faces
+from modules.motion_detection.motion_detector import (
+    run_motion_detection,
+    stop_motion_detection
+)
+from modules.object_detection.yolo_detector import (
+    YOLO_WEIGHTS,
+    run_object_detection
+)
+from modules.face_detection.face_detector import (
+    detect_and_extract_faces,
+    load_face_model
+)
+from core.config import settings
+from core.metrics import start_metrics
+from core.model_registry import get_yolo
 from modules.face_recognition.face_recognizer import (
     initialize_face_database,
     recognize_faces
 )
+from modules.pipeline.multi_camera import run_multi_camera
+from modules.pipeline.staged_pipeline import run_staged_pipeline
 from modules.utils.cleanup import clear_directory
 
-ROI_DIR = "data/processed/roi"
+ROI_DIR = settings.paths.roi_dir
+
+# Phases hand numpy crops to each other instead of round-tripping JPEGs
+# through data/processed. Set False for the legacy on-disk handoff.
+IN_MEMORY_PIPELINE = settings.runtime.in_memory_pipeline
+SAVE_DEBUG_CROPS = False   # in-memory mode: still write crops for debugging
+
+# One entry → classic single-camera pipeline.
+# Several → one process, shared models, batched cross-camera inference.
+CAMERA_SOURCES = settings.capture.sources   # e.g. [0, 1, "rtsp://...", "clip.mp4"]
 
+# Single camera: run phases 1–4 as concurrent stages with bounded queues,
+# so motion monitoring never pauses while older events are analysed.
+CONCURRENT_PIPELINE = settings.runtime.concurrent_pipeline
 
-def run_pipeline():
+
+def load_shared_state():
     print("=============================")
     print(" SMART BORDER SECURITY SYSTEM")
     print("=============================")
@@ -21,20 +48,31 @@ def run_pipeline():
     # 🔴 Load face database ONCE for entire program
     initialize_face_database()
 
+    # 🔴 Load + warm detection models ONCE (shared via the model registry)
+    get_yolo(YOLO_WEIGHTS)
+    load_face_model()
+
+
+def run_pipeline(in_memory=IN_MEMORY_PIPELINE):
+    load_shared_state()
+
     print("\nSystem running... Press CTRL+C to stop.\n")
 
     try:
         while True:
             print("\n=== PHASE 1: Motion Detection ===")
-            motion_detected = run_motion_detection()
+            save = SAVE_DEBUG_CROPS if in_memory else True
+            rois = run_motion_detection(save_rois=save, source=CAMERA_SOURCES[0])
 
-            if not motion_detected:
+            if not rois:
                 # small sleep to avoid CPU burn
                 time.sleep(0.5)
                 continue
 
             print("\n=== PHASE 2: Object Detection ===")
-            result = run_object_detection()
+            result = run_object_detection(
+                rois if in_memory else None, save_to_disk=save
+            )
 
             if not result.get("threat_found", False):
                 print("No threat detected. Returning to monitoring.")
@@ -42,16 +80,19 @@ def run_pipeline():
                 continue
 
             print("\n=== PHASE 3: Face Detection ===")
-            face_count = detect_and_extract_faces()
-            clear_directory(ROI_DIR)
+            faces = detect_and_extract_faces(
+                result["persons"] if in_memory else None, save_to_disk=save
+            )
+            if not in_memory:
+                clear_directory(ROI_DIR)
 
-            if face_count == 0:
+            if not faces:
                 print("No faces extracted. Returning to monitoring.")
                 time.sleep(0.5)
                 continue
 
             print("\n=== PHASE 4: Face Recognition ===")
-            recognize_faces()
+            recognize_faces(faces if in_memory else None)
 
             print("\n✅ Cycle completed. Monitoring resumes...\n")
             time.sleep(1)
@@ -59,5 +100,17 @@ def run_pipeline():
     except KeyboardInterrupt:
         print("\n🛑 System stopped by user. Exiting cleanly.")
 
+    finally:
+        stop_motion_detection()
+
 if __name__ == "__main__":
-    run_pipeline()
+    start_metrics()   # Prometheus /metrics + periodic summary log
+
+    if len(CAMERA_SOURCES) > 1:
+        load_shared_state()
+        run_multi_camera(CAMERA_SOURCES)
+    elif CONCURRENT_PIPELINE:
+        load_shared_state()
+        run_staged_pipeline(CAMERA_SOURCES[0])
+    else:
+        run_pipeline()
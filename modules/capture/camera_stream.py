@@ -0,0 +1,187 @@
+import os
+import time
+import threading
+from collections import deque
+
+import cv2
+from core.config import settings
+from core.logger import logger
+from core.metrics import metrics
+
+# ================= CONFIG =================
+BUFFER_SECONDS = settings.capture.buffer_seconds     # ring buffer length (must cover motion pre-roll)
+RECONNECT_DELAY = settings.capture.reconnect_delay   # seconds between re-open attempts of a live source
+CAPTURE_SIZE = (settings.capture.width, settings.capture.height)   # (None, None) = camera default
+
+
+def parse_source(value):
+    """
+    "0" → device index 0; anything else (file path, rtsp://...) unchanged
+    """
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return value
+
+
+class CameraStream:
+    """
+    Long-lived capture service.
+
+    A background thread reads frames into a fixed-size ring buffer of
+    (frame_id, timestamp, frame) entries. Consumers pull the next / latest
+    frame or a time window, so the camera is opened once per process and
+    keeps running while the later pipeline phases work.
+    """
+
+    def __init__(self, source=0, buffer_seconds=BUFFER_SECONDS):
+        self.source = source
+        self.buffer_seconds = buffer_seconds
+
+        # Video files are paced at their native fps to behave like a camera
+        self.is_file = isinstance(source, str) and os.path.isfile(source)
+
+        self.cap = None
+        self.fps = None
+        self.width = None
+        self.height = None
+
+        self.buffer = None
+        self.frame_count = 0
+        self.running = False
+        self.ended = False
+
+        self._cond = threading.Condition()
+        self._cap_lock = threading.Lock()   # cap is read / re-opened / released under this
+        self._thread = None
+
+    # ---------------- LIFECYCLE ----------------
+    def start(self):
+        if self.running:
+            return self
+
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"❌ Camera source not accessible: {self.source}")
+
+        if not self.is_file and CAPTURE_SIZE[0]:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAPTURE_SIZE[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAPTURE_SIZE[1])
+
+        self.fps = int(self.cap.get(cv2.CAP_PROP_FPS)) or 20
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.buffer = deque(maxlen=max(1, int(self.buffer_seconds * self.fps)))
+
+        self.running = True
+        self.ended = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"camera-{self.source}", daemon=True
+        )
+        self._thread.start()
+
+        logger.info(
+            f"📷 Camera stream started: {self.source} "
+            f"({self.width}x{self.height} @ {self.fps} fps)"
+        )
+        return self
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+        # A reader stuck in cap.read() keeps the lock: it releases cap itself
+        # once the read returns and it sees running == False
+        if self._cap_lock.acquire(timeout=2):
+            try:
+                self._release()
+            finally:
+                self._cap_lock.release()
+
+        with self._cond:
+            self.ended = True
+            self._cond.notify_all()
+
+    def _run(self):
+        frame_interval = 1.0 / self.fps
+        next_due = time.monotonic()
+
+        camera = str(self.source)
+
+        while self.running:
+            with self._cap_lock:
+                if not self.running or self.cap is None:
+                    break
+                with metrics.span("capture", camera=camera):
+                    ret, frame = self.cap.read()
+
+            if not ret:
+                if self.is_file or not self.running:
+                    break
+
+                logger.warning(f"Camera read failed ({self.source}), reconnecting")
+                with self._cap_lock:
+                    self._release()
+                time.sleep(RECONNECT_DELAY)
+                with self._cap_lock:
+                    if not self.running:
+                        break
+                    self.cap = cv2.VideoCapture(self.source)
+                continue
+
+            with self._cond:
+                self.frame_count += 1
+                self.buffer.append((self.frame_count, time.time(), frame))
+                self._cond.notify_all()
+            metrics.inc("capture_frames", camera=camera)
+
+            if self.is_file:
+                next_due += frame_interval
+                time.sleep(max(next_due - time.monotonic(), 0))
+
+        if not self.running:
+            with self._cap_lock:
+                self._release()
+
+        with self._cond:
+            self.ended = True
+            self._cond.notify_all()
+
+    def _release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    # ---------------- CONSUMERS ----------------
+    def read(self, after_id=0, timeout=1.0):
+        """
+        Next buffered frame newer than `after_id`.
+        A consumer that fell behind gets the oldest frame still buffered.
+        Returns (frame_id, timestamp, frame), or None on timeout / end of stream.
+        """
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                if self.buffer and self.buffer[-1][0] > after_id:
+                    index = max(after_id + 1 - self.buffer[0][0], 0)
+                    return self.buffer[index]
+
+                remaining = deadline - time.monotonic()
+                if self.ended or remaining <= 0:
+                    return None
+
+                self._cond.wait(remaining)
+
+    def latest(self):
+        with self._cond:
+            return self.buffer[-1] if self.buffer else None
+
+    def window(self, start, end=None):
+        """
+        Buffered entries with start <= timestamp <= end (end defaults to now)
+        """
+        end = time.time() if end is None else end
+        with self._cond:
+            return [entry for entry in self.buffer if start <= entry[1] <= end]
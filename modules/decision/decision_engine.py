@@ -1,5 +1,20 @@
+from dataclasses import dataclass
 from enum import Enum, auto
 
+import numpy as np
+
+from core.config import settings
+from modules.utils.frame_crop import FrameCrop
+
+# ================= CONFIG =================
+MIN_FRAMES = settings.decision.min_frames               # detections before a track can be confirmed
+MIN_DWELL_SECONDS = settings.decision.min_dwell_seconds  # time inside a zone before confirmation
+MIN_ZONE_OVERLAP = settings.decision.min_zone_overlap
+TRACK_TIMEOUT = settings.decision.track_timeout         # seconds unseen → state dropped
+FACE_INTERVAL = settings.decision.face_interval         # seconds between face passes per track
+FACE_ATTEMPTS = settings.decision.face_attempts         # recognised faces before "unknown" is final
+VELOCITY_SMOOTHING = 0.5                                # EMA weight of the newest velocity sample
+
 class Decision(Enum):
     IGNORE = auto()
     MONITOR = auto()
@@ -38,3 +53,215 @@ class DecisionEngine:
 
         # 4️⃣ Person inside ROI, no face info yet
         return Decision.INTRUSION_CONFIRMED
+
+
+@dataclass
+class TrackState:
+    """
+    What the streaming engine knows about one tracked object
+    """
+    track_id: int
+    label: str
+    category: str
+    first_seen: float
+    last_seen: float
+    last_observed: float = 0.0       # last frame with a real detection (not a prediction)
+    frames_seen: int = 0             # frames with a real detection
+    zone: str | None = None          # highest-severity zone the box is in now
+    observed_zone: str | None = None  # zone at the last real detection
+    severity: int = 0
+    dwell: float = 0.0               # seconds spent inside zones
+    center: tuple = (0.0, 0.0)       # box centre, frame pixels
+    velocity: tuple = (0.0, 0.0)     # px / s, smoothed
+    best_face: dict | None = None    # recognition result with the best evidence so far
+    faces_seen: int = 0              # recognition results so far
+    face_checked_at: float | None = None   # last frame handed to the face stage
+    confirmed_at: float | None = None
+    decision: Decision = Decision.MONITOR
+
+    @property
+    def heading(self):
+        vx, vy = self.velocity
+        if max(abs(vx), abs(vy)) < 1.0:
+            return "still"
+        if abs(vx) >= abs(vy):
+            return "right" if vx > 0 else "left"
+        return "down" if vy > 0 else "up"
+
+
+class StreamingDecisionEngine:
+    """
+    Per-track decisions over time.
+
+    update() takes all tracked detections of one frame and keeps per-track
+    state (frames seen, dwell inside zones, direction, best face). A track
+    is only INTRUSION_CONFIRMED once it has been detected MIN_FRAMES times
+    AND spent MIN_DWELL_SECONDS inside a zone between detections; boxes the
+    tracker only predicted never count, so a single-frame false positive
+    never reaches the alarm, evidence or face stages. The per-frame rules
+    stay those of DecisionEngine.decide(); confirmation is sticky for the
+    life of the track unless a known face turns up.
+
+    zones: ROIManager (None or no zones = the whole frame is one zone)
+    """
+
+    def __init__(self, zones=None, min_frames=MIN_FRAMES, min_dwell=MIN_DWELL_SECONDS,
+                 min_overlap=MIN_ZONE_OVERLAP, track_timeout=TRACK_TIMEOUT,
+                 face_interval=FACE_INTERVAL, face_attempts=FACE_ATTEMPTS):
+        self.zones = zones if zones is not None and zones.zones else None
+        self.min_frames = min_frames
+        self.min_dwell = min_dwell
+        self.min_overlap = min_overlap
+        self.track_timeout = track_timeout
+        self.face_interval = face_interval
+        self.face_attempts = face_attempts
+
+        self.rules = DecisionEngine()
+        self.tracks = {}         # track_id → TrackState
+        self.confirmations = 0   # tracks confirmed so far
+
+    def _zones_of(self, boxes, frame_size):
+        """
+        (zone name | None, severity) per box, one vectorised zone lookup
+        """
+        if self.zones is None:
+            return [("frame", 1)] * len(boxes)
+
+        best, _ = self.zones.classify(boxes, frame_size, self.min_overlap)
+        return [
+            (self.zones.zones[i].name, self.zones.zones[i].severity) if i >= 0 else (None, 0)
+            for i in best
+        ]
+
+    def update(self, detections, ts, frame_size=None, observed=None):
+        """
+        detections: [(track_id, label, conf, x1, y1, x2, y2, category), ...]
+        of ONE frame captured at `ts` (seconds); frame_size (w, h) when the
+        zones were drawn on a different resolution.
+        observed: track IDs matched to a real detection in this frame
+        (TrackedDetector.observed()); None = every row is a detection.
+        Returns {track_id: Decision} for the tracks in this frame.
+        """
+        boxes = np.array([d[3:7] for d in detections], dtype=np.float64).reshape(-1, 4)
+        zones = self._zones_of(boxes, frame_size)
+        centers = np.column_stack([(boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2])
+
+        decisions = {}
+        for (track_id, label, _, _, _, _, _, category), (zone, severity), center in zip(
+            detections, zones, centers
+        ):
+            state = self.tracks.get(track_id)
+            if state is None:
+                state = self.tracks[track_id] = TrackState(
+                    track_id, label, category, first_seen=ts, last_seen=ts,
+                    last_observed=ts, center=tuple(center)
+                )
+
+            elapsed = ts - state.last_seen
+            if elapsed > 0:
+                sample = (center - state.center) / elapsed
+                state.velocity = tuple(
+                    VELOCITY_SMOOTHING * sample + (1 - VELOCITY_SMOOTHING) * np.asarray(state.velocity)
+                )
+
+            # Temporal evidence only from frames with a real detection
+            if observed is None or track_id in observed:
+                if zone is not None and state.observed_zone is not None:
+                    state.dwell += ts - state.last_observed
+                state.last_observed, state.observed_zone = ts, zone
+                state.frames_seen += 1
+
+            state.center = tuple(center)
+            state.last_seen = ts
+            state.zone, state.severity = zone, severity
+
+            decisions[track_id] = state.decision = self._decide(state, ts)
+
+        self._expire(ts)
+        return decisions
+
+    def _decide(self, state, ts):
+        if state.confirmed_at is not None and not (state.best_face or {}).get("known", False):
+            return Decision.INTRUSION_CONFIRMED
+
+        decision = self.rules.decide(state.label, state.category, state.zone is not None, state.best_face)
+        if decision is not Decision.INTRUSION_CONFIRMED:
+            return decision
+
+        # Temporal evidence before the first confirmation
+        if state.frames_seen < self.min_frames or state.dwell < self.min_dwell:
+            return Decision.MONITOR
+
+        state.confirmed_at = ts
+        self.confirmations += 1
+        return Decision.INTRUSION_CONFIRMED
+
+    def _expire(self, ts):
+        for track_id in [t for t, s in self.tracks.items() if ts - s.last_seen > self.track_timeout]:
+            del self.tracks[track_id]
+
+    # ---------------- FACES ----------------
+    def wants_face(self, track_id):
+        """
+        Worth running face detection / recognition for this track now:
+        an in-zone intrusion track, detected (not predicted) in the current
+        frame, at most once per face_interval, until a known face or
+        face_attempts unknown ones settle it
+        """
+        state = self.tracks.get(track_id)
+        return (
+            state is not None
+            and state.category == "intrusion"
+            and state.zone is not None
+            and state.frames_seen >= self.min_frames
+            and state.last_observed == state.last_seen
+            and (state.face_checked_at is None
+                 or state.last_seen - state.face_checked_at >= self.face_interval)
+            and state.faces_seen < self.face_attempts
+            and not (state.best_face or {}).get("known", False)
+        )
+
+    def add_face(self, track_id, match):
+        """
+        match: recognize_faces() result for a face of this track.
+        Known identities win, otherwise the highest similarity.
+        """
+        state = self.tracks.get(track_id)
+        if state is None:
+            return
+
+        state.faces_seen += 1
+        best = state.best_face
+        if best is None or (match.get("known", False), match.get("similarity", 0.0)) > (
+            best.get("known", False), best.get("similarity", 0.0)
+        ):
+            state.best_face = match
+
+    def face_crops(self, frame, detections, frame_id=0):
+        """
+        Person crops (with their track_id) of the tracks that want a face
+        now, for detect_and_extract_faces(); the faces found in them are
+        fed back with add_faces()
+        """
+        h, w = frame.shape[:2]
+        crops = []
+        for track_id, _, _, x1, y1, x2, y2, _ in detections:
+            if not self.wants_face(track_id):
+                continue
+            x1, y1, x2, y2 = max(int(x1), 0), max(int(y1), 0), min(int(x2), w), min(int(y2), h)
+            if x2 > x1 and y2 > y1:
+                self.tracks[track_id].face_checked_at = self.tracks[track_id].last_seen
+                crops.append(FrameCrop(
+                    frame[y1:y2, x1:x2], frame_id, (x1, y1, x2, y2), label="person", track_id=track_id
+                ))
+        return crops
+
+    def add_faces(self, matches):
+        """
+        recognize_faces() results for faces of face_crops() crops
+        """
+        for match in matches:
+            self.add_face(match["face"].track_id, match)
+
+    def confirmed(self):
+        return [t for t, s in self.tracks.items() if s.decision is Decision.INTRUSION_CONFIRMED]
@@ -1,80 +1,131 @@
-import cv2
 import os
+import cv2
 import logging
+from core.config import settings
+from core.metrics import metrics
+from core.model_registry import get_face_net
+from modules.object_detection.batch_inference import letterbox, unletterbox_boxes
+from modules.utils.frame_crop import load_crops, save_crop
 
 # Paths
-DETECTIONS_DIR = "data/processed/detection/person"
-FACES_DIR = "data/processed/faces"
+DETECTIONS_DIR = os.path.join(settings.paths.detection_dir, "person")
+FACES_DIR = settings.paths.faces_dir
 
-PROTO_PATH = "models/face_detection/deploy.prototxt"
-MODEL_PATH = "models/face_detection/res10_300x300_ssd.caffemodel"
+PROTO_PATH = settings.paths.face_proto
+MODEL_PATH = settings.paths.face_model
 
-CONFIDENCE_THRESHOLD = 0.5
+CONFIDENCE_THRESHOLD = settings.face.detection_confidence
+UPPER_BODY_FRACTION = settings.face.upper_body_fraction   # faces: top part of person boxes
+SSD_INPUT_SIZE = settings.face.ssd_input_size
+SSD_BATCH_SIZE = settings.face.ssd_batch_size
 
 # Logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("FaceDetection")
 
 def load_face_model():
-    net = cv2.dnn.readNetFromCaffe(PROTO_PATH, MODEL_PATH)#You are loading compressed facial knowledge into memory.
-
-
-        #     What edges look like
-
-        # What eyes look like
-
-        # What noses look like
-
-        # What mouths look like
-
-        # How these features combine into a face
-        #This knowledge is encoded as numbers (weights)
-    logger.info("Face detection DNN loaded")
-    return net
-
-def detect_and_extract_faces():
-    os.makedirs(FACES_DIR, exist_ok=True)
-    net = load_face_model()
-    face_count = 0
-
-    for img_name in os.listdir(DETECTIONS_DIR):
-        img_path = os.path.join(DETECTIONS_DIR, img_name)
-        image = cv2.imread(img_path)
-
-        if image is None:
-            continue
-
-        (h, w) = image.shape[:2]
-        blob = cv2.dnn.blobFromImage(
-            cv2.resize(image, (300, 300)),
-            1.0,
-            (300, 300),
-            (104.0, 177.0, 123.0)
+    """
+    Shared, pre-warmed SSD from the model registry (loaded once per process)
+    """
+    return get_face_net((PROTO_PATH, MODEL_PATH))
+
+def face_region(crop):
+    """
+    Part of a crop searched for faces: the top UPPER_BODY_FRACTION of a
+    person box, the whole image for any other crop (legacy ROIs).
+    Starts at the crop's (0, 0), so region and crop coordinates coincide.
+    """
+    if crop.label != "person":
+        return crop.image
+    h = crop.image.shape[0]
+    return crop.image[:max(int(round(h * UPPER_BODY_FRACTION)), 1)]
+
+
+def detect_faces_batched(net, regions, size=SSD_INPUT_SIZE, batch_size=SSD_BATCH_SIZE):
+    """
+    SSD over many images: each is letterboxed (not squashed) to size×size
+    and `batch_size` of them go through one blobFromImages forward.
+
+    Returns one list per region (same order):
+        [(confidence, (x1, y1, x2, y2)), ...]   # region coordinates
+    """
+    results = [[] for _ in regions]
+
+    for start in range(0, len(regions), batch_size):
+        chunk = regions[start:start + batch_size]
+        boxed = [letterbox(region, size) for region in chunk]
+
+        blob = cv2.dnn.blobFromImages(
+            [canvas for canvas, _, _ in boxed], 1.0, (size, size), (104.0, 177.0, 123.0)
         )
-
         net.setInput(blob)
-        detections = net.forward()
+        with metrics.span("inference", model="face_ssd"):
+            detections = net.forward()
+        metrics.inc("inference_images", amount=len(chunk), model="face_ssd")
+
+        # Rows: [image_id, class, confidence, x1, y1, x2, y2] (normalised)
+        rows = detections.reshape(-1, 7)
+        rows = rows[rows[:, 2] > CONFIDENCE_THRESHOLD]
+
+        for index, (region, (_, scale, pad)) in enumerate(zip(chunk, boxed)):
+            mine = rows[rows[:, 0] == index]
+            if not len(mine):
+                continue
+            boxes = unletterbox_boxes(mine[:, 3:7] * size, scale, pad, region.shape)
+            results[start + index] = [
+                (float(conf), tuple(int(v) for v in box)) for conf, box in zip(mine[:, 2], boxes)
+            ]
+
+    return results
+
+
+def detect_and_extract_faces(crops=None, save_to_disk=None, batch_size=SSD_BATCH_SIZE):
+    """
+    Phase 3 – Face Detection & Extraction
+
+    crops: person crops from Phase 2 (list of FrameCrop).
+           None → legacy mode, images are read from DETECTIONS_DIR.
+    save_to_disk: write face_<n>.jpg into FACES_DIR
+           (defaults to True in legacy mode, False in memory)
+
+    Only the upper part of each person box is searched (face_region), and
+    regions are batched through the SSD, batch_size per forward.
+    Returns the extracted faces as FrameCrop (bbox in source frame coords).
+    """
+    if crops is None:
+        crops = load_crops(DETECTIONS_DIR)
+        if save_to_disk is None:
+            save_to_disk = True
+
+    crops = [crop for crop in crops if crop.image.size]
+    if not crops:
+        return []
+
+    net = load_face_model()
+    faces = []
 
-        for i in range(detections.shape[2]):
-            confidence = detections[0, 0, i, 2]
+    detections = detect_faces_batched(net, [face_region(crop) for crop in crops], batch_size=batch_size)
 
-            if confidence > CONFIDENCE_THRESHOLD:
-                box = detections[0, 0, i, 3:7] * [w, h, w, h]
-                (x1, y1, x2, y2) = box.astype("int")
+    for crop, found in zip(crops, detections):
+        for confidence, (x1, y1, x2, y2) in found:
+            face = crop.sub_crop(
+                x1, y1, x2, y2, label="face", confidence=confidence
+            )
 
-                face = image[y1:y2, x1:x2]
+            if face.image.size == 0:
+                continue
 
-                if face.size == 0:
-                    continue
+            faces.append(face)
+            face_filename = f"face_{len(faces)}.jpg"
+            face.name = face_filename
 
-                face_count += 1
-                face_filename = f"face_{face_count}.jpg"
-                save_path = os.path.join(FACES_DIR, face_filename)
-                cv2.imwrite(save_path, face)
+            if save_to_disk:
+                save_crop(face, FACES_DIR)
 
-                logger.info(f"Face extracted → {face_filename}")
+            logger.info(f"Face extracted → {face_filename}")
 
-    logger.info(f"Total faces extracted: {face_count}")
+    logger.info(f"Total faces extracted: {len(faces)}")
+    return faces
 
 if __name__ == "__main__":
     print("Running Phase 3 – Face Detection & Extraction")
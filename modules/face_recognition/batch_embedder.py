@@ -0,0 +1,122 @@
+import os
+
+import cv2
+import numpy as np
+from core.config import settings
+from core.logger import logger
+from core.metrics import metrics
+from core.model_registry import get_facenet
+
+EMBED_BATCH_SIZE = settings.face.embed_batch_size
+ALIGN_FACES = settings.face.align_faces   # cheap eye-based rotation before embedding
+
+_eye_cascade = None
+
+
+def _get_eye_cascade():
+    global _eye_cascade
+
+    if _eye_cascade is None:
+        cascade_dir = getattr(getattr(cv2, "data", None), "haarcascades", "")
+        path = os.path.join(cascade_dir, "haarcascade_eye.xml")
+        _eye_cascade = cv2.CascadeClassifier(path) if os.path.exists(path) else False
+
+    return _eye_cascade
+
+
+def align_face(img):
+    """
+    Lightweight alignment: rotate so the two most prominent eyes are level.
+    Returns the input unchanged when two eyes are not found.
+    """
+    cascade = _get_eye_cascade()
+    if not cascade:
+        return img
+
+    h, w = img.shape[:2]
+    gray = cv2.cvtColor(img[: h // 2], cv2.COLOR_BGR2GRAY)
+    eyes = cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
+
+    if len(eyes) < 2:
+        return img
+
+    eyes = sorted(eyes, key=lambda e: e[2] * e[3], reverse=True)[:2]
+    (lx, ly), (rx, ry) = sorted((x + ew / 2, y + eh / 2) for x, y, ew, eh in eyes)
+    angle = np.degrees(np.arctan2(ry - ly, rx - lx))
+
+    rotation = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(img, rotation, (w, h), borderMode=cv2.BORDER_REPLICATE)
+
+
+def prepare_face(img, target_size, align=False):
+    """
+    BGR face crop → RGB float32 in [0, 1], aspect-preserving resize + pad
+    to target_size (h, w), as DeepFace does before Facenet.
+    """
+    if img is None or img.size == 0:
+        raise ValueError("empty face crop")
+
+    if align:
+        img = align_face(img)
+
+    target_h, target_w = target_size
+    h, w = img.shape[:2]
+    scale = min(target_h / h, target_w / w)
+    new_w, new_h = max(int(w * scale), 1), max(int(h * scale), 1)
+
+    resized = cv2.resize(cv2.cvtColor(img, cv2.COLOR_BGR2RGB), (new_w, new_h))
+
+    canvas = np.zeros((target_h, target_w, 3), dtype=np.float32)
+    top, left = (target_h - new_h) // 2, (target_w - new_w) // 2
+    canvas[top:top + new_h, left:left + new_w] = resized / 255.0
+    return canvas
+
+
+def _forward(model, batch):
+    with metrics.span("inference", model="facenet"):
+        embeddings = np.asarray(model.model.predict_on_batch(batch), dtype=np.float32)
+    metrics.inc("inference_images", len(batch), model="facenet")
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def get_face_embeddings(images, align=ALIGN_FACES, batch_size=EMBED_BATCH_SIZE, model=None):
+    """
+    Embed pre-cropped faces (e.g. SSD crops) WITHOUT re-detecting them.
+
+    One Facenet forward per batch. Returns a list in input order holding an
+    L2-normalised float32 embedding, or None for items that failed.
+    """
+    model = model or get_facenet()
+    target_size = tuple(getattr(model, "input_shape", (160, 160)))
+
+    results = [None] * len(images)
+    prepared, positions = [], []
+
+    for i, img in enumerate(images):
+        try:
+            prepared.append(prepare_face(img, target_size, align))
+            positions.append(i)
+        except Exception as e:
+            logger.warning(f"Face {i} skipped before embedding: {e}")
+
+    for start in range(0, len(prepared), batch_size):
+        batch = np.stack(prepared[start:start + batch_size])
+        batch_positions = positions[start:start + batch_size]
+
+        try:
+            embeddings = _forward(model, batch)
+        except Exception as e:
+            # Isolate the failing item instead of losing the whole batch
+            logger.warning(f"Batch embedding failed ({e}), retrying per face")
+            embeddings = []
+            for item in batch:
+                try:
+                    embeddings.append(_forward(model, item[None])[0])
+                except Exception:
+                    embeddings.append(None)
+
+        for position, emb in zip(batch_positions, embeddings):
+            if emb is not None and np.all(np.isfinite(emb)):
+                results[position] = emb
+
+    return results
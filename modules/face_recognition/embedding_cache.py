@@ -0,0 +1,119 @@
+import os
+import json
+
+import numpy as np
+from core.config import settings
+from core.logger import logger
+
+CACHE_DIR = settings.paths.embedding_cache_dir
+
+
+class EmbeddingCache:
+    """
+    Persistent face-embedding cache for build_face_database.
+
+    <CACHE_DIR>/<model>.npy   float32 (N, D) matrix, memory-mapped on load
+    <CACHE_DIR>/<model>.json  {path: {"size", "mtime_ns", "row"}} index
+
+    Entries are keyed by image path + size + mtime and the model name, so
+    only new or changed images need to be re-embedded. Images that failed
+    to embed are remembered too (row = None) until the file changes.
+    """
+
+    def __init__(self, model_name, cache_dir=CACHE_DIR):
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.matrix_path = os.path.join(cache_dir, f"{model_name}.npy")
+        self.index_path = os.path.join(cache_dir, f"{model_name}.json")
+
+        self._matrix = None   # memory-mapped rows from the previous run
+        self._index = {}      # path → entry from the previous run
+        self._current = {}    # path → (size, mtime_ns, embedding | None) for this run
+        self.hits = 0
+        self.misses = 0
+
+    # ---------------- LOAD / SAVE ----------------
+    def load(self):
+        if not (os.path.exists(self.matrix_path) and os.path.exists(self.index_path)):
+            return self
+
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+
+            if index.get("model") != self.model_name:
+                return self
+
+            self._matrix = np.load(self.matrix_path, mmap_mode="r")
+            self._index = index["entries"]
+        except Exception as e:
+            logger.warning(f"Embedding cache unreadable, rebuilding: {e}")
+            self._matrix, self._index = None, {}
+
+        return self
+
+    def save(self):
+        """
+        Write only the entries seen in this run (deleted images are pruned)
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        rows, entries = [], {}
+        for path, (size, mtime_ns, emb) in self._current.items():
+            entry = {"size": size, "mtime_ns": mtime_ns, "row": None}
+            if emb is not None:
+                entry["row"] = len(rows)
+                rows.append(np.asarray(emb, dtype=np.float32))
+            entries[path] = entry
+
+        matrix = np.stack(rows) if rows else np.empty((0, 0), dtype=np.float32)
+
+        # Release the old memory map before replacing the file (Windows)
+        self._matrix = None
+
+        tmp_matrix = self.matrix_path + ".tmp.npy"
+        tmp_index = self.index_path + ".tmp"
+
+        np.save(tmp_matrix, matrix)
+        with open(tmp_index, "w") as f:
+            json.dump({"model": self.model_name, "entries": entries}, f)
+
+        os.replace(tmp_matrix, self.matrix_path)
+        os.replace(tmp_index, self.index_path)
+
+        logger.info(
+            f"Embedding cache saved: {len(rows)} embeddings "
+            f"({self.hits} cached, {self.misses} computed)"
+        )
+
+    # ---------------- LOOKUP ----------------
+    @staticmethod
+    def _stat(path):
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+
+    def lookup(self, path):
+        """
+        (found, embedding) – found=True with embedding=None means the
+        unchanged image failed to embed last time.
+        """
+        size, mtime_ns = self._stat(path)
+        entry = self._index.get(path)
+
+        if (
+            entry is None
+            or entry["size"] != size
+            or entry["mtime_ns"] != mtime_ns
+            or (entry["row"] is not None and self._matrix is None)
+        ):
+            return False, None
+
+        emb = None if entry["row"] is None else np.array(self._matrix[entry["row"]])
+        self._current[path] = (size, mtime_ns, emb)
+        self.hits += 1
+        return True, emb
+
+    def store(self, path, embedding):
+        size, mtime_ns = self._stat(path)
+        self._current[path] = (size, mtime_ns, embedding)
+        self.misses += 1
@@ -0,0 +1,85 @@
+import numpy as np
+
+
+class FaceIndex:
+    """
+    Known-face embeddings as ONE contiguous float32 matrix.
+
+    matrix:          (N, D) L2-normalised embeddings, rows grouped by identity
+    identity_index:  (N,)   row → position in `identities`
+    identities:      list of info dicts (info.json of each person)
+
+    Cosine similarity of normalised vectors is a plain dot product, so
+    matching Q faces is a single (Q, D) @ (D, N) product.
+    """
+
+    def __init__(self, matrix, identity_index, identities):
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.identity_index = np.asarray(identity_index, dtype=np.int64)
+        self.identities = list(identities)
+
+        # First row of each identity (rows are grouped) → reduceat offsets
+        self._starts = np.flatnonzero(
+            np.r_[True, self.identity_index[1:] != self.identity_index[:-1]]
+        ) if len(self.identity_index) else np.empty(0, dtype=np.int64)
+        self._start_identity = self.identity_index[self._starts]
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        records: [{"info": dict, "embeddings": [np.ndarray, ...]}, ...]
+        """
+        rows, index, identities = [], [], []
+
+        for person in records:
+            if not len(person["embeddings"]):
+                continue
+            identities.append(person["info"])
+            for emb in person["embeddings"]:
+                rows.append(emb)
+                index.append(len(identities) - 1)
+
+        if not rows:
+            return cls(np.empty((0, 0), dtype=np.float32), [], identities)
+
+        return cls(np.stack(rows), index, identities)
+
+    def __len__(self):
+        return len(self.identities)
+
+    @property
+    def size(self):
+        return self.matrix.shape[0]
+
+    def identity_scores(self, queries):
+        """
+        (Q, D) queries → (Q, len(identities)) best similarity per identity
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        scores = np.full((queries.shape[0], len(self.identities)), -1.0, dtype=np.float32)
+
+        if self.size == 0:
+            return scores
+
+        row_scores = queries @ self.matrix.T
+        scores[:, self._start_identity] = np.maximum.reduceat(row_scores, self._starts, axis=1)
+        return scores
+
+    def search(self, queries, top_k=1):
+        """
+        For each query: [(identity_info, similarity), ...] best first, at most top_k
+        """
+        scores = self.identity_scores(queries)
+        k = min(top_k, scores.shape[1])
+
+        if k == 0:
+            return [[] for _ in range(scores.shape[0])]
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        matches = []
+
+        for row, candidates in zip(scores, top):
+            candidates = candidates[np.argsort(-row[candidates])]
+            matches.append([(self.identities[i], float(row[i])) for i in candidates])
+
+        return matches
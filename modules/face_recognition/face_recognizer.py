@@ -2,39 +2,61 @@ import os
 import cv2
 import json
 import numpy as np
-from deepface import DeepFace
+from core.config import settings
 from core.logger import logger
+from core.model_registry import get_facenet
+from modules.face_detection.face_detector import detect_faces_batched, load_face_model
+from modules.face_recognition.batch_embedder import ALIGN_FACES, get_face_embeddings
+from modules.face_recognition.embedding_cache import EmbeddingCache
+from modules.face_recognition.face_index import FaceIndex
+from modules.utils.frame_crop import FrameCrop, load_crops
 
-FACE_DATABASE_DIR = "data/face_database"
-FACES_DIR = "data/processed/faces"
-THRESHOLD = 0.75
+FACE_DATABASE_DIR = settings.paths.face_database_dir
+FACES_DIR = settings.paths.faces_dir
+THRESHOLD = settings.face.recognition_threshold
+
+MODEL_NAME = settings.face.model_name
+USE_EMBEDDING_CACHE = True   # re-embed only new / changed database images
+TOP_K = settings.face.top_k   # candidate identities reported per face
 
 # ================= GLOBAL CACHE =================
-DATABASE = None   # loaded ONCE and reused
+DATABASE = None   # FaceIndex, loaded ONCE and reused
 
 
-def cosine_similarity(a, b):
-    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+def get_face_embedding(img, align=ALIGN_FACES):
+    """
+    Database photo → embedding through the SAME path as query faces
+    (SSD detection → loose crop → prepare_face with the same align flag),
+    so both sides of a match share one distribution and THRESHOLD holds.
+    """
+    h, w = img.shape[:2]
+    found = detect_faces_batched(load_face_model(), [img])[0]
+    if not found:
+        raise ValueError("no face detected")
 
+    _, (x1, y1, x2, y2) = max(found)
+    face = FrameCrop(img, 0, (0, 0, w, h)).sub_crop(x1, y1, x2, y2)
 
-def get_face_embedding(img):
-    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-    result = DeepFace.represent(
-        img_path=img,
-        model_name="Facenet",
-        detector_backend="mtcnn",
-        enforce_detection=True
-    )
-    emb = np.array(result[0]["embedding"], dtype="float32")
-    return emb / np.linalg.norm(emb)
+    emb = get_face_embeddings([face.image], align=align)[0]
+    if emb is None:
+        raise ValueError("face could not be embedded")
+    return emb
 
 
 def build_face_database():
+    """
+    Embed every image under FACE_DATABASE_DIR/<person>/ → FaceIndex
+    Unchanged images are served from the on-disk EmbeddingCache.
+    """
     database = []
+    cache = None
+    if USE_EMBEDDING_CACHE:
+        # Keyed by preprocessing too: embeddings from another path never mix
+        cache = EmbeddingCache(f"{MODEL_NAME}_ssd{'_aligned' if ALIGN_FACES else ''}").load()
 
     if not os.path.exists(FACE_DATABASE_DIR):
         logger.warning("Face database directory not found")
-        return database
+        return FaceIndex.from_records(database)
 
     for person in os.listdir(FACE_DATABASE_DIR):
         person_dir = os.path.join(FACE_DATABASE_DIR, person)
@@ -53,15 +75,29 @@ def build_face_database():
             if not file.lower().endswith((".jpg", ".png", ".jpeg")):
                 continue
 
-            img = cv2.imread(os.path.join(person_dir, file))
+            img_path = os.path.join(person_dir, file)
+
+            if cache is not None:
+                found, emb = cache.lookup(img_path)
+                if found:
+                    if emb is not None:
+                        embeddings.append(emb)
+                    continue
+
+            img = cv2.imread(img_path)
             if img is None:
                 continue
 
+            emb = None
             try:
-                embeddings.append(get_face_embedding(img))
+                emb = get_face_embedding(img)
+                embeddings.append(emb)
             except Exception as e:
                 logger.warning(f"Embedding failed for {file}: {e}")
 
+            if cache is not None:
+                cache.store(img_path, emb)
+
         if embeddings:
             database.append({
                 "info": info,
@@ -69,8 +105,12 @@ def build_face_database():
             })
             logger.info(f"Loaded embeddings for {info['name']}")
 
-    logger.info(f"Known identities loaded: {len(database)}")
-    return database
+    if cache is not None:
+        cache.save()
+
+    index = FaceIndex.from_records(database)
+    logger.info(f"Known identities loaded: {len(index)} ({index.size} embeddings)")
+    return index
 
 
 # ================= INITIALIZER =================
@@ -82,13 +122,24 @@ def initialize_face_database():
 
     if DATABASE is None:
         logger.info("Initializing face database (one-time)")
+        get_facenet()   # load + warm the shared Facenet before embedding
         DATABASE = build_face_database()
     else:
         logger.info("Face database already initialized")
 
 
 # ================= RECOGNITION =================
-def recognize_faces():
+def recognize_faces(faces=None):
+    """
+    Phase 4 – Face Recognition
+
+    faces: face crops from Phase 3 (list of FrameCrop).
+           None → legacy mode, faces are read from FACES_DIR.
+
+    Returns one result per recognised face:
+        {"face": FrameCrop, "known": bool, "identity": dict | None,
+         "similarity": float, "candidates": [(info, similarity), ...]}  # TOP_K
+    """
     global DATABASE
 
     if DATABASE is None:
@@ -96,34 +147,36 @@ def recognize_faces():
             "Face database not initialized. Call initialize_face_database() first."
         )
 
-    if not os.path.exists(FACES_DIR) or not os.listdir(FACES_DIR):
+    if faces is None:
+        faces = load_crops(FACES_DIR)
+
+    if not faces:
         logger.warning("No extracted faces to recognize")
-        return
+        return []
 
     logger.info("Starting Face Recognition")
 
-    for face_file in os.listdir(FACES_DIR):
-        face = cv2.imread(os.path.join(FACES_DIR, face_file))
-        if face is None:
+    # Faces are already SSD crops → batched Facenet, no second detector pass
+    embedded, queries = [], []
+    for face, emb in zip(faces, get_face_embeddings([f.image for f in faces])):
+        if emb is None:
+            logger.warning(f"Embedding failed for {face.filename}")
             continue
+        embedded.append(face)
+        queries.append(emb)
 
-        try:
-            query = get_face_embedding(face)
-        except Exception as e:
-            logger.warning(f"Embedding failed for {face_file}: {e}")
-            continue
+    if not embedded:
+        return []
 
-        best_score = 0
-        best_person = None
+    # One matrix-matrix product for every face against every known embedding
+    matches = DATABASE.search(np.stack(queries), top_k=TOP_K)
+    results = []
 
-        for person in DATABASE:
-            for emb in person["embeddings"]:
-                score = cosine_similarity(query, emb)
-                if score > best_score:
-                    best_score = score
-                    best_person = person["info"]
+    for face, candidates in zip(embedded, matches):
+        best_person, best_score = candidates[0] if candidates else (None, 0.0)
 
-        if best_score >= THRESHOLD:
+        known = best_score >= THRESHOLD
+        if known:
             logger.critical(
                 f"✅ IDENTIFIED: {best_person['name']} | Similarity={best_score:.2f}"
             )
@@ -131,3 +184,13 @@ def recognize_faces():
             logger.warning(
                 f"❌ UNKNOWN FACE | Similarity={best_score:.2f}"
             )
+
+        results.append({
+            "face": face,
+            "known": known,
+            "identity": best_person if known else None,
+            "similarity": float(best_score),
+            "candidates": candidates
+        })
+
+    return results
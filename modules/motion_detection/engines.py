@@ -0,0 +1,176 @@
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+from core.config import settings
+
+# ================= CONFIG =================
+MOTION_ENGINE = settings.motion.engine   # mog2 | knn | diff
+DIFF_GRID_WIDTH = 160      # frame-diff engine never works on wider frames than this
+DIFF_ALPHA = 0.05          # running-average learning rate
+DIFF_THRESHOLD = 25        # gray-level difference counted as motion
+
+
+class MotionEngine(ABC):
+    """
+    Background model behind every motion gate.
+
+    apply(frame) → (fg_mask, motion fraction): the mask is at processing
+    resolution (`scale` of the frame, roi_from_mask maps it back) and the
+    fraction is foreground pixels / mask pixels, so thresholds do not
+    depend on the camera resolution.
+
+    set_zone_mask() restricts motion to zone pixels: only the zones'
+    bounding box is converted, resized and modelled, and foreground
+    outside the zones is cleared.
+    """
+
+    name = None
+
+    def __init__(self, scale=1.0):
+        if not 0 < scale <= 1:
+            raise ValueError(f"scale must be in (0, 1], got {scale}")
+        self.scale = scale
+        self.frames_seen = 0
+        self.zone_mask = None
+        self._zone = None   # grid layout of zone_mask for one frame size
+
+    def processing_scale(self, frame):
+        return self.scale
+
+    def _prepare(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        scale = self.processing_scale(frame)
+        if scale != 1:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return gray
+
+    @abstractmethod
+    def _subtract(self, gray):
+        """
+        gray: uint8 frame at processing resolution → uint8 0/255 fg mask
+        """
+
+    def set_zone_mask(self, mask):
+        """
+        mask: uint8, non-zero inside the zones, at frame size or any size
+        with the frame's aspect ratio (None = whole frame)
+        """
+        if mask is not None and not cv2.countNonZero(mask):
+            raise ValueError("Zone mask is empty")
+        self.zone_mask = mask
+        self._zone = None
+
+    def _zone_layout(self, frame):
+        h, w = frame.shape[:2]
+        if self._zone is not None and self._zone["frame"] == (h, w):
+            return self._zone
+
+        scale = self.processing_scale(frame)
+        gw, gh = max(int(round(w * scale)), 1), max(int(round(h * scale)), 1)
+        grid = cv2.resize(self.zone_mask, (gw, gh), interpolation=cv2.INTER_NEAREST)
+        ys, xs = np.nonzero(grid)
+        gx1, gy1, gx2, gy2 = int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1
+
+        self._zone = {
+            "frame": (h, w),
+            "grid": (gh, gw),
+            "cell": (gx1, gy1, gx2, gy2),
+            # Frame pixels covering the zones' bounding box on the grid
+            "crop": (gx1 * w // gw, gy1 * h // gh, min(-(-gx2 * w // gw), w), min(-(-gy2 * h // gh), h)),
+            "inside": np.where(grid[gy1:gy2, gx1:gx2] > 0, 255, 0).astype(np.uint8),
+        }
+        return self._zone
+
+    def _apply_in_zones(self, frame):
+        zone = self._zone_layout(frame)
+        gx1, gy1, gx2, gy2 = zone["cell"]
+        x1, y1, x2, y2 = zone["crop"]
+
+        crop = frame[y1:y2, x1:x2]
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+        if gray.shape != (gy2 - gy1, gx2 - gx1):
+            gray = cv2.resize(gray, (gx2 - gx1, gy2 - gy1), interpolation=cv2.INTER_AREA)
+
+        fg = cv2.bitwise_and(self._subtract(gray), zone["inside"])
+        fg_mask = np.zeros(zone["grid"], dtype=np.uint8)
+        fg_mask[gy1:gy2, gx1:gx2] = fg
+        return fg_mask
+
+    def apply(self, frame):
+        if self.zone_mask is None:
+            fg_mask = self._subtract(self._prepare(frame))
+        else:
+            fg_mask = self._apply_in_zones(frame)
+        self.frames_seen += 1
+        return fg_mask, cv2.countNonZero(fg_mask) / fg_mask.size
+
+
+class MOG2Engine(MotionEngine):
+    name = "mog2"
+
+    def __init__(self, scale=1.0, history=300, var_threshold=50):
+        super().__init__(scale)
+        self.bg = cv2.createBackgroundSubtractorMOG2(
+            history=history, varThreshold=var_threshold, detectShadows=False
+        )
+
+    def _subtract(self, gray):
+        return self.bg.apply(gray)
+
+
+class KNNEngine(MotionEngine):
+    name = "knn"
+
+    def __init__(self, scale=1.0, history=300, dist2_threshold=400.0):
+        super().__init__(scale)
+        self.bg = cv2.createBackgroundSubtractorKNN(
+            history=history, dist2Threshold=dist2_threshold, detectShadows=False
+        )
+
+    def _subtract(self, gray):
+        return self.bg.apply(gray)
+
+
+class FrameDiffEngine(MotionEngine):
+    """
+    Cheapest gate: |frame - running average| on a coarse grid (at most
+    DIFF_GRID_WIDTH pixels wide), plain numpy arithmetic per pixel.
+    """
+
+    name = "diff"
+
+    def __init__(self, scale=1.0, alpha=DIFF_ALPHA, diff_threshold=DIFF_THRESHOLD,
+                 grid_width=DIFF_GRID_WIDTH):
+        super().__init__(scale)
+        self.alpha = alpha
+        self.diff_threshold = diff_threshold
+        self.grid_width = grid_width
+        self.background = None
+
+    def processing_scale(self, frame):
+        return min(self.scale, self.grid_width / frame.shape[1])
+
+    def _subtract(self, gray):
+        current = gray.astype(np.float32)
+        if self.background is None or self.background.shape != current.shape:
+            self.background = current
+            return np.zeros(gray.shape, dtype=np.uint8)
+
+        delta = current - self.background
+        fg_mask = (np.abs(delta) > self.diff_threshold).astype(np.uint8) * 255
+        self.background += self.alpha * delta
+        return fg_mask
+
+
+ENGINES = {engine.name: engine for engine in (MOG2Engine, KNNEngine, FrameDiffEngine)}
+
+
+def create_engine(name=MOTION_ENGINE, scale=1.0, **kwargs):
+    """
+    create_engine("diff", scale=0.5) → a fresh MotionEngine
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Unknown motion engine {name!r} (use one of {sorted(ENGINES)})")
+    return ENGINES[name](scale=scale, **kwargs)
@@ -0,0 +1,117 @@
+import cv2
+import numpy as np
+
+# ================= CONFIG =================
+MAX_ROIS_PER_EVENT = 12
+MIN_SPACING_FRAMES = 3     # never keep two ROIs closer than this
+IOU_THRESHOLD = 0.8        # same place as the last kept ROI above this
+HASH_DISTANCE = 6          # dHash bits; same content at or below this
+AREA_CHANGE = 0.25         # relative motion-area change that is "new information"
+MIN_SHARPNESS = 20.0       # variance of Laplacian; blurrier crops are dropped
+
+
+def dhash(img, size=8):
+    """
+    64-bit difference hash of an image (perceptual, cheap)
+    """
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def sharpness(img):
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+def box_iou(a, b):
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(ix2 - ix1, 0) * max(iy2 - iy1, 0)
+    union = box_area(a) + box_area(b) - inter
+    return inter / union if union else 0.0
+
+
+def box_area(box):
+    return max(box[2] - box[0], 0) * max(box[3] - box[1], 0)
+
+
+class KeyframeSelector:
+    """
+    Keeps only informative ROIs of a motion event.
+
+    A ROI is dropped when it is too close in time to the last kept one,
+    too blurry, or a near-duplicate of it (same place by bbox IoU, same
+    content by dHash distance, similar motion area). The survivors are
+    thinned evenly to at most max_rois.
+    """
+
+    def __init__(
+        self,
+        max_rois=MAX_ROIS_PER_EVENT,
+        min_spacing=MIN_SPACING_FRAMES,
+        iou_threshold=IOU_THRESHOLD,
+        hash_distance=HASH_DISTANCE,
+        area_change=AREA_CHANGE,
+        min_sharpness=MIN_SHARPNESS
+    ):
+        self.max_rois = max_rois
+        self.min_spacing = min_spacing
+        self.iou_threshold = iou_threshold
+        self.hash_distance = hash_distance
+        self.area_change = area_change
+        self.min_sharpness = min_sharpness
+
+    def _is_duplicate(self, crop, crop_hash, last, last_hash):
+        area, last_area = box_area(crop.bbox), box_area(last.bbox)
+        area_delta = abs(area - last_area) / max(last_area, 1)
+
+        return (
+            box_iou(crop.bbox, last.bbox) >= self.iou_threshold
+            and hamming(crop_hash, last_hash) <= self.hash_distance
+            and area_delta < self.area_change
+        )
+
+    def select(self, crops):
+        """
+        crops: one event's ROIs in frame order → informative subset
+        """
+        kept = []
+        last, last_hash = None, None
+        sharpest, sharpest_score = None, -1.0
+
+        for crop in crops:
+            if crop.image.size == 0:
+                continue
+
+            score = sharpness(crop.image)
+            if score > sharpest_score:
+                sharpest, sharpest_score = crop, score
+
+            if last is not None and crop.frame_id - last.frame_id < self.min_spacing:
+                continue
+
+            if score < self.min_sharpness:
+                continue
+
+            crop_hash = dhash(crop.image)
+            if last is not None and self._is_duplicate(crop, crop_hash, last, last_hash):
+                continue
+
+            kept.append(crop)
+            last, last_hash = crop, crop_hash
+
+        # Never lose an event entirely: fall back to its sharpest ROI
+        if not kept and sharpest is not None:
+            kept = [sharpest]
+
+        if len(kept) > self.max_rois:
+            picks = np.linspace(0, len(kept) - 1, self.max_rois).round().astype(int)
+            kept = [kept[i] for i in picks]
+
+        return kept
@@ -1,175 +1,472 @@
 import cv2
-import time
 import os
+from collections import deque
+from core.config import settings
 from core.logger import logger
+from core.metrics import metrics
+from modules.capture.camera_stream import CameraStream
+from modules.motion_detection.engines import MOTION_ENGINE, create_engine
+from modules.motion_detection.keyframes import KeyframeSelector
+from modules.utils.frame_crop import FrameCrop, save_crop
+from modules.utils.roi_manager import ROIManager
 
 # ================= CONFIG =================
-VIDEO_DIR = "data/raw/chunks"
-ROI_DIR = "data/processed/roi"
-
-MOTION_THRESHOLD = 5000
-RECORD_SECONDS = 5
-
-SHOW_VIDEO = True   # 🔁 set False for production
+# Values come from config/settings.yaml + the active profile (core/config.py)
+_motion = settings.motion
+
+VIDEO_DIR = settings.paths.video_dir
+ROI_DIR = settings.paths.roi_dir
+
+MOTION_THRESHOLD = _motion.threshold   # moving fraction of the frame area
+BG_WARMUP_FRAMES = _motion.bg_warmup_frames  # no triggers while the engine learns its first background
+RECORD_SECONDS = _motion.record_seconds
+PRE_ROLL_SECONDS = _motion.pre_roll_seconds   # taken from the CameraStream ring buffer
+ARCHIVE_CLIPS = _motion.archive_clips  # also write each event as mp4 into VIDEO_DIR
+SELECT_KEYFRAMES = _motion.select_keyframes  # forward only informative ROIs (see keyframes.py)
+ZONE_GATING = _motion.zone_gating      # motion only counts inside the ROIManager zones
+PROCESS_SCALE = _motion.process_scale  # the motion engine runs on frames downscaled by this
+FRAME_SKIP = _motion.frame_skip        # analyse every Nth frame
+
+# Adaptive duty-cycling: while the scene is quiet only every IDLE_FRAME_SKIP-th
+# frame is analysed, at IDLE_SCALE; motion energy above WAKE_RATIO × threshold
+# switches straight back to full rate, so waking takes ≤ IDLE_FRAME_SKIP frames
+ADAPTIVE_SAMPLING = _motion.adaptive
+IDLE_FRAME_SKIP = _motion.idle_frame_skip
+IDLE_SCALE = _motion.idle_scale
+IDLE_AFTER_FRAMES = _motion.idle_after_frames   # quiet analysed frames before going idle
+WAKE_RATIO = _motion.wake_ratio
+IDLE_REFRESH_EVERY = 30   # idle: feed the full-rate model every Nth frame to keep it current
+
+# BIG ROI extraction
+ROI_MIN_AREA = _motion.roi_min_area    # contour area (px², full resolution)
+ROI_PADDING = _motion.roi_padding
+ROI_MASK_SCALE = _motion.roi_mask_scale  # dilate + find contours on a downscaled mask
+
+SHOW_VIDEO = not settings.runtime.headless   # 🔁 headless: true for production
 
 os.makedirs(VIDEO_DIR, exist_ok=True)
 os.makedirs(ROI_DIR, exist_ok=True)
 
 
-def run_motion_detection():
-    """
-    Phase 1:
-    - Continuous webcam monitoring
-    - Motion → record 5s clip
-    - Extract BIG ROI
-    - Return True when motion event is processed
+class MotionMonitor:
     """
+    Persistent Phase 1 state.
 
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        raise RuntimeError("❌ Webcam not accessible")
-
-    fps = int(cap.get(cv2.CAP_PROP_FPS)) or 20
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    Owns a long-lived CameraStream and a warm background model (MotionEngine)
+    that survive across pipeline cycles, so the camera is not re-opened and
+    the background is not re-learned after every event.
 
-    bg_subtractor = cv2.createBackgroundSubtractorMOG2(
-        history=300,
-        varThreshold=50,
-        detectShadows=False
-    )
-
-    logger.info("🔍 CONTINUOUS MONITORING STARTED (Ctrl+C to stop)")
+    With adaptive=True the loop duty-cycles: after IDLE_AFTER_FRAMES quiet
+    frames it only probes every IDLE_FRAME_SKIP-th frame at IDLE_SCALE, and
+    returns to full rate as soon as a probe sees motion energy.
+    """
 
-    recording = False
-    out = None
-    start_time = None
-    video_path = None
+    def __init__(self, stream, camera_id=None, show=SHOW_VIDEO, adaptive=ADAPTIVE_SAMPLING,
+                 engine=MOTION_ENGINE, zones=None):
+        self.stream = stream
+        self.camera_id = camera_id
+        self.show = show   # cv2.imshow only works from the main thread
+        self.engine = create_engine(engine, PROCESS_SCALE)
+
+        # Zone gating: pixels outside every zone are never processed
+        if zones is None and ZONE_GATING:
+            zones = ROIManager()
+        self.zones = zones
+        self.zone_mask = zones.mask() if zones is not None else None
+        self.engine.set_zone_mask(self.zone_mask)
+        self.last_frame_id = 0
+        self.frames_seen = 0
+        self.keyframes = KeyframeSelector() if SELECT_KEYFRAMES else None
+
+        # Foreground masks of the most recent frames, for pre-roll ROIs
+        self.recent_masks = deque(
+            maxlen=max(1, int(PRE_ROLL_SECONDS * (stream.fps or 30)) + 1)
+        )
 
-    try:
+        # Duty cycle: full rate until the scene has been quiet for a while
+        self.adaptive = adaptive
+        self.active = True
+        self.idle_engine = create_engine(engine, IDLE_SCALE) if adaptive else None
+        if self.idle_engine is not None:
+            self.idle_engine.set_zone_mask(self.zone_mask)
+        self.idle_frames_seen = 0
+        self.quiet_streak = 0
+        self.last_idle_sample = None   # (frame_id, timestamp) of the last quiet probe
+        self.wakeups = 0
+        self.wake_latency = None       # (frames, seconds) of the last wake-up
+        self._report_rate()
+
+    @property
+    def analysis_rate(self):
+        """
+        Frames analysed per second in the current mode
+        """
+        skip = FRAME_SKIP if self.active else IDLE_FRAME_SKIP
+        return (self.stream.fps or 30) / skip
+
+    def _report_rate(self):
+        camera = str(self.camera_id or "default")
+        metrics.set_gauge("motion_analysis_fps", self.analysis_rate, camera=camera)
+        metrics.set_gauge("motion_active", int(self.active), camera=camera)
+
+    def _update_idle_model(self, frame):
+        self.idle_frames_seen += 1
+        return self.idle_engine.apply(frame)
+
+    def _idle_probe(self, frame_id, timestamp, frame):
+        """
+        Quiet-scene sampling. True once motion energy rises (switch to full rate).
+        """
+        if frame_id % IDLE_FRAME_SKIP:
+            if frame_id % IDLE_REFRESH_EVERY == 0:
+                with metrics.span("motion", mode="refresh"):
+                    self.engine.apply(frame)
+                self.frames_seen += 1
+            return False
+
+        with metrics.span("motion", mode="idle"):
+            fg_mask, motion_fraction = self._update_idle_model(frame)
+        self.recent_masks.append((frame_id, fg_mask))
+
+        warm = self.idle_frames_seen > max(1, BG_WARMUP_FRAMES // IDLE_FRAME_SKIP)
+        if not (warm and motion_fraction >= WAKE_RATIO * MOTION_THRESHOLD):
+            self.last_idle_sample = (frame_id, timestamp)
+            return False
+
+        # Motion started somewhere after the last quiet probe
+        last_id, last_ts = self.last_idle_sample
+        self.wake_latency = (frame_id - last_id, timestamp - last_ts)
+        self.wakeups += 1
+        self.active = True
+        self.quiet_streak = 0
+        self._report_rate()
+
+        metrics.inc("motion_wakeups")
+        metrics.observe("motion_wake_latency", self.wake_latency[1])
+        logger.info(
+            f"⏰ Motion energy rising → full rate {self.analysis_rate:.1f} fps "
+            f"(wake-up ≤ {self.wake_latency[0]} frames / {self.wake_latency[1] * 1000:.0f} ms)"
+        )
+        return True
+
+    def _maybe_idle(self, frame_id, timestamp, motion_fraction):
+        if motion_fraction >= WAKE_RATIO * MOTION_THRESHOLD:
+            self.quiet_streak = 0
+            return
+
+        self.quiet_streak += 1
+        if self.quiet_streak >= IDLE_AFTER_FRAMES:
+            self.active = False
+            self.last_idle_sample = (frame_id, timestamp)
+            self._report_rate()
+            logger.info(f"😴 Scene quiet → idle sampling {self.analysis_rate:.1f} fps at {IDLE_SCALE:g}x")
+
+    def next_frame(self):
+        """
+        Next unseen (frame_id, timestamp, frame) from the stream, None once it ends
+        """
         while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+            entry = self.stream.read(after_id=self.last_frame_id)
+            if entry is not None:
+                self.last_frame_id = entry[0]
+                self._fit_zone_mask(entry[2])
+                return entry
+
+            if self.stream.ended:
+                return None
+
+    def _fit_zone_mask(self, frame):
+        """
+        Native zones (legacy roi.json) are only known in camera pixels:
+        rebuild the mask once the frame size is known
+        """
+        if self.zones is None or not self.zones.native:
+            return
+        h, w = frame.shape[:2]
+        if (w, h) == tuple(self.zones.frame_size):
+            return
+        self.zone_mask = self.zones.mask(w, h)
+        for engine in (self.engine, self.idle_engine):
+            if engine is not None:
+                engine.set_zone_mask(self.zone_mask)
+
+    def _roi(self, frame_id, frame, fg_mask):
+        with metrics.span("roi"):
+            crop = roi_from_mask(frame_id, frame, fg_mask)
+        if crop is not None:
+            crop.camera_id = self.camera_id
+        return crop
+
+    def wait_for_event(self, save_rois=True):
+        """
+        Monitor until motion, then collect BIG ROIs online for
+        PRE_ROLL_SECONDS + RECORD_SECONDS using the warm background model.
+        Returns list of FrameCrop ([] if the stream ended).
+        """
+        logger.info("🔍 CONTINUOUS MONITORING STARTED (Ctrl+C to stop)")
+
+        recording = False
+        out = None
+        start_time = None
+        rois = []
+
+        try:
+            while True:
+                entry = self.next_frame()
+                if entry is None:
+                    break
 
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            fg_mask = bg_subtractor.apply(gray)
-            motion_area = cv2.countNonZero(fg_mask)
+                frame_id, timestamp, frame = entry
+
+                # Quiet scene: cheap sparse probe until motion energy rises;
+                # the waking frame itself is analysed at full rate
+                if not self.active:
+                    if not self._idle_probe(frame_id, timestamp, frame):
+                        continue
+
+                # Frame skip: only every FRAME_SKIP-th frame is analysed
+                elif FRAME_SKIP > 1 and frame_id % FRAME_SKIP:
+                    if out is not None:
+                        out.write(frame)
+                    continue
+
+                with metrics.span("motion"):
+                    fg_mask, motion_fraction = self.engine.apply(frame)
+                self.recent_masks.append((frame_id, fg_mask))
+                self.frames_seen += 1
+
+                if self.adaptive:
+                    # Keep the idle model current so it can take over at once
+                    if frame_id % IDLE_FRAME_SKIP == 0:
+                        self._update_idle_model(frame)
+                    if not recording:
+                        self._maybe_idle(frame_id, timestamp, motion_fraction)
+
+                # ================= DISPLAY (NO OVERLAP) =================
+                if self.show:
+                    mask_bgr = cv2.cvtColor(fg_mask, cv2.COLOR_GRAY2BGR)
+
+                    # Resize mask to match frame (safety)
+                    mask_bgr = cv2.resize(mask_bgr, (frame.shape[1], frame.shape[0]))
+
+                    combined = cv2.hconcat([frame, mask_bgr])
+                    cv2.imshow("Live Feed  |  Motion Mask", combined)
+
+                    if cv2.waitKey(1) & 0xFF == ord("q"):
+                        break
+
+                # ================= MOTION TRIGGER =================
+                warm = self.frames_seen > BG_WARMUP_FRAMES
+                if motion_fraction > MOTION_THRESHOLD and warm and not recording:
+                    if ARCHIVE_CLIPS:
+                        prefix = f"motion_{self.camera_id}" if self.camera_id else "motion"
+                        video_path = os.path.join(
+                            VIDEO_DIR, f"{prefix}_{int(timestamp)}.mp4"
+                        )
+
+                        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+                        out = cv2.VideoWriter(
+                            video_path, fourcc, self.stream.fps,
+                            (self.stream.width, self.stream.height)
+                        )
+
+                    # Pre-roll: the seconds BEFORE the trigger, from the ring
+                    # buffer, with the masks the warm model already produced
+                    pre_roll = self.stream.window(timestamp - PRE_ROLL_SECONDS, timestamp)
+                    masks = dict(self.recent_masks)
+
+                    for buffered_id, _, buffered in pre_roll:
+                        if out is not None:
+                            out.write(buffered)
+                        if buffered_id in masks:
+                            rois.append(self._roi(buffered_id, buffered, masks[buffered_id]))
+
+                    recording = True
+                    start_time = timestamp
+                    metrics.inc("motion_events")
+                    logger.info(
+                        f"Motion detected → Recording {RECORD_SECONDS}s "
+                        f"(+{len(pre_roll)} pre-roll frames)"
+                    )
+                    continue   # trigger frame is the last pre-roll entry
+
+                # ================= RECORD (ONLINE ROI) =================
+                if recording:
+                    if out is not None:
+                        out.write(frame)
+                    rois.append(self._roi(frame_id, frame, fg_mask))
+
+                    if timestamp - start_time >= RECORD_SECONDS:
+                        rois = [roi for roi in rois if roi is not None]
+                        extracted = len(rois)
+
+                        if self.keyframes is not None:
+                            rois = self.keyframes.select(rois)
+
+                        if save_rois:
+                            for roi in rois:
+                                save_crop(roi, ROI_DIR)
+
+                        logger.info(
+                            f"BIG ROI extraction completed "
+                            f"({len(rois)} of {extracted} ROIs kept)"
+                        )
+                        return rois  # move to Phase 2
+
+        finally:
+            if out is not None:
+                out.release()
+
+        return []
+
+    def close(self):
+        self.stream.stop()
+        if self.show:
+            cv2.destroyAllWindows()
 
-            # ================= DISPLAY (NO OVERLAP) =================
-            if SHOW_VIDEO:
-                mask_bgr = cv2.cvtColor(fg_mask, cv2.COLOR_GRAY2BGR)
 
-                # Resize mask to match frame (safety)
-                mask_bgr = cv2.resize(mask_bgr, (frame.shape[1], frame.shape[0]))
+# ================= SHARED MONITOR =================
+_monitor = None
 
-                combined = cv2.hconcat([frame, mask_bgr])
-                cv2.imshow("Live Feed  |  Motion Mask", combined)
 
-                if cv2.waitKey(1) & 0xFF == ord("q"):
-                    break
+def get_motion_monitor(source=0):
+    """
+    Process-wide MotionMonitor, created (and the camera opened) on first use
+    """
+    global _monitor
 
-            # ================= MOTION TRIGGER =================
-            if motion_area > MOTION_THRESHOLD and not recording:
-                timestamp = int(time.time())
-                video_path = os.path.join(
-                    VIDEO_DIR, f"motion_{timestamp}.mp4"
-                )
+    if _monitor is None:
+        _monitor = MotionMonitor(CameraStream(source).start())
+    return _monitor
 
-                fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-                out = cv2.VideoWriter(
-                    video_path, fourcc, fps, (width, height)
-                )
 
-                recording = True
-                start_time = time.time()
-                logger.info("Motion detected → Recording 5s")
+def stop_motion_detection():
+    global _monitor
 
-            # ================= RECORD VIDEO =================
-            if recording:
-                out.write(frame)
+    if _monitor is not None:
+        _monitor.close()
+        _monitor = None
 
-                if time.time() - start_time >= RECORD_SECONDS:
-                    out.release()
-                    recording = False
 
-                    cap.release()
-                    if SHOW_VIDEO:
-                        cv2.destroyAllWindows()
+def run_motion_detection(save_rois=True, source=0):
+    """
+    Phase 1:
+    - Continuous webcam monitoring (persistent stream + background model)
+    - Motion → record 5s clip with pre-roll from the ring buffer
+    - Extract BIG ROI
+    - Return the ROI crops (list of FrameCrop) when a motion event is processed,
+      an empty list if the camera stream ended first
+
+    save_rois=False keeps the ROIs in memory only (no data/processed/roi writes).
+    source: camera used when the shared monitor is first created
+    """
+    return get_motion_monitor(source).wait_for_event(save_rois)
 
-                    logger.info("Extracting BIG ROI from recorded video")
-                    extract_big_roi(video_path)
-                    logger.info("BIG ROI extraction completed")
 
-                    return True  # move to Phase 2
+def _iter_frames(source):
+    """
+    Yield frames from a video path or from an in-memory list of frames
+    """
+    if not isinstance(source, str):
+        yield from source
+        return
 
+    cap = cv2.VideoCapture(source)
+    try:
+        while cap.isOpened():
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
     finally:
         cap.release()
-        if SHOW_VIDEO:
-            cv2.destroyAllWindows()
-
-    return False
 
 
-def extract_big_roi(video_path):
+def find_big_roi(fg_mask, scale=ROI_MASK_SCALE, mask_scale=1.0):
     """
-    Extracts BIG ROIs by merging nearby motion contours
+    Merged bounding box (x1, y1, x2, y2) of all significant motion
+    contours in fg_mask, or None. Dilation and contour search run on a
+    `scale`-downscaled mask; the box is mapped back to full resolution.
+    mask_scale: fg_mask is already at this fraction of full resolution
+    (motion processing resolution).
     """
+    h = int(round(fg_mask.shape[0] / mask_scale))
+    w = int(round(fg_mask.shape[1] / mask_scale))
+
+    inner = min(scale / mask_scale, 1.0)
+    if inner != 1:
+        small = cv2.resize(fg_mask, None, fx=inner, fy=inner, interpolation=cv2.INTER_AREA)
+        _, small = cv2.threshold(small, 63, 255, cv2.THRESH_BINARY)
+    else:
+        small = fg_mask
+
+    # Scale of `small` relative to full resolution
+    scale = mask_scale * inner
+
+    # 🔧 Merge contours
+    k = max(int(round(15 * scale)), 1)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (k, k))
+    small = cv2.dilate(small, kernel, iterations=2)
+
+    contours, _ = cv2.findContours(
+        small, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+    )
 
-    cap = cv2.VideoCapture(video_path)
+    min_area = ROI_MIN_AREA * scale * scale
+    boxes = [cv2.boundingRect(c) for c in contours if cv2.contourArea(c) >= min_area]
+    if not boxes:
+        return None
 
-    bg = cv2.createBackgroundSubtractorMOG2(
-        history=200,
-        varThreshold=50,
-        detectShadows=False
-    )
+    x1 = max(int(min(x for x, _, _, _ in boxes) / scale) - ROI_PADDING, 0)
+    y1 = max(int(min(y for _, y, _, _ in boxes) / scale) - ROI_PADDING, 0)
+    x2 = min(int(max(x + bw for x, _, bw, _ in boxes) / scale) + ROI_PADDING, w)
+    y2 = min(int(max(y + bh for _, y, _, bh in boxes) / scale) + ROI_PADDING, h)
+    return x1, y1, x2, y2
 
-    frame_id = 0
 
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
+def roi_from_mask(frame_id, frame, fg_mask):
+    """
+    FrameCrop of the BIG ROI in `frame`, or None when there is no motion.
+    fg_mask may be at a lower (processing) resolution than frame.
+    """
+    bbox = find_big_roi(fg_mask, mask_scale=fg_mask.shape[1] / frame.shape[1])
+    if bbox is None:
+        return None
 
-        frame_id += 1
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        fg_mask = bg.apply(gray)
+    x1, y1, x2, y2 = bbox
+    roi = frame[y1:y2, x1:x2]
+    if roi.size == 0:
+        return None
 
-        # 🔧 Merge contours
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 15))
-        fg_mask = cv2.dilate(fg_mask, kernel, iterations=2)
+    return FrameCrop(roi, frame_id, bbox)
 
-        contours, _ = cv2.findContours(
-            fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
-        )
 
-        xs, ys, xe, ye = [], [], [], []
+def extract_big_roi(source, save_to_disk=True, frame_ids=None):
+    """
+    Offline BIG ROI extraction (archived clips / legacy callers).
+    Live monitoring extracts ROIs online in MotionMonitor instead.
 
-        for cnt in contours:
-            if cv2.contourArea(cnt) < 3000:
-                continue
+    source: video path or list of frames
+    frame_ids: source frame ids matching `source` (default 1..N)
+    Returns a list of FrameCrop (frame_id + bbox in frame coordinates).
+    """
 
-            x, y, w, h = cv2.boundingRect(cnt)
-            xs.append(x)
-            ys.append(y)
-            xe.append(x + w)
-            ye.append(y + h)
+    engine = create_engine(MOTION_ENGINE, PROCESS_SCALE)
 
-        if not xs:
-            continue
+    rois = []
 
-        x1 = max(min(xs) - 10, 0)
-        y1 = max(min(ys) - 10, 0)
-        x2 = min(max(xe) + 10, frame.shape[1])
-        y2 = min(max(ye) + 10, frame.shape[0])
+    for index, frame in enumerate(_iter_frames(source)):
+        frame_id = frame_ids[index] if frame_ids is not None else index + 1
+        fg_mask, _ = engine.apply(frame)
 
-        roi = frame[y1:y2, x1:x2]
-        if roi.size == 0:
+        with metrics.span("roi"):
+            crop = roi_from_mask(frame_id, frame, fg_mask)
+        if crop is None:
             continue
 
-        cv2.imwrite(
-            os.path.join(ROI_DIR, f"roi_{frame_id}.jpg"),
-            roi
-        )
+        rois.append(crop)
+
+        if save_to_disk:
+            save_crop(crop, ROI_DIR)
 
-    cap.release()
\ No newline at end of file
+    return rois
@@ -0,0 +1,76 @@
+import cv2
+import numpy as np
+from core.config import settings
+from core.metrics import metrics
+
+INPUT_SIZE = settings.detection.input_size
+PAD_COLOR = (114, 114, 114)   # YOLO letterbox grey
+
+
+def letterbox(img, size=INPUT_SIZE):
+    """
+    Resize keeping aspect ratio and pad to a size×size square.
+    Returns (canvas, scale, (pad_x, pad_y)).
+    """
+    h, w = img.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = max(int(round(w * scale)), 1), max(int(round(h * scale)), 1)
+
+    pad_x = (size - new_w) // 2
+    pad_y = (size - new_h) // 2
+
+    canvas = np.full((size, size, 3), PAD_COLOR, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(
+        img, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+    )
+    return canvas, scale, (pad_x, pad_y)
+
+
+def unletterbox_boxes(boxes, scale, pad, shape):
+    """
+    Map (N, 4) xyxy boxes from letterboxed space back to the original image
+    """
+    pad_x, pad_y = pad
+    boxes = (np.asarray(boxes, dtype=np.float32) - [pad_x, pad_y, pad_x, pad_y]) / scale
+
+    h, w = shape[:2]
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h)
+    return boxes
+
+
+def detect_batched(model, images, batch_size=8, imgsz=INPUT_SIZE, conf=0.0):
+    """
+    Run a YOLO model over images of any size, `batch_size` images per forward.
+
+    Returns one list per input image (same order):
+        [(label, confidence, (x1, y1, x2, y2)), ...]   # image coordinates
+    """
+    outputs = []
+
+    for start in range(0, len(images), batch_size):
+        batch = images[start:start + batch_size]
+        boxed = [letterbox(img, imgsz) for img in batch]
+
+        with metrics.span("inference", model="yolo"):
+            results = model([b[0] for b in boxed], imgsz=imgsz, verbose=False)
+        metrics.inc("inference_images", len(batch), model="yolo")
+
+        for img, (_, scale, pad), r in zip(batch, boxed, results):
+            detections = []
+
+            if r.boxes is not None and len(r.boxes):
+                xyxy = unletterbox_boxes(r.boxes.xyxy.cpu().numpy(), scale, pad, img.shape)
+                confs = r.boxes.conf.cpu().numpy()
+                classes = r.boxes.cls.cpu().numpy().astype(int)
+
+                for box, c, k in zip(xyxy, confs, classes):
+                    if c < conf:
+                        continue
+                    detections.append(
+                        (model.names[k], float(c), tuple(int(v) for v in box))
+                    )
+
+            outputs.append(detections)
+
+    return outputs
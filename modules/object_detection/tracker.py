@@ -0,0 +1,208 @@
+import numpy as np
+from core.config import settings
+
+# ================= CONFIG =================
+DETECT_EVERY = settings.detection.detect_every   # run the detector every Nth frame, propagate in between
+IOU_THRESHOLD = 0.3    # min IoU to associate a detection with a track
+MAX_AGE = 15           # frames a track survives without a matching detection
+
+
+def _box_to_z(box):
+    x1, y1, x2, y2 = box
+    w, h = max(x2 - x1, 1), max(y2 - y1, 1)
+    return np.array([x1 + w / 2, y1 + h / 2, w * h, w / h], dtype=np.float64)
+
+
+def _z_to_box(z):
+    s, r = max(z[2], 1.0), max(z[3], 1e-3)
+    w = np.sqrt(s * r)
+    h = s / w
+    return (z[0] - w / 2, z[1] - h / 2, z[0] + w / 2, z[1] + h / 2)
+
+
+def iou_matrix(a, b):
+    """
+    (N, 4) × (M, 4) xyxy boxes → (N, M) IoU
+    """
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class KalmanBoxTrack:
+    """
+    SORT-style constant-velocity Kalman filter over (cx, cy, area, aspect)
+    """
+
+    F = np.eye(7)
+    F[0, 4] = F[1, 5] = F[2, 6] = 1.0
+    H = np.eye(4, 7)
+    Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+    R = np.diag([1.0, 1.0, 10.0, 10.0])
+
+    def __init__(self, track_id, box, label, conf, category):
+        self.track_id = track_id
+        self.label = label
+        self.conf = conf
+        self.category = category
+
+        self.x = np.zeros(7)
+        self.x[:4] = _box_to_z(box)
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 1e4, 1e4, 1e4])
+
+        self.hits = 1
+        self.age = 0
+        self.time_since_update = 0
+
+    @property
+    def box(self):
+        return _z_to_box(self.x)
+
+    def predict(self):
+        if self.x[2] + self.x[6] <= 0:
+            self.x[6] = 0.0
+
+        self.x = self.F @ self.x
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        self.age += 1
+        self.time_since_update += 1
+
+    def update(self, box, conf):
+        y = _box_to_z(box) - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+
+        self.x = self.x + K @ y
+        self.P = (np.eye(7) - K @ self.H) @ self.P
+
+        self.conf = conf
+        self.hits += 1
+        self.time_since_update = 0
+
+
+class Tracker:
+    """
+    Lightweight multi-object tracker (SORT-like): Kalman prediction +
+    greedy IoU association per label. Gives every object a stable track ID,
+    so two intruders with the same label stay two tracks.
+    """
+
+    def __init__(self, iou_threshold=IOU_THRESHOLD, max_age=MAX_AGE):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.tracks = []
+        self._next_id = 1
+
+    def _outputs(self):
+        outputs = []
+        for t in self.tracks:
+            x1, y1, x2, y2 = (int(round(v)) for v in t.box)
+            outputs.append((t.track_id, t.label, t.conf, x1, y1, x2, y2, t.category))
+        return outputs
+
+    def observed(self):
+        """
+        IDs of the tracks matched to a real detection in the last update()
+        (the others in the output are Kalman predictions)
+        """
+        return {t.track_id for t in self.tracks if t.time_since_update == 0}
+
+    def _prune(self):
+        self.tracks = [t for t in self.tracks if t.time_since_update <= self.max_age]
+
+    def predict(self):
+        """
+        Frame without detections: propagate every track by its velocity
+        """
+        for t in self.tracks:
+            t.predict()
+        self._prune()
+        return self._outputs()
+
+    def update(self, detections):
+        """
+        detections: [(label, conf, x1, y1, x2, y2, category), ...]
+        Returns [(track_id, label, conf, x1, y1, x2, y2, category), ...]
+        """
+        for t in self.tracks:
+            t.predict()
+
+        unmatched = list(range(len(detections)))
+
+        if self.tracks and detections:
+            ious = iou_matrix(
+                [t.box for t in self.tracks], [d[2:6] for d in detections]
+            )
+            # Associate only objects of the same label
+            for ti, t in enumerate(self.tracks):
+                for di, d in enumerate(detections):
+                    if d[0] != t.label:
+                        ious[ti, di] = 0.0
+
+            # Greedy: highest IoU pairs first
+            for flat in np.argsort(-ious, axis=None):
+                ti, di = np.unravel_index(flat, ious.shape)
+                if ious[ti, di] < self.iou_threshold:
+                    break
+                if di not in unmatched or self.tracks[ti].time_since_update == 0:
+                    continue
+
+                self.tracks[ti].update(detections[di][2:6], detections[di][1])
+                unmatched.remove(di)
+
+        for di in unmatched:
+            label, conf, x1, y1, x2, y2, category = detections[di]
+            self.tracks.append(
+                KalmanBoxTrack(self._next_id, (x1, y1, x2, y2), label, conf, category)
+            )
+            self._next_id += 1
+
+        self._prune()
+        return self._outputs()
+
+
+class TrackedDetector:
+    """
+    Runs the wrapped detector only every `detect_every` frames (or sooner
+    while a new track still needs a second observation) and propagates
+    track boxes with the Kalman filter in between.
+
+    detect(frame) → [(track_id, label, conf, x1, y1, x2, y2, category), ...]
+    observed() → track IDs backed by a detection in that frame
+    """
+
+    def __init__(self, detector, detect_every=DETECT_EVERY, tracker=None):
+        self.detector = detector
+        self.detect_every = detect_every
+        self.tracker = tracker or Tracker(max_age=max(MAX_AGE, 3 * detect_every))
+        self._frames_since_detect = detect_every   # detect on the first frame
+        self.detector_calls = 0
+
+    def reset(self):
+        self.tracker = Tracker(self.tracker.iou_threshold, self.tracker.max_age)
+        self._frames_since_detect = self.detect_every
+
+    def _stale(self):
+        return any(t.hits < 2 for t in self.tracker.tracks)
+
+    def observed(self):
+        return self.tracker.observed()
+
+    def detect(self, frame):
+        if self._frames_since_detect >= self.detect_every or self._stale():
+            self._frames_since_detect = 1
+            self.detector_calls += 1
+            return self.tracker.update(self.detector.detect(frame))
+
+        self._frames_since_detect += 1
+        return self.tracker.predict()
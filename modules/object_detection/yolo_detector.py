@@ -1,14 +1,19 @@
 import os
-import cv2
-import shutil
-from ultralytics import YOLO
+from core.config import settings
 from core.logger import logger
+from core.metrics import metrics
+from core.model_registry import get_yolo
+from modules.object_detection.batch_inference import INPUT_SIZE, detect_batched
 from modules.alarm.alarm import trigger_alarm
+from modules.utils.frame_crop import load_crops, save_crop
 
-ROI_DIR = "data/processed/roi"
-DET_DIR = "data/processed/detection"
+ROI_DIR = settings.paths.roi_dir
+DET_DIR = settings.paths.detection_dir
 
-CONF_TH = 0.85
+YOLO_WEIGHTS = settings.detection.yolo_weights   # e.g. "models/yolov8/best.pt"
+
+CONF_TH = settings.detection.conf_threshold
+BATCH_SIZE = settings.detection.batch_size   # ROI crops per YOLO forward pass
 
 ANIMALS = {"cat", "dog", "cow", "horse", "sheep", "bird"}
 
@@ -16,78 +21,128 @@ def ensure_dirs():
     for d in ["person", "cat", "dog", "cow", "other"]:
         os.makedirs(os.path.join(DET_DIR, d), exist_ok=True)
 
-def run_object_detection():
-    """
-    Phase 2 – Object Detection
-    Returns:
-        {
-            "threat_found": bool,
-            "person_found": bool
-        }
-    """
-    ensure_dirs()
-    logger.info("Running Phase 2 – Object Detection")
+def categorize(label):
+    if label == "person":
+        return "intrusion"
+    if label in ANIMALS:
+        return "animal"
+    return "object"
 
-    model = YOLO("yolov8n.pt")
 
-    threat_found = False
-    person_found = False
-
-    for name in os.listdir(ROI_DIR):
-        path = os.path.join(ROI_DIR, name)
+class YOLODetector:
+    """
+    Frame-level detector (dashboard).
+    Uses the shared YOLO instance from the model registry.
 
-        if not os.path.exists(path):
-            continue
+    detect(frame) → [(label, conf, x1, y1, x2, y2, category), ...]
+    category: "intrusion" | "animal" | "object"
+    """
 
-        img = cv2.imread(path)
-        if img is None:
-            continue
+    def __init__(self, weights=YOLO_WEIGHTS, conf=CONF_TH):
+        self.model = get_yolo(weights)
+        self.conf = conf
 
-        results = model(img, verbose=False)
-        detected_any = False
+    def detect(self, frame):
+        detections = []
 
-        for r in results:
+        for r in self.model(frame, verbose=False):
             if r.boxes is None:
                 continue
 
             for box in r.boxes:
-                cls = int(box.cls[0])
                 conf = float(box.conf[0])
-                label = model.names[cls]
-
-                if conf < CONF_TH:
+                if conf < self.conf:
                     continue
 
-                detected_any = True
+                label = self.model.names[int(box.cls[0])]
+                x1, y1, x2, y2 = (int(v) for v in box.xyxy[0])
+                detections.append((label, conf, x1, y1, x2, y2, categorize(label)))
 
-                # 🧍 PERSON → THREAT
-                if label == "person":
-                    save_path = os.path.join(DET_DIR, "person", name)
-                    shutil.copy(path, save_path)
+        return detections
 
-                    logger.critical(f"🚨 PERSON DETECTED ({conf:.2f}) → {name}")
+
+def run_object_detection(crops=None, save_to_disk=None, batch_size=BATCH_SIZE):
+    """
+    Phase 2 – Object Detection
+
+    crops: in-memory ROI crops from Phase 1 (list of FrameCrop).
+           None → legacy mode, ROIs are read from ROI_DIR.
+    save_to_disk: copy routed ROIs into DET_DIR/<label>
+           (defaults to True in legacy mode, False in memory)
+    batch_size: ROIs per YOLO forward pass (letterboxed to INPUT_SIZE)
+
+    Returns:
+        {
+            "threat_found": bool,
+            "person_found": bool,
+            "persons": [FrameCrop]   # one per person box (frame coordinates), input to Phase 3
+        }
+    """
+    if crops is None:
+        crops = load_crops(ROI_DIR)
+        if save_to_disk is None:
+            save_to_disk = True
+
+    if save_to_disk:
+        ensure_dirs()
+    logger.info("Running Phase 2 – Object Detection")
+
+    model = get_yolo(YOLO_WEIGHTS)
+
+    threat_found = False
+    person_found = False
+    persons = []
+
+    all_detections = detect_batched(
+        model,
+        [crop.image for crop in crops],
+        batch_size=batch_size,
+        imgsz=INPUT_SIZE,
+        conf=CONF_TH
+    )
+
+    for crop, detections in zip(crops, all_detections):
+        img = crop.image
+        name = crop.filename
+        routed = {}   # label dir → best confidence for this ROI
+
+        for label, conf, (x1, y1, x2, y2) in detections:
+
+            # 🧍 PERSON → THREAT
+            if label == "person":
+                target = "person"
+                persons.append(crop.sub_crop(x1, y1, x2, y2, label="person", confidence=conf))
+
+                logger.critical(f"🚨 PERSON DETECTED ({conf:.2f}) → {name}")
+                with metrics.span("alarm_dispatch"):
                     trigger_alarm(img)
+                metrics.inc("alarms")
 
-                    threat_found = True
-                    person_found = True
+                threat_found = True
+                person_found = True
 
-                # 🐕 ANIMALS → NOT A THREAT
-                elif label in ANIMALS:
-                    save_path = os.path.join(DET_DIR, label, name)
-                    shutil.copy(path, save_path)
-                    logger.info(f"Animal detected ({label})")
+            # 🐕 ANIMALS → NOT A THREAT
+            elif label in ANIMALS:
+                target = label
+                logger.info(f"Animal detected ({label})")
 
-                # 📦 OTHER OBJECTS
-                else:
-                    save_path = os.path.join(DET_DIR, "other", name)
-                    shutil.copy(path, save_path)
-                    logger.info(f"Object detected ({label})")
+            # 📦 OTHER OBJECTS
+            else:
+                target = "other"
+                logger.info(f"Object detected ({label})")
+
+            routed[target] = max(conf, routed.get(target, 0.0))
 
         # Nothing detected at all
-        if not detected_any:
-            shutil.copy(path, os.path.join(DET_DIR, "other", name))
+        if not routed and save_to_disk:
+            save_crop(crop, os.path.join(DET_DIR, "other"))
+
+        if save_to_disk:
+            for target in routed:
+                save_crop(crop, os.path.join(DET_DIR, target))
 
     return {
         "threat_found": threat_found,
-        "person_found": person_found
+        "person_found": person_found,
+        "persons": persons
     }
@@ -0,0 +1,178 @@
+import time
+import threading
+from collections import deque
+
+from core.config import settings
+from core.logger import logger
+
+# ================= CONFIG =================
+BATCH_SIZE = settings.runtime.scheduler_batch_size
+MAX_BATCH_WAIT = 0.02     # seconds to wait for a batch to fill up
+LATENCY_BUDGET = 2.0      # seconds an item may wait before it is dropped
+MAX_PENDING = 256         # per camera; oldest item dropped beyond this
+
+
+class InferenceScheduler:
+    """
+    One shared inference worker for many cameras.
+
+    Every camera submits items into its own pending queue. The worker forms
+    cross-camera batches fairly: one item per camera per turn, the camera
+    whose oldest item is closest to its latency budget first, so a busy
+    camera cannot starve the quiet ones. Items that outlived their camera's
+    budget are dropped instead of wasting model time.
+
+    process_batch(items) must return one result per item (same order);
+    each item's callback(result, latency_seconds) is invoked afterwards.
+    """
+
+    def __init__(
+        self,
+        process_batch,
+        batch_size=BATCH_SIZE,
+        max_wait=MAX_BATCH_WAIT,
+        latency_budget=LATENCY_BUDGET,
+        max_pending=MAX_PENDING
+    ):
+        self.process_batch = process_batch
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.latency_budget = latency_budget
+        self.max_pending = max_pending
+
+        self._pending = {}    # camera_id → deque[(submitted_at, item, callback)]
+        self._budgets = {}    # camera_id → seconds
+        self._stats = {}      # camera_id → counters
+        self._cond = threading.Condition()
+        self._thread = None
+        self.running = False
+
+    # ---------------- CAMERAS ----------------
+    def add_camera(self, camera_id, latency_budget=None):
+        with self._cond:
+            self._pending.setdefault(camera_id, deque())
+            self._budgets[camera_id] = latency_budget or self.latency_budget
+            self._stats.setdefault(camera_id, {
+                "submitted": 0, "processed": 0,
+                "dropped_full": 0, "dropped_stale": 0,
+                "last_latency": None
+            })
+
+    def submit(self, camera_id, item, callback=None):
+        with self._cond:
+            if camera_id not in self._pending:
+                self.add_camera(camera_id)
+
+            queue = self._pending[camera_id]
+            stats = self._stats[camera_id]
+
+            if len(queue) >= self.max_pending:
+                queue.popleft()
+                stats["dropped_full"] += 1
+
+            queue.append((time.monotonic(), item, callback))
+            stats["submitted"] += 1
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                camera_id: dict(counters, pending=len(self._pending[camera_id]))
+                for camera_id, counters in self._stats.items()
+            }
+
+    # ---------------- LIFECYCLE ----------------
+    def start(self):
+        if self.running:
+            return self
+
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="inference", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # ---------------- BATCHING ----------------
+    def _pending_count(self):
+        return sum(len(q) for q in self._pending.values())
+
+    def _drop_stale(self, now):
+        for camera_id, queue in self._pending.items():
+            budget = self._budgets[camera_id]
+            while queue and now - queue[0][0] > budget:
+                queue.popleft()
+                self._stats[camera_id]["dropped_stale"] += 1
+
+    def next_batch(self, timeout=None):
+        """
+        Block until items are pending, then form one fair cross-camera batch:
+        [(camera_id, submitted_at, item, callback), ...]
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._pending_count() or not self.running, timeout
+            ):
+                return []
+
+            # Give the batch a short chance to fill up
+            deadline = time.monotonic() + self.max_wait
+            while self.running and self._pending_count() < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            now = time.monotonic()
+            self._drop_stale(now)
+
+            batch = []
+            while len(batch) < self.batch_size:
+                cameras = [c for c, q in self._pending.items() if q]
+                if not cameras:
+                    break
+
+                # Most urgent camera (oldest item vs. its budget) first
+                cameras.sort(key=lambda c: self._pending[c][0][0] + self._budgets[c])
+
+                for camera_id in cameras:
+                    if len(batch) >= self.batch_size:
+                        break
+                    submitted_at, item, callback = self._pending[camera_id].popleft()
+                    batch.append((camera_id, submitted_at, item, callback))
+
+            return batch
+
+    def _run(self):
+        while self.running:
+            batch = self.next_batch(timeout=0.5)
+            if not batch:
+                continue
+
+            try:
+                results = self.process_batch([entry[2] for entry in batch])
+            except Exception as e:
+                logger.error(f"Shared inference batch failed: {e}")
+                continue
+
+            done = time.monotonic()
+            for (camera_id, submitted_at, _, callback), result in zip(batch, results):
+                latency = done - submitted_at
+
+                with self._cond:
+                    stats = self._stats[camera_id]
+                    stats["processed"] += 1
+                    stats["last_latency"] = latency
+
+                if callback is not None:
+                    try:
+                        callback(result, latency)
+                    except Exception as e:
+                        logger.error(f"Inference callback failed ({camera_id}): {e}")
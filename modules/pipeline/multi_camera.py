@@ -0,0 +1,125 @@
+import time
+import threading
+
+from core.logger import logger
+from modules.capture.camera_stream import CameraStream, parse_source
+from modules.motion_detection.motion_detector import MotionMonitor
+from modules.object_detection.yolo_detector import run_object_detection
+from modules.face_detection.face_detector import detect_and_extract_faces
+from modules.face_recognition.face_recognizer import recognize_faces
+from modules.pipeline.inference_scheduler import InferenceScheduler
+
+STATS_INTERVAL = 30   # seconds between per-camera scheduler summaries
+
+
+def analyse_crops(crops):
+    """
+    Shared Phase 2–4 worker over a cross-camera batch of ROI crops.
+    One batched YOLO pass, then face detection + recognition on persons.
+
+    Returns per crop (input order):
+        {"person": bool, "faces": [recognition result, ...]}
+    """
+    results = [{"person": False, "faces": []} for _ in crops]
+    slot = {(c.camera_id, c.frame_id): i for i, c in enumerate(crops)}
+
+    detection = run_object_detection(crops, save_to_disk=False, batch_size=len(crops))
+    for person in detection["persons"]:
+        results[slot[(person.camera_id, person.frame_id)]]["person"] = True
+
+    if detection["persons"]:
+        faces = detect_and_extract_faces(detection["persons"], save_to_disk=False)
+        for match in recognize_faces(faces) if faces else []:
+            face = match["face"]
+            results[slot[(face.camera_id, face.frame_id)]]["faces"].append(match)
+
+    return results
+
+
+class CameraWorker:
+    """
+    Per-camera motion gating: a CameraStream + warm MotionMonitor on its own
+    thread. Motion ROIs are submitted to the shared InferenceScheduler.
+    """
+
+    def __init__(self, camera_id, source, scheduler, latency_budget=None):
+        self.camera_id = camera_id
+        self.monitor = MotionMonitor(CameraStream(source), camera_id=camera_id, show=False)
+        self.scheduler = scheduler
+        self.scheduler.add_camera(camera_id, latency_budget)
+        self._thread = None
+
+    def start(self):
+        self.monitor.stream.start()
+        self._thread = threading.Thread(
+            target=self._run, name=f"motion-{self.camera_id}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.monitor.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    @property
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self.monitor.stream.ended:
+            rois = self.monitor.wait_for_event(save_rois=False)
+            for roi in rois:
+                self.scheduler.submit(self.camera_id, roi, self._on_result)
+
+        logger.info(f"Camera {self.camera_id} stream ended")
+
+    def _on_result(self, result, latency):
+        if result["person"]:
+            logger.critical(
+                f"🚨 [{self.camera_id}] PERSON confirmed ({latency * 1000:.0f} ms)"
+            )
+        for match in result["faces"]:
+            name = match["identity"]["name"] if match["known"] else "UNKNOWN"
+            logger.warning(
+                f"[{self.camera_id}] Face: {name} | Similarity={match['similarity']:.2f}"
+            )
+
+
+def run_multi_camera(sources, latency_budgets=None):
+    """
+    N camera sources (device indices, files, RTSP URLs) in one process,
+    sharing ONE set of models through one batched inference worker.
+
+    sources: list of sources, or {camera_id: source}
+    latency_budgets: optional {camera_id: seconds}
+    """
+    if not isinstance(sources, dict):
+        sources = {f"cam{i}": source for i, source in enumerate(sources)}
+    latency_budgets = latency_budgets or {}
+
+    scheduler = InferenceScheduler(analyse_crops).start()
+    workers = [
+        CameraWorker(camera_id, parse_source(source), scheduler,
+                     latency_budgets.get(camera_id)).start()
+        for camera_id, source in sources.items()
+    ]
+    logger.info(f"Multi-camera monitoring started: {list(sources)}")
+
+    try:
+        last_stats = time.monotonic()
+        while any(worker.alive for worker in workers):
+            time.sleep(1)
+
+            if time.monotonic() - last_stats >= STATS_INTERVAL:
+                last_stats = time.monotonic()
+                for camera_id, stats in scheduler.stats().items():
+                    logger.info(f"[{camera_id}] scheduler {stats}")
+
+    except KeyboardInterrupt:
+        logger.info("Multi-camera monitoring stopped by user")
+
+    finally:
+        for worker in workers:
+            worker.stop()
+        scheduler.stop()
@@ -0,0 +1,113 @@
+import time
+import queue
+import threading
+from collections import deque
+
+from core.metrics import metrics
+
+POLICIES = ("block", "drop_oldest", "drop_newest")
+
+
+class BoundedQueue:
+    """
+    Bounded FIFO between pipeline stages with an explicit overload policy:
+
+    - block:        put() waits for space (backpressure on the producer)
+    - drop_oldest:  put() evicts the oldest queued item (freshest data wins)
+    - drop_newest:  put() discards the new item (queued work wins)
+
+    get() raises queue.Empty on timeout, like the stdlib queue.
+    """
+
+    def __init__(self, maxsize, policy="block", name=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overload policy: {policy} (use one of {POLICIES})")
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.name = name
+
+        self._items = deque()   # (enqueued_at, item)
+        self._cond = threading.Condition()
+        self.closed = False
+
+        self.put_count = 0
+        self.dropped = 0
+        self._wait_total = 0.0
+        self._get_count = 0
+
+        if name:
+            metrics.gauge_fn("queue_depth", len, owner=self, queue=name)
+            metrics.gauge_fn("queue_dropped", lambda q: q.dropped, owner=self, queue=name)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+    @property
+    def depth(self):
+        return len(self)
+
+    def put(self, item, timeout=None):
+        """
+        Returns True if the item was queued, False if it was dropped
+        (drop_newest, closed queue, or block timeout).
+        """
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                if self.policy == "drop_oldest":
+                    self._items.popleft()
+                    self.dropped += 1
+
+                elif self.policy == "drop_newest":
+                    self.dropped += 1
+                    return False
+
+                elif not self._cond.wait_for(
+                    lambda: len(self._items) < self.maxsize or self.closed, timeout
+                ):
+                    self.dropped += 1
+                    return False
+
+            if self.closed:
+                return False
+
+            self._items.append((time.monotonic(), item))
+            self.put_count += 1
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self.closed, timeout):
+                raise queue.Empty
+
+            if not self._items:
+                raise queue.Empty
+
+            enqueued_at, item = self._items.popleft()
+            self._wait_total += time.monotonic() - enqueued_at
+            self._get_count += 1
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """
+        Wake every blocked producer / consumer; further puts are refused
+        """
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "depth": len(self._items),
+                "maxsize": self.maxsize,
+                "policy": self.policy,
+                "put": self.put_count,
+                "dropped": self.dropped,
+                "avg_wait_ms": 1000 * self._wait_total / self._get_count if self._get_count else 0.0,
+            }
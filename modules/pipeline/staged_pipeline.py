@@ -0,0 +1,115 @@
+import time
+
+from core.config import settings
+from core.logger import logger
+from modules.capture.camera_stream import CameraStream, parse_source
+from modules.motion_detection.motion_detector import MotionMonitor
+from modules.object_detection.yolo_detector import run_object_detection
+from modules.face_detection.face_detector import detect_and_extract_faces
+from modules.face_recognition.face_recognizer import recognize_faces
+from modules.pipeline.queues import BoundedQueue
+from modules.pipeline.stages import Stage
+
+# ================= CONFIG =================
+QUEUE_SIZE = settings.runtime.queue_size
+# Overload policy per hand-off queue: block | drop_oldest | drop_newest
+QUEUE_POLICIES = {
+    "events": "drop_oldest",    # motion → detection: newest events matter most
+    "persons": "drop_oldest",   # detection → face detection
+    "faces": "block",           # face detection → recognition
+}
+STATS_INTERVAL = 30   # seconds between stage summaries in the log
+
+
+class StagedPipeline:
+    """
+    Phases 1–4 as concurrent stages connected by bounded queues.
+
+    motion ─events→ detection ─persons→ faces ─faces→ recognition
+
+    The motion stage never waits on analysis: it keeps reading the
+    camera at full rate and hands events over according to the queue's
+    overload policy, while older events are still being analysed.
+    """
+
+    def __init__(self, source=0, queue_size=QUEUE_SIZE, policies=None):
+        policies = {**QUEUE_POLICIES, **(policies or {})}
+        self.queues = {
+            name: BoundedQueue(queue_size, policies[name], name)
+            for name in ("events", "persons", "faces")
+        }
+
+        self.monitor = MotionMonitor(CameraStream(parse_source(source)), show=False)
+
+        self.stages = [
+            Stage("motion", self._motion_events, outbox=self.queues["events"]),
+            Stage("detection", self._detect, self.queues["events"], self.queues["persons"]),
+            Stage("faces", self._faces, self.queues["persons"], self.queues["faces"]),
+            Stage("recognition", recognize_faces, self.queues["faces"]),
+        ]
+
+    # ---------------- STAGE FUNCTIONS ----------------
+    def _motion_events(self):
+        while not self.monitor.stream.ended:
+            rois = self.monitor.wait_for_event(save_rois=False)
+            if rois:
+                yield rois
+
+    @staticmethod
+    def _detect(rois):
+        result = run_object_detection(rois, save_to_disk=False)
+        return result["persons"] or None
+
+    @staticmethod
+    def _faces(persons):
+        return detect_and_extract_faces(persons, save_to_disk=False) or None
+
+    # ---------------- LIFECYCLE ----------------
+    def start(self):
+        self.monitor.stream.start()
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    def stop(self):
+        self.monitor.close()
+        for q in self.queues.values():
+            q.close()
+        for stage in self.stages:
+            stage.stop()
+
+    def stats(self):
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def log_stats(self):
+        for name, stats in self.stats().items():
+            depth = ""
+            if "queue" in stats:
+                q = stats["queue"]
+                depth = f" depth={q['depth']}/{q['maxsize']} dropped={q['dropped']}"
+            logger.info(
+                f"[stage {name}] processed={stats['processed']} "
+                f"p50={stats['latency_p50_ms']:.0f}ms p95={stats['latency_p95_ms']:.0f}ms{depth}"
+            )
+
+    def run_forever(self, stats_interval=STATS_INTERVAL):
+        self.start()
+        last_stats = time.monotonic()
+
+        try:
+            while self.stages[0].alive:
+                time.sleep(0.5)
+                if time.monotonic() - last_stats >= stats_interval:
+                    last_stats = time.monotonic()
+                    self.log_stats()
+
+        except KeyboardInterrupt:
+            logger.info("Staged pipeline stopped by user")
+
+        finally:
+            self.stop()
+            self.log_stats()
+
+
+def run_staged_pipeline(source=0):
+    StagedPipeline(source).run_forever()
@@ -0,0 +1,110 @@
+import time
+import queue
+import threading
+from collections import deque
+
+import numpy as np
+from core.logger import logger
+
+LATENCY_WINDOW = 200   # recent samples kept for percentiles
+
+
+class Stage:
+    """
+    One pipeline stage on its own thread: inbox → fn(item) → outbox.
+
+    fn returning None means "nothing to forward" (e.g. no threat found).
+    Without an inbox the stage is a source: fn is an iterator factory
+    whose items are pushed to the outbox until it is exhausted.
+    """
+
+    def __init__(self, name, fn, inbox=None, outbox=None):
+        self.name = name
+        self.fn = fn
+        self.inbox = inbox
+        self.outbox = outbox
+
+        self.running = False
+        self.processed = 0
+        self.errors = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # ---------------- LIFECYCLE ----------------
+    def start(self):
+        self.running = True
+        target = self._run_source if self.inbox is None else self._run
+        self._thread = threading.Thread(target=target, name=f"stage-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    @property
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # ---------------- LOOPS ----------------
+    def _emit(self, output):
+        if output is not None and self.outbox is not None:
+            self.outbox.put(output)
+
+    def _record(self, started):
+        with self._lock:
+            self.processed += 1
+            self._latencies.append(time.perf_counter() - started)
+
+    def _run_source(self):
+        iterator = iter(self.fn())
+        while self.running:
+            started = time.perf_counter()
+            try:
+                output = next(iterator)
+            except StopIteration:
+                break
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Stage {self.name} failed: {e}")
+                break
+
+            self._record(started)
+            self._emit(output)
+
+        logger.info(f"Source stage {self.name} finished")
+
+    def _run(self):
+        while self.running:
+            try:
+                item = self.inbox.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            started = time.perf_counter()
+            try:
+                output = self.fn(item)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Stage {self.name} failed: {e}")
+                continue
+
+            self._record(started)
+            self._emit(output)
+
+    # ---------------- STATS ----------------
+    def stats(self):
+        with self._lock:
+            samples = np.array(self._latencies) * 1000
+
+        stats = {
+            "processed": self.processed,
+            "errors": self.errors,
+            "latency_p50_ms": float(np.percentile(samples, 50)) if len(samples) else 0.0,
+            "latency_p95_ms": float(np.percentile(samples, 95)) if len(samples) else 0.0,
+        }
+        if self.inbox is not None:
+            stats["queue"] = self.inbox.stats()
+        return stats
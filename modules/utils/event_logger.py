@@ -1,32 +1,279 @@
-import json
 import os
+import gzip
+import json
+import time
+import atexit
+import shutil
+import weakref
+import threading
+from collections import deque
 from datetime import datetime
 
+from core.config import settings
+from core.logger import logger
+from core.metrics import metrics
+
+# ================= CONFIG =================
+LOG_DIR = settings.paths.log_dir
+FLUSH_SIZE = 64                  # write as soon as this many events are pending
+FLUSH_INTERVAL = 1.0             # ... or at least this often (seconds)
+FSYNC_POLICY = "interval"        # none | interval | batch
+FSYNC_INTERVAL = 5.0             # seconds between fsyncs for "interval"
+MAX_BYTES = 10 * 1024 * 1024     # rotate events.jsonl beyond this size
+ROTATE_SECONDS = 24 * 3600       # ... or when this time bucket changes
+COMPRESS_ROTATED = True          # gzip rotated segments
+MAX_PENDING = 10000              # oldest unwritten events dropped beyond this
+
+FSYNC_POLICIES = ("none", "interval", "batch")
+
+# Loggers still open; closed once at interpreter exit. Weak, so a logger
+# dropped by its owner (e.g. a finished dashboard session) is not kept alive.
+_open_loggers = weakref.WeakSet()
+
+
+def _close_open_loggers():
+    for event_logger in list(_open_loggers):
+        event_logger.close()
+
+
+atexit.register(_close_open_loggers)
+
+
+def _run_writer(ref):
+    """
+    Writer thread body. Holds the logger only weakly between batches,
+    so the thread never keeps an unreferenced logger alive.
+    """
+    while True:
+        event_logger = ref()
+        if event_logger is None or not event_logger._writer_step():
+            return
+        del event_logger
+
+
+def _write_leftovers(pending, log_file, store):
+    """
+    Finalizer of a logger collected without close(): append what is pending
+    """
+    batch = list(pending)
+    if not batch:
+        return
+    with open(log_file, "a") as f:
+        f.write("".join(json.dumps(event) + "\n" for event in batch))
+    if store is not None:
+        try:
+            store.insert_many(batch)
+        except Exception as e:
+            logger.error(f"❌ Event store insert failed: {e}")
+
+
 class EventLogger:
-    def __init__(self, log_dir="logs", max_events=50):
+    """
+    Single event sink.
+
+    log() is O(1) and never touches the disk: the event goes into an
+    in-memory ring buffer (UI history) and a pending queue. A background
+    writer appends pending events to events.jsonl in batches (on size or
+    interval), applies the fsync policy and rotates / compresses segments.
+    With an EventStore attached, each batch is also bulk-inserted there.
+    """
+
+    def __init__(
+        self,
+        log_dir=LOG_DIR,
+        max_events=50,
+        flush_size=FLUSH_SIZE,
+        flush_interval=FLUSH_INTERVAL,
+        fsync=FSYNC_POLICY,
+        max_bytes=MAX_BYTES,
+        rotate_seconds=ROTATE_SECONDS,
+        compress=COMPRESS_ROTATED,
+        store=None
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync} (use one of {FSYNC_POLICIES})")
+
         self.max_events = max_events
-        self.events = []
+        self.events = deque(maxlen=max_events)   # newest first
         self.log_dir = log_dir
         os.makedirs(log_dir, exist_ok=True)
         self.log_file = os.path.join(log_dir, "events.jsonl")
 
-    def log(self, event_type, label, confidence=None, snapshot_path=None):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.compress = compress
+        self.store = store
+
+        self.dropped = 0
+        self.written = 0
+
+        self._pending = deque(maxlen=MAX_PENDING)
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._file = None
+        self._bucket = None
+        self._last_fsync = time.monotonic()
+
+        self._running = True
+        self._thread = threading.Thread(
+            target=_run_writer, args=(weakref.ref(self),), name="event-writer", daemon=True
+        )
+        self._thread.start()
+
+        _open_loggers.add(self)
+        self._finalizer = weakref.finalize(self, _write_leftovers, self._pending, self.log_file, store)
+        self._finalizer.atexit = False   # exit is handled by _close_open_loggers
+
+    # ---------------- PRODUCERS ----------------
+    def log(self, event_type, label, confidence=None, snapshot_path=None, track_id=None, camera_id=None):
+        now = time.time()
         event = {
-            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "time": datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"),
+            "ts": now,
             "type": event_type,
             "label": label,
             "confidence": confidence,
-            "snapshot": snapshot_path
+            "snapshot": snapshot_path,
+            "track_id": track_id,
+            "camera_id": camera_id
         }
 
-        # UI history
-        self.events.insert(0, event)
-        if len(self.events) > self.max_events:
-            self.events.pop()
+        with self._cond:
+            # UI history (ring buffer)
+            self.events.appendleft(event)
+
+            # Persistent log, written by the background writer
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append(event)
 
-        # Persistent log (append-only)
-        with open(self.log_file, "a") as f:
-            f.write(json.dumps(event) + "\n")
+            if len(self._pending) >= self.flush_size:
+                self._cond.notify()
+
+        return event
 
     def get_events(self):
-        return self.events
\ No newline at end of file
+        with self._cond:
+            return list(self.events)
+
+    # ---------------- WRITER ----------------
+    def _drain(self):
+        with self._cond:
+            batch = list(self._pending)
+            self._pending.clear()
+        return batch
+
+    def _writer_step(self):
+        """
+        Wait for a batch (size or interval), write it. False once closed.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: len(self._pending) >= self.flush_size or not self._running,
+                timeout=self.flush_interval
+            )
+            running = self._running
+
+        self._write_pending()
+        return running
+
+    def _write_pending(self):
+        """
+        Take the pending batch and write it under one lock, so concurrent
+        flushes cannot reorder batches in events.jsonl or the store
+        """
+        with self._write_lock:
+            batch = self._drain()
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        # Caller holds _write_lock
+        with metrics.span("disk_io", op="events"):
+            self._maybe_rotate()
+
+            if self._file is None:
+                self._file = open(self.log_file, "a")
+
+            self._file.write("".join(json.dumps(event) + "\n" for event in batch))
+            self._file.flush()
+            self.written += len(batch)
+
+            now = time.monotonic()
+            if self.fsync == "batch" or (
+                self.fsync == "interval" and now - self._last_fsync >= FSYNC_INTERVAL
+            ):
+                os.fsync(self._file.fileno())
+                self._last_fsync = now
+
+            if self.store is not None:
+                try:
+                    self.store.insert_many(batch)
+                except Exception as e:
+                    # The JSONL segment stays the source of truth; import it later
+                    logger.error(f"❌ Event store insert failed: {e}")
+
+    # ---------------- ROTATION ----------------
+    def _time_bucket(self, timestamp):
+        return int(timestamp // self.rotate_seconds) if self.rotate_seconds else 0
+
+    def _maybe_rotate(self):
+        if not os.path.exists(self.log_file):
+            self._bucket = self._time_bucket(time.time())
+            return
+
+        if self._bucket is None:
+            self._bucket = self._time_bucket(os.path.getmtime(self.log_file))
+
+        current = self._time_bucket(time.time())
+        too_big = self.max_bytes and os.path.getsize(self.log_file) >= self.max_bytes
+
+        if not too_big and current == self._bucket:
+            return
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        rotated = os.path.join(self.log_dir, f"events.{stamp}.jsonl")
+        suffix = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated = os.path.join(self.log_dir, f"events.{stamp}_{suffix}.jsonl")
+            suffix += 1
+
+        os.replace(self.log_file, rotated)
+        self._bucket = current
+
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+
+    # ---------------- LIFECYCLE ----------------
+    def flush(self):
+        """
+        Synchronously write everything pending (tests, shutdown)
+        """
+        self._write_pending()
+
+    def close(self):
+        self._finalizer.detach()
+        _open_loggers.discard(self)
+
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+        self._thread.join(timeout=5)
+        self.flush()
+
+        with self._write_lock:
+            if self._file is not None:
+                if self.fsync != "none":
+                    os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
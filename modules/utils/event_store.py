@@ -0,0 +1,291 @@
+import os
+import csv
+import glob
+import gzip
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from core.config import settings
+from core.logger import logger
+
+# ================= CONFIG =================
+DB_PATH = os.path.join(settings.paths.log_dir, "events.db")
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id          INTEGER PRIMARY KEY,
+    ts          REAL NOT NULL,
+    time        TEXT NOT NULL,
+    type        TEXT NOT NULL,
+    label       TEXT,
+    confidence  REAL,
+    camera_id   TEXT,
+    track_id    INTEGER,
+    snapshot    TEXT,
+    source      TEXT NOT NULL DEFAULT 'live',
+    extra       TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events (type, ts);
+CREATE INDEX IF NOT EXISTS idx_events_label_ts ON events (label, ts);
+CREATE INDEX IF NOT EXISTS idx_events_camera_ts ON events (camera_id, ts);
+CREATE INDEX IF NOT EXISTS idx_events_track ON events (track_id);
+
+CREATE TABLE IF NOT EXISTS imports (
+    path        TEXT PRIMARY KEY,
+    rows        INTEGER NOT NULL,
+    imported_at TEXT NOT NULL
+);
+"""
+
+COLUMNS = ("time", "type", "label", "confidence", "camera_id", "track_id", "snapshot", "source", "extra")
+
+
+def to_timestamp(value):
+    """
+    datetime / "YYYY-mm-dd HH:MM:SS" / epoch seconds → epoch seconds
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.strptime(value, TIME_FORMAT).timestamp()
+
+
+def _row(event, source="live"):
+    ts = event.get("ts")
+    if ts is None:
+        ts = to_timestamp(event.get("time")) if event.get("time") else datetime.now().timestamp()
+
+    known = {"ts", "time", "type", "label", "confidence", "camera_id", "track_id", "snapshot"}
+    extra = {k: v for k, v in event.items() if k not in known}
+
+    confidence = event.get("confidence")
+    track_id = event.get("track_id")
+    camera_id = event.get("camera_id")
+
+    return (
+        ts,
+        event.get("time") or datetime.fromtimestamp(ts).strftime(TIME_FORMAT),
+        event.get("type") or "UNKNOWN",
+        event.get("label"),
+        float(confidence) if confidence not in (None, "") else None,
+        str(camera_id) if camera_id is not None else None,
+        int(track_id) if track_id not in (None, "") else None,
+        event.get("snapshot"),
+        source,
+        json.dumps(extra, default=str) if extra else None
+    )
+
+
+class EventStore:
+    """
+    Embedded, indexed event store (SQLite, WAL).
+
+    insert_many() is the bulk path used by EventLogger's background writer;
+    query() serves the dashboard history and offline tools. Every filter
+    maps onto an index, so lookups stay fast over months of events.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    # ---------------- WRITE ----------------
+    def insert_many(self, events, source="live"):
+        rows = [_row(event, source) for event in events]
+        if not rows:
+            return 0
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO events (ts, " + ", ".join(COLUMNS) + ") "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def insert(self, event, source="live"):
+        return self.insert_many([event], source)
+
+    # ---------------- READ ----------------
+    def _where(self, start, end, event_type, label, camera_id, track_id):
+        clauses, params = [], []
+
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(to_timestamp(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(to_timestamp(end))
+        if event_type is not None:
+            clauses.append("type = ?")
+            params.append(event_type)
+        if label is not None:
+            clauses.append("label = ?")
+            params.append(label)
+        if camera_id is not None:
+            clauses.append("camera_id = ?")
+            params.append(str(camera_id))
+        if track_id is not None:
+            clauses.append("track_id = ?")
+            params.append(int(track_id))
+
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(
+        self,
+        start=None,
+        end=None,
+        event_type=None,
+        label=None,
+        camera_id=None,
+        track_id=None,
+        limit=100,
+        newest_first=True
+    ):
+        """
+        Filtered events as dicts (same keys EventLogger produces)
+        """
+        where, params = self._where(start, end, event_type, label, camera_id, track_id)
+        order = "DESC" if newest_first else "ASC"
+        sql = f"SELECT * FROM events{where} ORDER BY ts {order}, id {order}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        events = []
+        for row in rows:
+            event = dict(row)
+            extra = event.pop("extra")
+            if extra:
+                event.update(json.loads(extra))
+            events.append(event)
+        return events
+
+    def count(self, start=None, end=None, event_type=None, label=None, camera_id=None, track_id=None):
+        where, params = self._where(start, end, event_type, label, camera_id, track_id)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM events{where}", params).fetchone()[0]
+
+    def recent(self, limit=50):
+        return self.query(limit=limit)
+
+    # ---------------- LEGACY IMPORT ----------------
+    def _already_imported(self, path):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM imports WHERE path = ?", (os.path.abspath(path),)
+            ).fetchone() is not None
+
+    def _mark_imported(self, path, rows):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO imports (path, rows, imported_at) VALUES (?, ?, ?)",
+                (os.path.abspath(path), rows, datetime.now().strftime(TIME_FORMAT))
+            )
+
+    def _is_stored(self, event):
+        # Events written live already carry their exact epoch ts
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM events WHERE ts = ? AND type = ?", (event["ts"], event.get("type"))
+            ).fetchone() is not None
+
+    def _import_file(self, path, read, source):
+        if self._already_imported(path):
+            return 0
+        events = [e for e in read(path) if e.get("ts") is None or not self._is_stored(e)]
+        rows = self.insert_many(events, source)
+        self._mark_imported(path, rows)
+        return rows
+
+    def import_legacy(self, log_dir=settings.paths.log_dir, evidence_dir=settings.paths.evidence_dir):
+        """
+        One-time import of events.jsonl (incl. rotated segments), events.csv
+        and evidence/intrusion_*/metadata.json. Files already imported, and
+        events the logger already inserted live, are skipped, so it is safe
+        to re-run.
+        """
+        counts = {"jsonl": 0, "csv": 0, "evidence": 0}
+
+        for path in sorted(glob.glob(os.path.join(log_dir, "events*.jsonl*"))):
+            counts["jsonl"] += self._import_file(path, _read_jsonl, "jsonl")
+
+        csv_path = os.path.join(log_dir, "events.csv")
+        if os.path.exists(csv_path):
+            counts["csv"] += self._import_file(csv_path, _read_csv, "csv")
+
+        for event_dir in sorted(glob.glob(os.path.join(evidence_dir, "intrusion_*"))):
+            if os.path.isdir(event_dir):
+                counts["evidence"] += self._import_file(event_dir, _read_evidence, "evidence")
+
+        logger.info(f"📥 Imported legacy events: {counts}")
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ================= LEGACY READERS =================
+def _read_jsonl(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _read_csv(path):
+    with open(path, newline="") as f:
+        return [row for row in csv.DictReader(f) if row.get("time")]
+
+
+def _read_evidence(event_dir):
+    metadata = {}
+    metadata_path = os.path.join(event_dir, "metadata.json")
+    if os.path.exists(metadata_path):
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+
+    event = {k: v for k, v in metadata.items() if k not in ("event", "timestamp", "snapshot")}
+    event["type"] = metadata.get("event", "INTRUSION")
+    event["evidence_dir"] = event_dir
+
+    if metadata.get("timestamp"):
+        event["time"] = metadata["timestamp"]
+    else:
+        # Older sessions have no metadata: the folder name carries the time
+        stamp = os.path.basename(event_dir)[len("intrusion_"):][:15]
+        event["time"] = datetime.strptime(stamp, "%Y%m%d_%H%M%S").strftime(TIME_FORMAT)
+
+    snapshot = os.path.join(event_dir, metadata.get("snapshot", "snapshot.jpg"))
+    if os.path.exists(snapshot):
+        event["snapshot"] = snapshot
+
+    return [event]
+
+
+if __name__ == "__main__":
+    store = EventStore()
+    store.import_legacy()
+    logger.info(f"📊 Event store holds {store.count()} events")
+    store.close()
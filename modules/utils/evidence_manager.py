@@ -1,75 +1,374 @@
 import os
 import cv2
+import csv
 import json
+import time
+import queue
+import threading
+from collections import deque
 from datetime import datetime
 
+from core.config import settings
+from core.logger import logger
+from core.metrics import metrics
+from modules.pipeline.queues import BoundedQueue
+from modules.utils.evidence_retention import EvidenceRetention, DEFAULT_SEVERITY
+
+# ================= CONFIG =================
+EVIDENCE_DIR = settings.paths.evidence_dir
+PRE_EVENT_SECONDS = 3.0     # each clip starts this long before the trigger
+PRE_EVENT_MAX_FRAMES = 90   # hard cap on the rolling pre-event buffer
+QUEUE_SIZE = 120            # frames waiting for the encoder
+FRAME_DROP_POLICY = "drop_newest"   # drop_newest | block
+FPS_PROBE_FRAMES = 10       # frames used to measure the clip fps
+DEFAULT_FPS = 20.0          # only when a clip is too short to measure
+CONTROL_HEADROOM = 8        # queue slots reserved for start / stop messages
+MERGE_GAP_SECONDS = settings.evidence.merge_gap_seconds   # re-triggers within this gap extend the same clip
+ENFORCE_RETENTION = True    # apply the disk quota / max age after each clip
+
+FRAME_DROP_POLICIES = ("drop_newest", "block")
+
+
+def estimate_fps(timestamps, default=DEFAULT_FPS):
+    """
+    Real frame rate of a clip from its capture timestamps
+    """
+    if len(timestamps) < 2 or timestamps[-1] <= timestamps[0]:
+        return default
+    fps = (len(timestamps) - 1) / (timestamps[-1] - timestamps[0])
+    return float(min(max(fps, 1.0), 60.0))
+
 
 class EvidenceManager:
-    def __init__(self, base_dir="evidence"):
+    """
+    Intrusion evidence recorder.
+
+    The frame loop only enqueues: start() / write() / stop() never touch
+    the disk. A background writer creates the session directory, writes
+    the snapshot and metadata, and encodes the clip. While idle, write()
+    feeds a rolling pre-event buffer, so every clip begins PRE_EVENT_SECONDS
+    before the trigger. The clip fps is measured from the frame timestamps
+    (also saved to frames.csv) instead of being hardcoded.
+
+    stop() only closes the session after MERGE_GAP_SECONDS without a new
+    trigger: flickering detections extend one clip instead of opening a
+    new folder each time. Finished sessions are handed to the retention
+    manager.
+
+    Frames passed to write() must not be modified afterwards.
+    """
+
+    def __init__(
+        self,
+        base_dir=EVIDENCE_DIR,
+        pre_event_seconds=PRE_EVENT_SECONDS,
+        queue_size=QUEUE_SIZE,
+        drop_policy=FRAME_DROP_POLICY,
+        merge_gap=MERGE_GAP_SECONDS,
+        retention=None
+    ):
+        if drop_policy not in FRAME_DROP_POLICIES:
+            raise ValueError(f"Unknown frame drop policy: {drop_policy} (use one of {FRAME_DROP_POLICIES})")
+
         self.base_dir = base_dir
         os.makedirs(self.base_dir, exist_ok=True)
 
+        self.pre_event_seconds = pre_event_seconds
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.merge_gap = merge_gap
+
+        if retention is None and ENFORCE_RETENTION:
+            retention = EvidenceRetention(base_dir)
+        self.retention = retention
+
         self.recording = False
-        self.video_writer = None
         self.event_dir = None
+        self.dropped_frames = 0
+        self.sessions = 0
+        self.retriggers = 0
+
+        self._session_open = False   # recording, or stopped but within the merge gap
+        self._gap_deadline = None
+        self._stopped_at = None
+        self._reserved = set()       # session names not yet created by the writer
+        self._last_stamp = (None, 0)  # (ms stamp, suffix) of the latest session name
 
-    def start(self, frame, metadata=None):
+        self._pre_event = deque(maxlen=PRE_EVENT_MAX_FRAMES)   # (ts, frame)
+        self._queue = BoundedQueue(queue_size + CONTROL_HEADROOM, "block", name="evidence")
+        self._thread = threading.Thread(target=self._writer, name="evidence-writer", daemon=True)
+        self._thread.start()
+
+    # ---------------- FRAME LOOP SIDE ----------------
+    def start(self, frame, metadata=None, ts=None):
         """
         Start evidence recording.
-        Saves:
-        - evidence.avi (video)
+        Saves (in the background):
+        - evidence.avi (video, incl. pre-event frames)
         - snapshot.jpg
         - metadata.json
+        - frames.csv (capture timestamp per video frame)
         """
         if self.recording:
             return
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.event_dir = os.path.join(self.base_dir, f"intrusion_{timestamp}")
-        os.makedirs(self.event_dir, exist_ok=True)
+        ts = time.time() if ts is None else ts
 
-        # ---------------- VIDEO (FIXED CODEC) ----------------
-        h, w, _ = frame.shape
-        video_path = os.path.join(self.event_dir, "evidence.avi")
+        if self._session_open:
+            # Re-trigger within the gap → same clip
+            self._queue.put(("retrigger", dict(metadata or {}), ts))
+            self._gap_deadline = None
+            self.recording = True
+            self.retriggers += 1
+            return
+
+        self.event_dir = self._session_dir(ts)
+
+        pre_event = [(t, f) for t, f in self._pre_event if ts - t <= self.pre_event_seconds]
+        self._pre_event.clear()
+
+        self._queue.put(("start", {
+            "event_dir": self.event_dir,
+            "snapshot": frame,
+            "metadata": dict(metadata or {}),
+            "triggered_at": ts,
+            "pre_event": pre_event
+        }))
+        self.recording = True
+        self._session_open = True
+        self.sessions += 1
+
+    def _session_dir(self, ts):
+        """
+        Unique session directory (ms resolution + suffix): same-millisecond
+        triggers never collide, even before the writer has created them.
+        Only in-memory state is checked, never the disk.
+        """
+        stamp = datetime.fromtimestamp(ts).strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        last_stamp, last_suffix = self._last_stamp
+        suffix = last_suffix + 1 if stamp == last_stamp else 0
+
+        name = f"intrusion_{stamp}_{suffix}" if suffix else f"intrusion_{stamp}"
+        while name in self._reserved:
+            suffix += 1
+            name = f"intrusion_{stamp}_{suffix}"
+
+        self._last_stamp = (stamp, suffix)
+        self._reserved.add(name)
+        return os.path.join(self.base_dir, name)
+
+    def write(self, frame, ts=None):
+        ts = time.time() if ts is None else ts
+
+        if self._session_open and not self.recording and ts > self._gap_deadline:
+            self._end_session()
+
+        if not self._session_open:
+            self._pre_event.append((ts, frame))
+            return
+
+        if self.drop_policy == "drop_newest" and self._queue.depth >= self.queue_size:
+            # Encoder is behind: keep what is queued, lose this frame
+            self.dropped_frames += 1
+            metrics.inc("evidence_dropped_frames")
+            return
+
+        self._queue.put(("frame", ts, frame))
+
+    def stop(self, ts=None, immediate=False):
+        """
+        End of the trigger. The clip keeps recording for merge_gap seconds
+        and is closed by the first write() after that (or immediately).
+        """
+        ts = time.time() if ts is None else ts
+
+        if self.recording:
+            self.recording = False
+            self._stopped_at = ts
+            self._gap_deadline = ts + self.merge_gap
+
+        if self._session_open and (immediate or self.merge_gap <= 0):
+            self._end_session()
+
+    def _end_session(self):
+        self._queue.put(("stop", self._stopped_at, self.dropped_frames))
+        self._session_open = False
+        self._gap_deadline = None
+        self.event_dir = None
 
-        self.video_writer = cv2.VideoWriter(
-            video_path,
+    def close(self):
+        """
+        Finish the current clip and stop the writer thread
+        """
+        self.stop(immediate=True)
+        self._queue.put(("close",))
+        self._thread.join(timeout=10)
+        self._queue.close()
+
+    # ---------------- WRITER SIDE ----------------
+    def _writer(self):
+        session = None
+
+        while True:
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._queue.closed:
+                    break
+                continue
+
+            kind = item[0]
+            try:
+                if kind == "start":
+                    if session is not None:
+                        self._finish(session, time.time(), self.dropped_frames)
+                    session = self._begin(item[1])
+
+                elif kind == "retrigger" and session is not None:
+                    self._merge(session, item[1])
+
+                elif kind == "frame" and session is not None:
+                    self._add_frame(session, item[1], item[2])
+
+                elif kind == "stop" and session is not None:
+                    self._finish(session, item[1], item[2])
+                    session = None
+
+                elif kind == "close":
+                    if session is not None:
+                        self._finish(session, time.time(), self.dropped_frames)
+                    break
+
+            except Exception as e:
+                logger.error(f"❌ Evidence writer error: {e}")
+                if session is not None:
+                    self._abort(session, e)
+                session = None
+
+    def _begin(self, info):
+        event_dir = info["event_dir"]
+        os.makedirs(event_dir, exist_ok=True)
+        self._reserved.discard(os.path.basename(event_dir))
+
+        # ---------------- SNAPSHOT ----------------
+        cv2.imwrite(os.path.join(event_dir, "snapshot.jpg"), info["snapshot"])
+
+        session = {
+            "event_dir": event_dir,
+            "metadata": info["metadata"],
+            "triggered_at": info["triggered_at"],
+            "dropped_at_start": self.dropped_frames,
+            "writer": None,
+            "fps": None,
+            "pending": list(info["pre_event"]),   # buffered until fps is known
+            "timestamps": [],
+            "pre_event_frames": len(info["pre_event"]),
+            "retriggers": 0
+        }
+        self._write_metadata(session)
+        return session
+
+    def _merge(self, session, metadata):
+        merged = session["metadata"]
+        for key, value in metadata.items():
+            if key in ("tracks", "zones"):
+                merged[key] = sorted(set(merged.get(key, [])) | set(value))
+            elif key == "severity":
+                merged["severity"] = max(merged.get("severity", value), value)
+            else:
+                merged.setdefault(key, value)
+        session["retriggers"] += 1
+
+    def _open(self, session):
+        fps = estimate_fps([t for t, _ in session["pending"][:FPS_PROBE_FRAMES + 1]])
+        h, w = session["pending"][0][1].shape[:2]
+
+        # ---------------- VIDEO (FIXED CODEC) ----------------
+        writer = cv2.VideoWriter(
+            os.path.join(session["event_dir"], "evidence.avi"),
             cv2.VideoWriter_fourcc(*"XVID"),  # ✅ Highly compatible
-            20,
+            fps,
             (w, h)
         )
-
-        if not self.video_writer.isOpened():
+        if not writer.isOpened():
             raise RuntimeError("❌ VideoWriter failed to open")
 
-        # ---------------- SNAPSHOT ----------------
-        snapshot_path = os.path.join(self.event_dir, "snapshot.jpg")
-        cv2.imwrite(snapshot_path, frame)
+        session["writer"], session["fps"] = writer, fps
+
+        for ts, frame in session["pending"]:
+            writer.write(frame)
+            session["timestamps"].append(ts)
+        session["pending"] = []
+
+    def _add_frame(self, session, ts, frame):
+        if session["writer"] is None:
+            session["pending"].append((ts, frame))
+            if len(session["pending"]) > FPS_PROBE_FRAMES:
+                self._open(session)
+            return
+
+        with metrics.span("disk_io", op="evidence"):
+            session["writer"].write(frame)
+        session["timestamps"].append(ts)
+
+    def _finish(self, session, ended_at, dropped_total):
+        if session["writer"] is None and session["pending"]:
+            self._open(session)
+        if session["writer"] is not None:
+            session["writer"].release()
+
+        with open(os.path.join(session["event_dir"], "frames.csv"), "w", newline="") as f:
+            rows = csv.writer(f)
+            rows.writerow(["frame", "timestamp"])
+            rows.writerows(enumerate(session["timestamps"]))
+
+        session["ended_at"] = ended_at
+        session["dropped"] = dropped_total - session["dropped_at_start"]
+        self._write_metadata(session)
+
+        if self.retention is not None:
+            self.retention.register(
+                session["event_dir"],
+                session["metadata"].get("severity", DEFAULT_SEVERITY),
+                session["triggered_at"]
+            )
+            self.retention.enforce()
+
+    def _abort(self, session, error):
+        """
+        Best-effort end of a session after a writer error: the VideoWriter
+        is always released and metadata.json records the error
+        """
+        session["metadata"]["error"] = str(error)
+        try:
+            self._finish(session, time.time(), self.dropped_frames)
+        except Exception as e:
+            logger.error(f"❌ Evidence session {session['event_dir']} left incomplete: {e}")
+        finally:
+            if session["writer"] is not None:
+                session["writer"].release()
 
+    def _write_metadata(self, session):
         # ---------------- METADATA ----------------
         final_metadata = {
             "event": "INTRUSION",
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp": datetime.fromtimestamp(session["triggered_at"]).strftime("%Y-%m-%d %H:%M:%S"),
             "video": "evidence.avi",
-            "snapshot": "snapshot.jpg"
+            "snapshot": "snapshot.jpg",
+            "frames": "frames.csv",
+            "pre_event_frames": session["pre_event_frames"]
         }
 
-        if metadata:
-            final_metadata.update(metadata)
-
-        with open(os.path.join(self.event_dir, "metadata.json"), "w") as f:
-            json.dump(final_metadata, f, indent=4)
-
-        self.recording = True
-
-    def write(self, frame):
-        if self.recording and self.video_writer:
-            self.video_writer.write(frame)
+        if "ended_at" in session:
+            final_metadata.update({
+                "fps": round(session["fps"], 2) if session["fps"] else None,
+                "frame_count": len(session["timestamps"]),
+                "dropped_frames": session["dropped"],
+                "retriggers": session["retriggers"],
+                "duration": round(session["ended_at"] - session["triggered_at"], 2)
+            })
 
-    def stop(self):
-        if self.recording and self.video_writer:
-            self.video_writer.release()
+        final_metadata.update(session["metadata"])
 
-        self.recording = False
-        self.video_writer = None
-        self.event_dir = None
+        with open(os.path.join(session["event_dir"], "metadata.json"), "w") as f:
+            json.dump(final_metadata, f, indent=4)
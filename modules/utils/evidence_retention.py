@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import shutil
+import threading
+
+from core.config import settings
+from core.logger import logger
+
+# ================= CONFIG =================
+MAX_EVIDENCE_BYTES = int(settings.evidence.max_gb * 1024 ** 3)   # disk quota for evidence/
+MAX_EVIDENCE_AGE_DAYS = settings.evidence.max_age_days
+DEFAULT_SEVERITY = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def dir_size(path):
+    """
+    Bytes used by the files directly inside one session directory
+    """
+    total = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                total += entry.stat().st_size
+    return total
+
+
+class EvidenceRetention:
+    """
+    Keeps evidence/ within a disk quota and a max age.
+
+    Finished sessions are registered in manifest.json (size, creation
+    time, severity), so enforcement never walks the directory tree; the
+    tree is scanned once only when no manifest exists yet. Expired
+    sessions go first, then the lowest-severity / oldest ones until the
+    quota holds.
+    """
+
+    def __init__(
+        self,
+        base_dir=settings.paths.evidence_dir,
+        max_bytes=MAX_EVIDENCE_BYTES,
+        max_age_days=MAX_EVIDENCE_AGE_DAYS
+    ):
+        self.base_dir = base_dir
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.manifest_path = os.path.join(base_dir, MANIFEST_NAME)
+
+        self._lock = threading.Lock()
+        self.sessions = {}   # name → {"created", "bytes", "severity"}
+        self.load()
+
+    # ---------------- MANIFEST ----------------
+    def load(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.sessions = json.load(f)
+        else:
+            self.rebuild()
+
+    def save(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.sessions, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def rebuild(self):
+        """
+        One-time scan of existing session directories
+        """
+        self.sessions = {}
+        if not os.path.isdir(self.base_dir):
+            return
+
+        for name in sorted(os.listdir(self.base_dir)):
+            path = os.path.join(self.base_dir, name)
+            if not (name.startswith("intrusion_") and os.path.isdir(path)):
+                continue
+
+            severity = DEFAULT_SEVERITY
+            metadata_path = os.path.join(path, "metadata.json")
+            if os.path.exists(metadata_path):
+                with open(metadata_path) as f:
+                    severity = json.load(f).get("severity", DEFAULT_SEVERITY)
+
+            self.sessions[name] = {
+                "created": os.path.getmtime(path),
+                "bytes": dir_size(path),
+                "severity": severity
+            }
+
+        os.makedirs(self.base_dir, exist_ok=True)
+        self.save()
+        logger.info(f"🗂 Evidence manifest rebuilt: {len(self.sessions)} sessions")
+
+    @property
+    def total_bytes(self):
+        return sum(s["bytes"] for s in self.sessions.values())
+
+    # ---------------- RETENTION ----------------
+    def register(self, event_dir, severity=DEFAULT_SEVERITY, created=None):
+        with self._lock:
+            self.sessions[os.path.basename(event_dir)] = {
+                "created": time.time() if created is None else created,
+                "bytes": dir_size(event_dir),
+                "severity": severity
+            }
+            self.save()
+
+    def enforce(self, now=None):
+        """
+        Delete expired, then lowest-severity / oldest sessions over quota.
+        Returns the removed session names.
+        """
+        now = time.time() if now is None else now
+        removed = []
+
+        with self._lock:
+            if self.max_age_days is not None:
+                cutoff = now - self.max_age_days * 86400
+                removed += [n for n, s in self.sessions.items() if s["created"] < cutoff]
+
+            if self.max_bytes is not None:
+                total = sum(s["bytes"] for n, s in self.sessions.items() if n not in removed)
+                victims = sorted(
+                    (n for n in self.sessions if n not in removed),
+                    key=lambda n: (self.sessions[n]["severity"], self.sessions[n]["created"])
+                )
+                for name in victims:
+                    if total <= self.max_bytes:
+                        break
+                    removed.append(name)
+                    total -= self.sessions[name]["bytes"]
+
+            for name in removed:
+                shutil.rmtree(os.path.join(self.base_dir, name), ignore_errors=True)
+                del self.sessions[name]
+
+            if removed:
+                self.save()
+                logger.info(f"🧹 Evidence retention removed {len(removed)} sessions")
+
+        return removed
@@ -0,0 +1,89 @@
+import os
+import re
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+from core.metrics import metrics
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+
+@dataclass
+class FrameCrop:
+    """
+    A piece of a camera frame handed from one pipeline phase to the next.
+
+    bbox is (x1, y1, x2, y2) in SOURCE FRAME pixel coordinates, so any
+    later phase can map its own results back onto the original frame.
+    """
+    image: np.ndarray
+    frame_id: int
+    bbox: tuple
+    label: str | None = None
+    confidence: float | None = None
+    name: str | None = None
+    camera_id: str | None = None
+    track_id: int | None = None
+
+    @property
+    def filename(self):
+        return self.name or f"roi_{self.frame_id}.jpg"
+
+    def sub_crop(self, x1, y1, x2, y2, label=None, confidence=None):
+        """
+        Crop (x1, y1, x2, y2) given in THIS crop's coordinates.
+        The returned crop keeps frame_id and carries frame coordinates.
+        """
+        h, w = self.image.shape[:2]
+        x1, y1 = max(int(x1), 0), max(int(y1), 0)
+        x2, y2 = min(int(x2), w), min(int(y2), h)
+
+        ox, oy = self.bbox[0], self.bbox[1]
+        return FrameCrop(
+            image=self.image[y1:y2, x1:x2],
+            frame_id=self.frame_id,
+            bbox=(ox + x1, oy + y1, ox + x2, oy + y2),
+            label=label,
+            confidence=confidence,
+            camera_id=self.camera_id,
+            track_id=self.track_id,
+        )
+
+
+# ================= DISK SINKS / SOURCES =================
+def save_crop(crop, directory, name=None):
+    """
+    Optional disk sink (debugging / evidence). Returns the written path.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name or crop.filename)
+    with metrics.span("disk_io", op="crop"):
+        cv2.imwrite(path, crop.image)
+    return path
+
+
+def load_crops(directory):
+    """
+    Read every image in `directory` as a full-image FrameCrop.
+    Used by the legacy on-disk pipeline mode.
+    """
+    crops = []
+    if not os.path.isdir(directory):
+        return crops
+
+    for index, name in enumerate(sorted(os.listdir(directory))):
+        if not name.lower().endswith(IMAGE_EXTS):
+            continue
+
+        image = cv2.imread(os.path.join(directory, name))
+        if image is None:
+            continue
+
+        match = re.search(r"(\d+)", name)
+        frame_id = int(match.group(1)) if match else index
+
+        h, w = image.shape[:2]
+        crops.append(FrameCrop(image, frame_id, (0, 0, w, h), name=name))
+
+    return crops
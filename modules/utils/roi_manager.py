@@ -1,33 +1,194 @@
 import json
 import os
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from core.config import settings
+
+ROI_DIR = settings.paths.roi_dir
+ROI_FILE = os.path.join(ROI_DIR, "roi.json")       # legacy single rectangle
+ZONES_FILE = os.path.join(ROI_DIR, "zones.json")
+DEFAULT_FRAME_SIZE = (1280, 720)   # (w, h) polygons are drawn in, unless zones.json says otherwise
+DEFAULT_SEVERITY = 1
+MIN_OVERLAP = 0.2                  # box fraction inside a zone to count as "in" it
+
+
+@dataclass
+class Zone:
+    """
+    Detection zone: polygon [(x, y), ...] in reference-frame pixels
+    """
+    name: str
+    polygon: list
+    severity: int = DEFAULT_SEVERITY
 
-ROI_DIR = "data/processed/roi"
-ROI_FILE = os.path.join(ROI_DIR, "roi.json")
 
 class ROIManager:
-    def __init__(self):
-        os.makedirs(ROI_DIR, exist_ok=True)
-        self.roi = self.load()
+    """
+    Named polygon zones (fences, gates, ...) with severities, stored in
+    zones.json:
 
-    def save(self, x1, y1, x2, y2):
-        self.roi = {"x1": x1, "y1": y1, "x2": x2, "y2": y2}
-        with open(ROI_FILE, "w") as f:
-            json.dump(self.roi, f)
+        {"frame_size": [1280, 720],
+         "zones": [{"name": "fence", "severity": 3, "polygon": [[x, y], ...]}]}
 
+    Zone masks and their integral images are rasterised once at load, so
+    overlap() classifies N boxes against every zone with four lookups per
+    box and zone. A legacy roi.json rectangle loads as zone "default";
+    it has no reference size (its corners are camera pixels), so it is
+    never rescaled and is rasterised at the size of the frames it is
+    tested against instead.
+    """
+
+    def __init__(self, path=ZONES_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.frame_size = DEFAULT_FRAME_SIZE
+        self.native = False   # zones in camera pixels (legacy roi.json), no reference size
+        self.zones = []
+        self._mask_cache = {}
+        self.load()
+
+    # ---------------- PERSISTENCE ----------------
     def load(self):
-        if os.path.exists(ROI_FILE):
+        data = None
+        self.native = False
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        elif self.path == ZONES_FILE and os.path.exists(ROI_FILE):
             with open(ROI_FILE, "r") as f:
-                return json.load(f)
-        return None
+                roi = json.load(f)
+            data = {"zones": [{"name": "default", "polygon": _rectangle(
+                roi["x1"], roi["y1"], roi["x2"], roi["y2"])}]}
+            self.native = True
+
+        if data:
+            self.zones = [
+                Zone(z["name"], [tuple(p) for p in z["polygon"]], z.get("severity", DEFAULT_SEVERITY))
+                for z in data.get("zones", [])
+            ]
+            self.frame_size = tuple(data.get("frame_size", DEFAULT_FRAME_SIZE))
+            if self.native:
+                # Until a frame size is known: a canvas the rectangle fits on
+                extent = np.ceil(np.asarray(self.zones[0].polygon, dtype=np.float64).max(axis=0)).astype(int)
+                self.frame_size = (max(DEFAULT_FRAME_SIZE[0], int(extent[0])),
+                                   max(DEFAULT_FRAME_SIZE[1], int(extent[1])))
+        self._rasterise()
+        return self.zones
+
+    def save_zones(self):
+        data = {
+            "frame_size": list(self.frame_size),
+            "zones": [
+                {"name": z.name, "severity": z.severity, "polygon": [list(p) for p in z.polygon]}
+                for z in self.zones
+            ]
+        }
+        with open(self.path, "w") as f:
+            json.dump(data, f, indent=2)
+        self.native = False   # zones.json now records the reference size
+
+    def add_zone(self, name, polygon, severity=DEFAULT_SEVERITY):
+        if len(polygon) < 3:
+            raise ValueError(f"Zone {name!r} needs at least 3 points, got {len(polygon)}")
+        self.zones = [z for z in self.zones if z.name != name]
+        self.zones.append(Zone(name, [tuple(p) for p in polygon], severity))
+        self._rasterise()
+        self.save_zones()
+
+    def save(self, x1, y1, x2, y2):
+        """
+        Single rectangle (the original roi.json API): replaces all zones
+        """
+        self.zones = []
+        self.add_zone("default", _rectangle(x1, y1, x2, y2))
+
+    # ---------------- RASTERS ----------------
+    def _adopt(self, frame_size):
+        """
+        Native zones take the size of the frames they are used with
+        """
+        if self.native and frame_size is not None and tuple(frame_size) != tuple(self.frame_size):
+            self.frame_size = tuple(int(v) for v in frame_size)
+            self._rasterise()
+
+    def _rasterise(self):
+        w, h = self.frame_size
+        self.masks = np.zeros((len(self.zones), h, w), dtype=np.uint8)
+        for index, zone in enumerate(self.zones):
+            points = np.round(np.asarray(zone.polygon, dtype=np.float64)).astype(np.int32)
+            cv2.fillPoly(self.masks[index], [points], 1)
+
+        # (Z, h + 1, w + 1) integral images: pixel count of any box in O(1)
+        self.integrals = np.stack(
+            [cv2.integral(mask) for mask in self.masks]
+        ) if self.zones else np.zeros((0, h + 1, w + 1), dtype=np.int32)
+        self.severities = np.array([z.severity for z in self.zones], dtype=np.int32)
+        self._mask_cache = {}
+
+    def mask(self, width=None, height=None):
+        """
+        Union of all zones as a uint8 0/255 mask at (width, height)
+        (default: the reference size), None when no zones are defined
+        """
+        if not self.zones:
+            return None
+
+        if width and height:
+            self._adopt((width, height))
+        size = (width or self.frame_size[0], height or self.frame_size[1])
+        if size not in self._mask_cache:
+            union = (self.masks.max(axis=0) * 255).astype(np.uint8)
+            if size != tuple(self.frame_size):
+                union = cv2.resize(union, size, interpolation=cv2.INTER_NEAREST)
+            self._mask_cache[size] = union
+        return self._mask_cache[size]
+
+    # ---------------- BOX TESTS ----------------
+    def overlap(self, boxes, frame_size=None):
+        """
+        boxes: (N, 4) array-like of (x1, y1, x2, y2) in frame pixels of
+        frame_size (w, h; default the reference size).
+        Returns (N, Z) float array: fraction of each box inside each zone.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self._adopt(frame_size)
+        w, h = self.frame_size
+        if frame_size is not None and tuple(frame_size) != (w, h):
+            sx, sy = w / frame_size[0], h / frame_size[1]
+            boxes = boxes * np.array([sx, sy, sx, sy])
+
+        area = np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+        x1, x2 = (np.clip(np.round(boxes[:, i]), 0, w).astype(np.intp) for i in (0, 2))
+        y1, y2 = (np.clip(np.round(boxes[:, i]), 0, h).astype(np.intp) for i in (1, 3))
+
+        ii = self.integrals
+        inside = ii[:, y2, x2] - ii[:, y1, x2] - ii[:, y2, x1] + ii[:, y1, x1]   # (Z, N)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fractions = np.where(area > 0, inside / area, 0.0)
+        return np.clip(fractions, 0.0, 1.0).T
+
+    def classify(self, boxes, frame_size=None, min_overlap=MIN_OVERLAP):
+        """
+        Highest-severity zone of each box: (N,) zone indices (-1 = outside
+        all zones) and the (N, Z) overlap matrix
+        """
+        fractions = self.overlap(boxes, frame_size)
+        if not self.zones:
+            return np.full(len(fractions), -1), fractions
+
+        hit = fractions >= min_overlap
+        ranked = np.where(hit, self.severities[None, :] * 2.0 + fractions, -1.0)
+        best = ranked.argmax(axis=1)
+        return np.where(hit.any(axis=1), best, -1), fractions
 
     def inside(self, bx1, by1, bx2, by2):
-        if not self.roi:
+        if not self.zones:
             return False
+        return bool((self.overlap([(bx1, by1, bx2, by2)]) > 0).any())
 
-        rx1, ry1, rx2, ry2 = (
-            self.roi["x1"], self.roi["y1"],
-            self.roi["x2"], self.roi["y2"]
-        )
 
-        # Intersection check
-        return not (bx2 < rx1 or bx1 > rx2 or by2 < ry1 or by1 > ry2)
+def _rectangle(x1, y1, x2, y2):
+    return [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
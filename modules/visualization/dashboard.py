@@ -1,63 +1,84 @@
 # RUN WITH:
 # streamlit run modules/visualization/dashboard.py
 
-import sys, os, time, csv
+import sys, os, time
 sys.path.append(os.getcwd())
 
 import streamlit as st
-import cv2
-from datetime import datetime
+from collections import deque
 
-from modules.object_detection.yolo_detector import YOLODetector
+from modules.object_detection.yolo_detector import YOLODetector, YOLO_WEIGHTS
+from modules.object_detection.tracker import TrackedDetector, DETECT_EVERY
+from modules.face_recognition.face_recognizer import initialize_face_database, recognize_faces
 from modules.alarm.alarm_controller import (
-    start_alarm, stop_alarm, enable_alarm, is_alarm_enabled
+    stop_alarm, enable_alarm, is_alarm_enabled
 )
+from core.config import settings
+from core.metrics import start_metrics
 from modules.utils.event_logger import EventLogger
+from modules.utils.event_store import EventStore
 from modules.utils.evidence_manager import EvidenceManager
+from modules.capture.camera_stream import parse_source
+from modules.visualization.live_worker import LiveWorker
 
 # ================= CONFIG =================
-LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
-CSV_LOG_PATH = os.path.join(LOG_DIR, "events.csv")
+UI_FPS = 15          # render rate, independent of inference fps
+HISTORY_SIZE = 50
 
 # ================= STREAMLIT =================
 st.set_page_config(page_title="Smart Border Intrusion System", layout="wide")
 st.title("🚨 Smart Border Intrusion Detection System")
 
 # ================= SESSION STATE =================
-if "source" not in st.session_state:
-    st.session_state.source = "Live Camera"
+start_metrics()   # idempotent across reruns
 
 if "yolo" not in st.session_state:
-    st.session_state.yolo = YOLODetector("yolov8n.pt", conf=0.5)
+    # Thin wrapper; the YOLO weights themselves come from the shared model registry.
+    # YOLO runs every DETECT_EVERY frames, tracks are propagated in between.
+    st.session_state.yolo = TrackedDetector(
+        YOLODetector(YOLO_WEIGHTS, conf=0.5), detect_every=DETECT_EVERY
+    )
 
-if "event_logger" not in st.session_state:
-    st.session_state.event_logger = EventLogger(max_events=50)
+if "face_database" not in st.session_state:
+    # Face stage of the worker: in-zone intrusion tracks without a known face
+    initialize_face_database()
+    st.session_state.face_database = True
+
+if "event_store" not in st.session_state:
+    st.session_state.event_store = EventStore()
 
-if "last_log_time" not in st.session_state:
-    st.session_state.last_log_time = {}
+if "event_logger" not in st.session_state:
+    # Single sink: UI history in memory, batched JSONL + store persistence in the background
+    st.session_state.event_logger = EventLogger(
+        max_events=HISTORY_SIZE, store=st.session_state.event_store
+    )
 
 if "evidence" not in st.session_state:
     st.session_state.evidence = EvidenceManager()
 
+if "worker" not in st.session_state:
+    st.session_state.worker = None
+    st.session_state.worker_source = None
+
 # ================= SIDEBAR =================
 st.sidebar.header("⚙ Controls")
 
 source = st.sidebar.radio("Video Source", ["Live Camera", "Demo Video"])
 
-if source != st.session_state.source:
-    stop_alarm()
-    st.session_state.evidence.stop()
-    st.session_state.source = source
-
 enable_alarm(
     st.sidebar.toggle("🔊 Alarm Enabled", value=is_alarm_enabled())
 )
 
+# ================= CAMERA =================
+camera_source = 0
+if source == "Live Camera":
+    # Device index, file path or RTSP URL
+    camera_source = parse_source(st.sidebar.text_input("Camera Source", "0"))
+
 # ================= DEMO VIDEO =================
 demo_video_path = None
 if source == "Demo Video":
-    demo_dir = "demo_videos"
+    demo_dir = settings.paths.demo_videos_dir
     videos = [v for v in os.listdir(demo_dir) if v.endswith((".mp4", ".avi"))]
     demo_video = st.sidebar.selectbox("Select Demo Video", videos)
     demo_video_path = os.path.join(demo_dir, demo_video)
@@ -66,95 +87,80 @@ if source == "Demo Video":
 with st.sidebar.expander("📜 Detection History", expanded=True):
     history_box = st.empty()
 
-# ================= VIDEO =================
-cap = cv2.VideoCapture(0 if source == "Live Camera" else demo_video_path)
-
 frame_box = st.empty()
 status_box = st.empty()
-
-# ================= CSV INIT =================
-if not os.path.exists(CSV_LOG_PATH):
-    with open(CSV_LOG_PATH, "w", newline="") as f:
-        csv.writer(f).writerow(["time", "type", "label", "confidence"])
-
-def persist_event(event_type, label, confidence=None):
-    with open(CSV_LOG_PATH, "a", newline="") as f:
-        csv.writer(f).writerow([
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            event_type,
-            label,
-            confidence if confidence else ""
-        ])
-
-def should_log(label, cooldown=2):
-    now = time.time()
-    last = st.session_state.last_log_time.get(label, 0)
-    if now - last > cooldown:
-        st.session_state.last_log_time[label] = now
-        return True
-    return False
-
-# ================= MAIN LOOP =================
-while cap.isOpened():
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    detections = st.session_state.yolo.detect(frame)
-    intrusion_detected = False
-
-    for label, conf, x1, y1, x2, y2, category in detections:
-
-        if category == "intrusion":
-            intrusion_detected = True
-            color = (0, 0, 255)
-            text = f"INTRUSION: {label.upper()} {conf:.2f}"
-            event_type = "INTRUSION"
-
-        elif category == "animal":
-            color = (0, 255, 0)
-            text = f"ANIMAL: {label.upper()}"
-            event_type = "ANIMAL"
-
-        else:
-            color = (255, 165, 0)
-            text = f"OBJECT: {label.upper()}"
-            event_type = "OBJECT"
-
-        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-        cv2.putText(frame, text, (x1, y1 - 8),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-
-        if should_log(label):
-            st.session_state.event_logger.log(event_type, label, conf)
-            persist_event(event_type, label, conf)
-
-    # ================= ALARM + EVIDENCE =================
-    if intrusion_detected:
-        start_alarm()
-        status_box.error("🚨 INTRUSION DETECTED")
-
-        if not st.session_state.evidence.recording:
-            st.session_state.evidence.start(frame)
-
-        st.session_state.evidence.write(frame)
-
-    else:
-        stop_alarm()
-        st.session_state.evidence.stop()
-        status_box.success("✅ Area Secure")
-
-    # ================= HISTORY =================
-    with history_box.container():
-        for e in st.session_state.event_logger.get_events():
-            st.markdown(
-                f"**{e['time']}** | `{e['type']}` | {e['label']} "
-                + (f"({e['confidence']:.2f})" if e['confidence'] else "")
-            )
-
-    frame_box.image(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), channels="RGB")
-    time.sleep(0.03)
-
-cap.release()
-st.session_state.evidence.stop()
-stop_alarm()
\ No newline at end of file
+fps_box = st.empty()
+
+def format_event(e):
+    return (
+        f"**{e['time']}** | `{e['type']}` | {e['label']} "
+        + (f"#{e['track_id']} " if e.get('track_id') else "")
+        + (f"({e['confidence']:.2f})" if e['confidence'] else "")
+    )
+
+# ================= WORKER (capture + inference) =================
+video_source = camera_source if source == "Live Camera" else demo_video_path
+
+# Streamlit reruns this script on every interaction: keep the worker alive
+# across reruns and only restart it when the video source changes.
+worker = st.session_state.worker
+if st.session_state.worker_source != video_source or not (worker and worker.alive):
+    if worker is not None:
+        worker.stop()
+
+    st.session_state.yolo.reset()
+    st.session_state.worker = LiveWorker(
+        video_source,
+        st.session_state.yolo,
+        st.session_state.event_logger,
+        st.session_state.evidence,
+        recognize=recognize_faces
+    ).start()
+    st.session_state.worker_source = video_source
+
+worker = st.session_state.worker
+
+# ================= UI LOOP (render only) =================
+# Persisted history survives restarts; flush first so this session's events are in it
+st.session_state.event_logger.flush()
+history = deque(
+    (format_event(e) for e in st.session_state.event_store.recent(HISTORY_SIZE)),
+    maxlen=HISTORY_SIZE
+)
+history_box.markdown("\n\n".join(history))
+history_seq, _ = worker.events_since(0)
+
+shown_seq = 0
+shown_status = None
+last_fps_update = 0
+
+while worker.alive:
+    snapshot = worker.latest()
+
+    # Latest frame wins: frames published between two renders are skipped
+    if snapshot is not None and snapshot[0] != shown_seq:
+        shown_seq, preview, intrusion_tracks = snapshot
+        frame_box.image(preview, channels="RGB")
+
+        status = len(intrusion_tracks)
+        if status != shown_status:
+            shown_status = status
+            if intrusion_tracks:
+                status_box.error(f"🚨 INTRUSION DETECTED ({status} tracked)")
+            else:
+                status_box.success("✅ Area Secure")
+
+    # Incremental history: re-render only when new events arrived
+    history_seq, new_events = worker.events_since(history_seq)
+    if new_events:
+        history.extendleft(format_event(e) for e in new_events)
+        history_box.markdown("\n\n".join(history))
+
+    if time.time() - last_fps_update >= 1:
+        last_fps_update = time.time()
+        fps_box.caption(f"Inference: {worker.inference_fps:.1f} fps")
+
+    time.sleep(1 / UI_FPS)
+
+worker.stop()
+stop_alarm()
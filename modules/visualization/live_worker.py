@@ -0,0 +1,220 @@
+import time
+import threading
+from collections import deque
+
+import cv2
+
+from core.metrics import metrics
+from modules.alarm.alarm_controller import start_alarm, stop_alarm
+from modules.capture.camera_stream import CameraStream
+from modules.decision.decision_engine import Decision, StreamingDecisionEngine
+from modules.face_detection.face_detector import detect_and_extract_faces
+from modules.utils.roi_manager import ROIManager
+
+# ================= CONFIG =================
+PREVIEW_WIDTH = 960     # published frames are downscaled to this width
+EVENT_BACKLOG = 200     # undelivered events kept for the UI
+
+COLORS = {
+    "intrusion": (0, 0, 255),
+    "animal": (0, 255, 0),
+    "object": (255, 165, 0),
+}
+
+
+def annotate(frame, detections):
+    """
+    Draw tracked detections in place. Returns the intrusion track IDs.
+    """
+    intrusion_tracks = []
+
+    for track_id, label, conf, x1, y1, x2, y2, category in detections:
+        if category == "intrusion":
+            intrusion_tracks.append(track_id)
+            text = f"INTRUSION #{track_id}: {label.upper()} {conf:.2f}"
+        elif category == "animal":
+            text = f"ANIMAL #{track_id}: {label.upper()}"
+        else:
+            text = f"OBJECT #{track_id}: {label.upper()}"
+
+        color = COLORS.get(category, COLORS["object"])
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(frame, text, (x1, y1 - 8),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+
+    return intrusion_tracks
+
+
+def preview(frame, width=PREVIEW_WIDTH):
+    """
+    BGR frame → downscaled RGB preview for st.image
+    """
+    h, w = frame.shape[:2]
+    if w > width:
+        frame = cv2.resize(frame, (width, int(h * width / w)), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+class LiveWorker:
+    """
+    Dashboard capture + inference, off the Streamlit thread.
+
+    A CameraStream captures continuously; the inference thread always
+    takes the LATEST frame (older ones are skipped when detection is slow),
+    runs the tracked detector, feeds the streaming decision engine, raises
+    alarms / evidence / events for CONFIRMED intrusions only, and
+    publishes the annotated preview. The UI polls latest() and
+    events_since() at its own rate.
+
+    recognize: recognize_faces (face database initialised) to search
+    faces of the in-zone intrusion tracks the decision engine wants a face
+    for: on detector frames only, at most once per decision.face_interval
+    per track, until the face is settled; a known face clears the track.
+    None = no face stage.
+    """
+
+    def __init__(self, source, detector, event_logger, evidence, decisions=None, recognize=None):
+        self.stream = CameraStream(source)
+        self.detector = detector
+        self.event_logger = event_logger
+        self.evidence = evidence
+        self.decisions = decisions or StreamingDecisionEngine(ROIManager())
+        self.recognize = recognize
+
+        self.running = False
+        self.inference_fps = 0.0
+        self.logged_tracks = set()
+
+        self._latest = None               # (seq, preview_rgb, confirmed intrusion tracks)
+        self._events = deque(maxlen=EVENT_BACKLOG)   # (seq, event)
+        self._frame_seq = 0
+        self._event_seq = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # ---------------- LIFECYCLE ----------------
+    def start(self):
+        self.stream.start()
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="dashboard-inference", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+        self.stream.stop()
+        self.evidence.stop(immediate=True)
+        stop_alarm()
+
+    @property
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # ---------------- UI SIDE ----------------
+    def latest(self):
+        with self._lock:
+            return self._latest
+
+    def events_since(self, seq):
+        """
+        (last_seq, [new events, oldest first]) – incremental history updates
+        """
+        with self._lock:
+            new = [event for event_seq, event in self._events if event_seq > seq]
+            return self._event_seq, new
+
+    # ---------------- WORKER SIDE ----------------
+    def _log(self, detections, decisions):
+        # Track IDs never come back, so forget the ones that ended
+        self.logged_tracks &= {d[0] for d in detections}
+
+        for track_id, label, conf, _, _, _, _, category in detections:
+            if track_id in self.logged_tracks:
+                continue
+            # Intrusions are logged once the decision engine confirms them
+            if category == "intrusion" and decisions.get(track_id) is not Decision.INTRUSION_CONFIRMED:
+                continue
+            self.logged_tracks.add(track_id)
+
+            event_type = {"intrusion": "INTRUSION", "animal": "ANIMAL"}.get(category, "OBJECT")
+            event = self.event_logger.log(event_type, label, conf, track_id=track_id)
+
+            with self._lock:
+                self._event_seq += 1
+                self._events.append((self._event_seq, event))
+
+    def _faces(self, frame, frame_id, detections):
+        """
+        Face detection + recognition, only for tracks that want a face now
+        """
+        crops = self.decisions.face_crops(frame, detections, frame_id)
+        if not crops:
+            return
+        faces = detect_and_extract_faces(crops, save_to_disk=False)
+        if faces:
+            self.decisions.add_faces(self.recognize(faces))
+
+    def _run(self):
+        last_id = 0
+        last_done = time.perf_counter()
+
+        while self.running:
+            entry = self.stream.latest()
+
+            if entry is None or entry[0] == last_id:
+                if self.stream.ended:
+                    break
+                time.sleep(0.005)
+                continue
+
+            last_id, captured_at, frame = entry
+            frame = frame.copy()   # never draw into the shared ring buffer
+
+            detections = self.detector.detect(frame)
+            decisions = self.decisions.update(
+                detections, captured_at, (frame.shape[1], frame.shape[0]), self.detector.observed()
+            )
+            if self.recognize is not None:
+                # Before drawing; a face found here decides the track from the next frame on
+                self._faces(frame, last_id, detections)
+            annotate(frame, detections)
+            self._log(detections, decisions)
+
+            intrusion_tracks = [
+                track_id for track_id, decision in decisions.items()
+                if decision is Decision.INTRUSION_CONFIRMED
+            ]
+
+            # ================= ALARM + EVIDENCE =================
+            if intrusion_tracks:
+                with metrics.span("alarm_dispatch"):
+                    start_alarm()
+                if not self.evidence.recording:
+                    states = [self.decisions.tracks[t] for t in intrusion_tracks]
+                    self.evidence.start(frame, {
+                        "tracks": intrusion_tracks,
+                        "zones": sorted({s.zone for s in states if s.zone}),
+                        "severity": max(s.severity for s in states),
+                    }, ts=captured_at)
+            else:
+                stop_alarm()
+                self.evidence.stop(ts=captured_at)   # re-triggers within the merge gap extend the clip
+
+            # Recording → encoder queue, idle → pre-event buffer
+            self.evidence.write(frame, ts=captured_at)
+
+            now = time.perf_counter()
+            rate = 1.0 / max(now - last_done, 1e-6)
+            self.inference_fps = (
+                0.9 * self.inference_fps + 0.1 * rate if self.inference_fps else rate
+            )
+            last_done = now
+            metrics.set_gauge("inference_fps", self.inference_fps, source="dashboard")
+
+            with self._lock:
+                self._frame_seq += 1
+                self._latest = (self._frame_seq, preview(frame), intrusion_tracks)
@@ -1,17 +1,18 @@
 # motion probe
 
 
-import cv2
+from core.config import settings
+from modules.motion_detection.engines import MOTION_ENGINE, create_engine
+
+PROBE_THRESHOLD = settings.motion.threshold   # moving fraction of the frame area, as every motion gate
+PROBE_SCALE = 0.5
+
 
 class MotionProbe:
-    def __init__(self, threshold=4000):
-        self.bg = cv2.createBackgroundSubtractorMOG2(
-            history=200, varThreshold=50, detectShadows=False
-        )
+    def __init__(self, threshold=PROBE_THRESHOLD, engine=MOTION_ENGINE, scale=PROBE_SCALE):
+        self.engine = create_engine(engine, scale)
         self.threshold = threshold
 
     def detect(self, frame):
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        fg = self.bg.apply(gray)
-        motion_pixels = cv2.countNonZero(fg)
-        return motion_pixels > self.threshold
\ No newline at end of file
+        _, motion_fraction = self.engine.apply(frame)
+        return motion_fraction > self.threshold
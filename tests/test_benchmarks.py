@@ -0,0 +1,44 @@
+import numpy as np
+
+from benchmarks.harness import summarize
+from benchmarks.synthetic import ReplayStream, SyntheticScene, truth_crops
+
+
+def test_summarize_percentiles():
+    summary = summarize([0.001] * 98 + [0.010, 0.100])
+    assert summary["calls"] == 100
+    assert summary["p50_ms"] == 1.0
+    assert summary["p99_ms"] > summary["p95_ms"] >= 1.0
+    assert summary["max_ms"] == 100.0
+    assert summarize([]) == {"calls": 0}
+
+
+def test_synthetic_scene_drives_motion_monitor():
+    from modules.motion_detection.motion_detector import MotionMonitor
+
+    scene = SyntheticScene((180, 320), seed=1, quiet_frames=40, event_frames=160)
+    frames, truths = scene.generate(200)
+
+    assert not any(truths[:40]) and all(truths[40:])
+    faces = truth_crops(frames, truths, "face")
+    assert faces and all(face.image.size for face in faces)
+
+    stream = ReplayStream(frames)
+    monitor = MotionMonitor(stream, show=False)
+    rois = monitor.wait_for_event(save_rois=False)
+
+    assert rois and rois[0].frame_id > 40
+    assert len(stream.read_gaps) >= 40
+    assert np.all(np.asarray(stream.read_gaps) >= 0)
+
+
+def test_motion_engine_benchmark_reports_cost_and_agreement():
+    from benchmarks.motion_engines import run
+
+    frames, truths = SyntheticScene((180, 320), seed=2, quiet_frames=40, event_frames=40).generate(120)
+    results = run(frames, truths, scales=(0.5,))
+
+    assert set(results) == {"mog2@0.5", "knn@0.5", "diff@0.5"}
+    for summary in results.values():
+        assert summary["calls"] == 120 and summary["cpu_ms_per_frame"] >= 0
+        assert summary["recall"] > 0.5
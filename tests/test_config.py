@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from core.config import ConfigError, load_settings
+
+
+def _write(tmp_path, settings="", paths=""):
+    (tmp_path / "settings.yaml").write_text(settings)
+    (tmp_path / "paths.yaml").write_text(paths)
+    return str(tmp_path)
+
+
+def test_repo_config_loads_and_validates():
+    settings = load_settings()
+    assert settings.profile in ("low_power", "balanced", "high_accuracy")
+    assert settings.capture.sources
+
+
+def test_profile_then_explicit_overrides(tmp_path, monkeypatch):
+    monkeypatch.delenv("BORDERSECURITY_PROFILE", raising=False)
+    config_dir = _write(
+        tmp_path,
+        "profile: low_power\nmotion:\n  frame_skip: 3\n",
+        "evidence_dir: /data/evidence\n"
+    )
+    settings = load_settings(config_dir)
+
+    assert settings.runtime.headless is True            # from the profile
+    assert settings.motion.process_scale == 0.5
+    assert settings.motion.frame_skip == 3               # explicit value wins
+    assert settings.paths.evidence_dir == "/data/evidence"
+    assert settings.paths.log_dir == "logs"              # default
+
+    assert load_settings(config_dir, profile="high_accuracy").detection.input_size == 960
+    monkeypatch.setenv("BORDERSECURITY_PROFILE", "balanced")
+    assert load_settings(config_dir).runtime.headless is False
+
+
+@pytest.mark.parametrize("content, message", [
+    ("motion:\n  treshold: 10\n", "unknown setting"),
+    ("motion:\n  frame_skip: fast\n", "expected a number"),
+    ("motion:\n  process_scale: 2\n", "process_scale"),
+    ("detection:\n  input_size: 500\n", "multiple of 32"),
+    ("motion:\n  engine: flow\n", "motion.engine"),
+    ("motion:\n  threshold: 5000\n", "fraction of the frame area"),
+    ("profile: turbo\n", "unknown 'turbo'"),
+    ("evidence:\n  max_gb: 0\n", "evidence.max_gb"),
+])
+def test_invalid_settings_are_rejected(tmp_path, monkeypatch, content, message):
+    monkeypatch.delenv("BORDERSECURITY_PROFILE", raising=False)
+    with pytest.raises(ConfigError, match=message):
+        load_settings(_write(tmp_path, content))
+
+
+def test_roi_from_downscaled_motion_mask_maps_to_full_resolution():
+    from modules.motion_detection.motion_detector import find_big_roi
+
+    full = np.zeros((480, 640), dtype=np.uint8)
+    full[200:300, 300:400] = 255
+    half = full[::2, ::2].copy()
+
+    x1, y1, x2, y2 = find_big_roi(half, mask_scale=0.5)
+    fx1, fy1, fx2, fy2 = find_big_roi(full)
+    assert abs(x1 - fx1) <= 4 and abs(y1 - fy1) <= 4
+    assert abs(x2 - fx2) <= 4 and abs(y2 - fy2) <= 4
@@ -0,0 +1,126 @@
+from modules.decision.decision_engine import Decision, StreamingDecisionEngine
+from modules.utils.roi_manager import ROIManager
+
+
+def _person(track_id, x, y=40, label="person"):
+    return (track_id, label, 0.9, x, y, x + 20, y + 40, "intrusion")
+
+
+def test_single_frame_false_positive_is_never_confirmed():
+    engine = StreamingDecisionEngine(min_frames=3, min_dwell=0.2)
+
+    assert engine.update([_person(1, 10)], ts=0.0) == {1: Decision.MONITOR}
+    for i in range(1, 10):
+        engine.update([], ts=i * 0.1)
+
+    assert engine.confirmations == 0
+    assert engine.confirmed() == []
+
+
+def test_track_confirmed_after_temporal_evidence_in_zone(tmp_path):
+    zones = ROIManager(str(tmp_path / "zones.json"))
+    zones.frame_size = (200, 100)
+    zones.add_zone("fence", [(100, 0), (200, 0), (200, 100), (100, 100)], severity=2)
+    engine = StreamingDecisionEngine(zones, min_frames=3, min_dwell=0.25)
+
+    decisions = []
+    for i in range(12):
+        # Walks right; outside the fence zone for the first frames
+        batch = [_person(1, 60 + i * 8), (2, "dog", 0.8, 150, 10, 170, 30, "animal")]
+        decisions.append(engine.update(batch, ts=i * 0.1)[1])
+
+    state = engine.tracks[1]
+    first = decisions.index(Decision.INTRUSION_CONFIRMED)
+    assert decisions[0] is Decision.IGNORE
+    assert all(d is Decision.INTRUSION_CONFIRMED for d in decisions[first:])
+    assert state.zone == "fence" and state.severity == 2
+    assert state.frames_seen == 12 and state.dwell >= 0.25
+    assert state.heading == "right"
+    assert engine.tracks[2].decision is Decision.MONITOR
+    assert engine.confirmations == 1
+
+
+def test_known_face_clears_confirmation_and_stops_face_requests():
+    engine = StreamingDecisionEngine(min_frames=2, min_dwell=0.0, track_timeout=0.5)
+    for i in range(3):
+        engine.update([_person(7, 10 + i)], ts=i * 0.1)
+    assert engine.confirmed() == [7] and engine.wants_face(7)
+
+    engine.add_face(7, {"known": False, "identity": None, "similarity": 0.4})
+    engine.add_face(7, {"known": True, "identity": {"name": "guard"}, "similarity": 0.8})
+    engine.add_face(7, {"known": False, "identity": None, "similarity": 0.9})
+
+    assert engine.tracks[7].best_face["identity"] == {"name": "guard"}
+    assert engine.update([_person(7, 14)], ts=0.3) == {7: Decision.MONITOR}
+    assert not engine.wants_face(7)
+
+    engine.update([], ts=1.0)
+    assert 7 not in engine.tracks
+
+
+def test_face_crops_cover_only_tracks_wanting_a_face_and_feed_matches_back():
+    import numpy as np
+
+    engine = StreamingDecisionEngine(min_frames=2, min_dwell=0.0)
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+    dog = (9, "dog", 0.8, 120, 10, 140, 30, "animal")
+    for i in range(2):
+        engine.update([_person(7, 10), _person(8, 60), dog], ts=i * 0.1)
+    engine.add_face(8, {"known": True, "identity": {"name": "guard"}, "similarity": 0.9})
+
+    crops = engine.face_crops(frame, [_person(7, 10), _person(8, 60), dog], frame_id=42)
+    assert [(c.track_id, c.frame_id, c.bbox) for c in crops] == [(7, 42, (10, 40, 30, 80))]
+
+    # recognize_faces() results for a face found inside the crop
+    face = crops[0].sub_crop(2, 2, 12, 12, label="face")
+    engine.add_faces([{"face": face, "known": True, "identity": {"name": "scout"}, "similarity": 0.8}])
+    assert not engine.wants_face(7)
+    assert engine.update([_person(7, 10), _person(8, 60)], ts=0.2) == {7: Decision.MONITOR, 8: Decision.MONITOR}
+
+
+def test_face_stage_runs_on_detected_frames_at_most_once_per_interval():
+    import numpy as np
+
+    engine = StreamingDecisionEngine(min_frames=1, min_dwell=0.0, face_interval=1.0, face_attempts=2)
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+    unknown = {"known": False, "identity": None, "similarity": 0.3}
+
+    passes = []
+    for i in range(40):
+        # Detector every 3rd frame, tracker predictions in between
+        engine.update([_person(7, 10)], ts=i * 0.1, observed={7} if i % 3 == 0 else set())
+        crops = engine.face_crops(frame, [_person(7, 10)], frame_id=i)
+        if crops:
+            passes.append(i)
+            engine.add_faces([{"face": crops[0], **unknown}])
+
+    # Detected frames 1 s apart, then two unknown faces settle the track
+    assert passes == [0, 12]
+    assert engine.tracks[7].decision is Decision.INTRUSION_CONFIRMED
+
+
+def test_tracker_predictions_do_not_confirm_a_single_frame_false_positive():
+    from modules.object_detection.tracker import TrackedDetector
+
+    class _Detector:
+        def __init__(self, frames_with_person):
+            self.frames_with_person = frames_with_person
+            self.frame = 0
+
+        def detect(self, frame):
+            if self.frame in self.frames_with_person:
+                return [("person", 0.9, 40, 40, 80, 120, "intrusion")]
+            return []
+
+    for frames_with_person, confirmed in ((range(1), False), (range(30), True)):
+        inner = _Detector(frames_with_person)
+        tracked = TrackedDetector(inner, detect_every=3)
+        engine = StreamingDecisionEngine()
+
+        decisions = []
+        for i in range(30):
+            inner.frame = i
+            detections = tracked.detect(None)
+            decisions += engine.update(detections, ts=i * 0.1, observed=tracked.observed()).values()
+
+        assert (Decision.INTRUSION_CONFIRMED in decisions) is confirmed
@@ -0,0 +1,99 @@
+from core.model_registry import ModelRegistry
+
+
+def test_registry_loads_warms_once_and_unloads():
+    calls = {"load": 0, "warm": 0}
+
+    def loader(weights):
+        calls["load"] += 1
+        return {"weights": weights}
+
+    def warmup(model):
+        calls["warm"] += 1
+
+    registry = ModelRegistry()
+    registry.register("dummy", loader, warmup, default_weights="a.pt")
+
+    first = registry.get("dummy")
+    assert registry.get("dummy") is first
+    assert registry.get("dummy", "b.pt")["weights"] == "b.pt"
+    assert calls == {"load": 2, "warm": 2}
+
+    registry.unload("dummy", "a.pt")
+    assert registry.loaded() == [("dummy", "b.pt")]
+    assert registry.get("dummy") is not first
+
+
+def test_letterbox_boxes_map_back_to_crop():
+    import numpy as np
+    from modules.object_detection.batch_inference import letterbox, unletterbox_boxes
+
+    crop = np.zeros((200, 500, 3), dtype=np.uint8)
+    canvas, scale, pad = letterbox(crop, 640)
+    assert canvas.shape == (640, 640, 3)
+
+    box = np.array([[100, 50, 300, 150]], dtype=np.float32)
+    boxed = box * scale + [pad[0], pad[1], pad[0], pad[1]]
+
+    assert np.allclose(unletterbox_boxes(boxed, scale, pad, crop.shape), box, atol=1e-3)
+
+
+def test_tracker_keeps_ids_for_two_same_label_objects():
+    from modules.object_detection.tracker import Tracker
+
+    tracker = Tracker()
+    ids = set()
+    for step in range(10):
+        dx = step * 5
+        tracks = tracker.update([
+            ("person", 0.9, 10 + dx, 10, 60 + dx, 110, "intrusion"),
+            ("person", 0.9, 300 - dx, 10, 350 - dx, 110, "intrusion"),
+        ])
+        ids |= {t[0] for t in tracks}
+
+    assert ids == {1, 2}
+
+
+def test_tracked_detector_runs_detector_every_n_frames():
+    from modules.object_detection.tracker import TrackedDetector
+
+    class MovingPerson:
+        def __init__(self):
+            self.frame = 0
+
+        def detect(self, frame):
+            x = 10 + 4 * frame
+            return [("person", 0.9, x, 20, x + 40, 120, "intrusion")]
+
+    inner = MovingPerson()
+    tracked = TrackedDetector(inner, detect_every=3)
+
+    for frame in range(30):
+        inner.frame = frame
+        tracks = tracked.detect(frame)
+        assert [t[0] for t in tracks] == [1]
+
+    # predicted box keeps up with the object between detections
+    assert abs(tracks[0][3] - (10 + 4 * 29)) <= 8
+    assert tracked.detector_calls <= 12
+
+
+def test_facenet_warmup_uses_the_given_model():
+    import numpy as np
+    from core.model_registry import _warm_facenet
+
+    class _Keras:
+        def __init__(self):
+            self.batches = []
+
+        def predict_on_batch(self, batch):
+            self.batches.append(batch.shape)
+            return np.zeros((len(batch), 128))
+
+    class _Client:
+        input_shape = (152, 152)
+        model = _Keras()
+
+    client = _Client()
+    _warm_facenet(client)
+    assert client.model.batches == [(1, 152, 152, 3)]
@@ -0,0 +1,150 @@
+import gzip
+import json
+import os
+
+from modules.utils.event_logger import EventLogger
+
+
+def _read_jsonl(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_event_logger_ring_buffer_and_batched_writes(tmp_path):
+    logger = EventLogger(log_dir=str(tmp_path), max_events=3, flush_size=1000, flush_interval=60)
+
+    for i in range(5):
+        event = logger.log("INTRUSION", "person", 0.9, track_id=i)
+    assert event["track_id"] == 4
+
+    # Newest first, bounded
+    assert [e["track_id"] for e in logger.get_events()] == [4, 3, 2]
+
+    # Nothing reached the disk yet: below flush_size and before the interval
+    assert not os.path.exists(tmp_path / "events.jsonl")
+
+    logger.close()
+    events = _read_jsonl(str(tmp_path / "events.jsonl"))
+    assert [e["track_id"] for e in events] == [0, 1, 2, 3, 4]
+    assert logger.written == 5
+
+
+def test_event_logger_rotates_and_compresses(tmp_path):
+    logger = EventLogger(
+        log_dir=str(tmp_path), flush_size=1000, flush_interval=60,
+        fsync="none", max_bytes=200, compress=True
+    )
+
+    for batch in range(3):
+        for i in range(3):
+            logger.log("OBJECT", "car", track_id=batch * 3 + i)
+        logger.flush()
+    logger.close()
+
+    segments = sorted(p.name for p in tmp_path.iterdir() if p.name.endswith(".gz"))
+    assert segments, "size limit should have rotated at least one segment"
+
+    track_ids = []
+    for name in segments:
+        track_ids += [e["track_id"] for e in _read_jsonl(str(tmp_path / name))]
+    track_ids += [e["track_id"] for e in _read_jsonl(str(tmp_path / "events.jsonl"))]
+    assert sorted(track_ids) == list(range(9))
+
+
+def test_event_store_bulk_insert_and_query(tmp_path):
+    from modules.utils.event_store import EventStore
+
+    store = EventStore(str(tmp_path / "events.db"))
+    logger = EventLogger(log_dir=str(tmp_path), flush_size=1000, flush_interval=60, store=store)
+
+    logger.log("INTRUSION", "person", 0.9, track_id=1, camera_id="cam-a")
+    logger.log("ANIMAL", "dog", 0.7, track_id=2, camera_id="cam-a")
+    logger.log("INTRUSION", "person", 0.8, track_id=3, camera_id="cam-b")
+    logger.close()
+
+    assert store.count() == 3
+    persons = store.query(event_type="INTRUSION", label="person")
+    assert [e["track_id"] for e in persons] == [3, 1]     # newest first
+    assert [e["track_id"] for e in store.query(camera_id="cam-a", newest_first=False)] == [1, 2]
+    assert store.query(start=persons[0]["ts"] + 1) == []
+
+    store.close()
+
+
+def test_event_store_imports_legacy_files_once(tmp_path):
+    from modules.utils.event_store import EventStore
+
+    log_dir, evidence_dir = tmp_path / "logs", tmp_path / "evidence"
+    log_dir.mkdir()
+    (log_dir / "events.csv").write_text(
+        "time,type,label,confidence\n2025-12-23 11:37:35,INTRUSION,person,0.91\n"
+    )
+    (log_dir / "events.jsonl").write_text(
+        json.dumps({"time": "2025-12-23 12:40:04", "type": "ANIMAL", "label": "cow",
+                    "confidence": None, "snapshot": None, "track_id": None}) + "\n"
+    )
+    session = evidence_dir / "intrusion_20251223_124016"
+    session.mkdir(parents=True)
+    (session / "snapshot.jpg").write_bytes(b"")
+
+    store = EventStore(str(tmp_path / "events.db"))
+    counts = store.import_legacy(str(log_dir), str(evidence_dir))
+    assert counts == {"jsonl": 1, "csv": 1, "evidence": 1}
+
+    # Re-running is a no-op
+    assert store.import_legacy(str(log_dir), str(evidence_dir)) == {"jsonl": 0, "csv": 0, "evidence": 0}
+
+    evidence = store.query(event_type="INTRUSION", start="2025-12-23 12:00:00")
+    assert len(evidence) == 1 and evidence[0]["snapshot"].endswith("snapshot.jpg")
+    assert store.count(label="person") == 1
+    store.close()
+
+
+def test_dropped_logger_is_collected_and_keeps_its_events(tmp_path):
+    import gc
+    import time
+    import weakref
+    from modules.utils import event_logger as event_logger_module
+
+    logger = EventLogger(log_dir=str(tmp_path), flush_size=1000, flush_interval=0.05)
+    logger.log("INTRUSION", "person", 0.9)
+    ref = weakref.ref(logger)
+    assert logger in event_logger_module._open_loggers
+
+    del logger
+    for _ in range(40):
+        gc.collect()
+        if ref() is None:
+            break
+        time.sleep(0.05)
+
+    assert ref() is None
+    assert not list(event_logger_module._open_loggers)
+    with open(tmp_path / "events.jsonl") as f:
+        assert [json.loads(line)["label"] for line in f] == ["person"]
+
+
+def test_flush_racing_the_writer_keeps_batches_in_order(tmp_path):
+    import threading
+    import time
+
+    logger = EventLogger(log_dir=str(tmp_path), flush_size=1, flush_interval=60)
+    drained = threading.Event()
+    drain = logger._drain
+
+    def slow_writer_drain():
+        batch = drain()
+        if threading.current_thread() is logger._thread and batch:
+            drained.set()
+            time.sleep(0.2)   # writer holds batch [0] while flush() runs
+        return batch
+
+    logger._drain = slow_writer_drain
+    logger.log("INTRUSION", "person", track_id=0)
+    assert drained.wait(5)
+    logger.log("INTRUSION", "person", track_id=1)
+    logger.flush()
+    logger.close()
+
+    assert [e["track_id"] for e in _read_jsonl(str(tmp_path / "events.jsonl"))] == [0, 1]
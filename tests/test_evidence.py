@@ -0,0 +1,164 @@
+import csv
+import json
+import os
+import time
+
+import numpy as np
+
+from modules.utils.evidence_manager import EvidenceManager, estimate_fps
+from modules.utils.evidence_retention import EvidenceRetention
+
+
+def _frame(i):
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    frame[:, (i * 4) % 160] = 255
+    return frame
+
+
+def test_estimate_fps():
+    assert estimate_fps([0.0, 0.1, 0.2, 0.3]) == 10.0
+    assert estimate_fps([5.0]) == 20.0
+
+
+def test_evidence_clip_includes_pre_event_frames(tmp_path):
+    evidence = EvidenceManager(str(tmp_path), pre_event_seconds=1.0)
+    t0 = time.time() - 60
+
+    # Idle: 3 s of frames at 10 fps, only the last second is kept for the clip
+    for i in range(30):
+        evidence.write(_frame(i), ts=t0 + i * 0.1)
+
+    trigger = t0 + 3.0
+    evidence.start(_frame(30), {"tracks": [7]}, ts=trigger)
+    event_dir = evidence.event_dir
+    for i in range(30, 45):
+        evidence.write(_frame(i), ts=t0 + i * 0.1)
+    evidence.stop(ts=t0 + 4.5, immediate=True)
+    assert not evidence.recording
+
+    evidence.close()
+
+    with open(f"{event_dir}/metadata.json") as f:
+        metadata = json.load(f)
+    with open(f"{event_dir}/frames.csv") as f:
+        timestamps = [float(row["timestamp"]) for row in csv.DictReader(f)]
+
+    assert metadata["tracks"] == [7]
+    assert metadata["pre_event_frames"] == 10
+    assert metadata["frame_count"] == 25 == len(timestamps)
+    assert abs(metadata["fps"] - 10.0) < 0.5
+    assert metadata["dropped_frames"] == 0
+    assert timestamps[0] < trigger <= timestamps[10]
+    assert (tmp_path / event_dir.split("/")[-1] / "snapshot.jpg").exists()
+
+
+def test_evidence_retriggers_within_gap_share_one_session(tmp_path):
+    evidence = EvidenceManager(str(tmp_path), merge_gap=2.0)
+    t0 = time.time() - 60
+
+    evidence.start(_frame(0), {"tracks": [1]}, ts=t0)
+    first_dir = evidence.event_dir
+    for i in range(10):
+        evidence.write(_frame(i), ts=t0 + i * 0.1)
+    evidence.stop(ts=t0 + 1.0)
+
+    # Flicker: re-trigger 1 s later → same clip
+    evidence.write(_frame(10), ts=t0 + 1.5)
+    evidence.start(_frame(11), {"tracks": [2]}, ts=t0 + 2.0)
+    assert evidence.event_dir == first_dir
+    evidence.write(_frame(11), ts=t0 + 2.0)
+    evidence.stop(ts=t0 + 2.1)
+
+    # Gap expires → next trigger in the same second gets its own folder
+    evidence.write(_frame(12), ts=t0 + 4.2)
+    evidence.start(_frame(13), ts=t0 + 4.2)
+    assert evidence.event_dir != first_dir
+    evidence.close()
+
+    with open(f"{first_dir}/metadata.json") as f:
+        metadata = json.load(f)
+    assert metadata["tracks"] == [1, 2]
+    assert metadata["retriggers"] == 1
+    assert metadata["frame_count"] == 12
+    assert len([p for p in tmp_path.iterdir() if p.name.startswith("intrusion_")]) == 2
+
+
+def test_retention_quota_and_age(tmp_path):
+    now = 1_700_000_000.0
+    for name, size, severity, age_days in [
+        ("intrusion_a", 400, 1, 40),   # expired
+        ("intrusion_b", 400, 1, 3),    # low severity, oldest remaining
+        ("intrusion_c", 400, 3, 5),    # high severity survives
+        ("intrusion_d", 400, 1, 1),
+    ]:
+        session = tmp_path / name
+        session.mkdir()
+        (session / "evidence.avi").write_bytes(b"x" * size)
+        (session / "metadata.json").write_text(json.dumps({"severity": severity}))
+
+    retention = EvidenceRetention(str(tmp_path), max_bytes=900, max_age_days=30)
+    for name in list(retention.sessions):
+        age_days = {"intrusion_a": 40, "intrusion_b": 3, "intrusion_c": 5, "intrusion_d": 1}[name]
+        retention.sessions[name]["created"] = now - age_days * 86400
+
+    removed = retention.enforce(now=now)
+    assert sorted(removed) == ["intrusion_a", "intrusion_b"]
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_dir()) == ["intrusion_c", "intrusion_d"]
+
+    # The manifest is the source of truth on reload
+    reloaded = EvidenceRetention(str(tmp_path), max_bytes=900)
+    assert sorted(reloaded.sessions) == ["intrusion_c", "intrusion_d"]
+
+
+def test_writer_error_releases_video_and_marks_session(tmp_path, monkeypatch):
+    from modules.utils import evidence_manager
+
+    writers = []
+
+    class _BrokenWriter:
+        def __init__(self, *args):
+            self.released = False
+            self.frames = 0
+            writers.append(self)
+
+        def isOpened(self):
+            return True
+
+        def write(self, frame):
+            self.frames += 1
+            if self.frames > 12:
+                raise OSError("disk full")
+
+        def release(self):
+            self.released = True
+
+    monkeypatch.setattr(evidence_manager.cv2, "VideoWriter", _BrokenWriter)
+
+    evidence = EvidenceManager(str(tmp_path), pre_event_seconds=0)
+    t0 = time.time() - 60
+    evidence.start(_frame(0), {"tracks": [3]}, ts=t0)
+    event_dir = evidence.event_dir
+    for i in range(20):
+        evidence.write(_frame(i), ts=t0 + i * 0.1)
+    evidence.close()
+
+    assert writers and all(w.released for w in writers)
+    with open(f"{event_dir}/metadata.json") as f:
+        metadata = json.load(f)
+    assert metadata["error"] == "disk full"
+    assert "duration" in metadata
+
+
+def test_same_millisecond_sessions_get_their_own_folders(tmp_path):
+    evidence = EvidenceManager(str(tmp_path), merge_gap=0)
+    ts = time.time() - 60
+
+    dirs = []
+    for _ in range(3):
+        evidence.start(_frame(0), ts=ts)
+        dirs.append(evidence.event_dir)
+        evidence.stop(ts=ts)
+    evidence.close()
+
+    assert len(set(dirs)) == 3 and all(os.path.isdir(d) for d in dirs)
+    assert evidence._reserved == set()   # released once the writer created them
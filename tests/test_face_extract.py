@@ -0,0 +1,101 @@
+import numpy as np
+
+from modules.utils.frame_crop import FrameCrop
+
+
+def test_sub_crop_maps_back_to_frame_coordinates():
+    frame = np.arange(100 * 100 * 3, dtype=np.uint8).reshape(100, 100, 3)
+    person = FrameCrop(frame[20:80, 30:90], frame_id=7, bbox=(30, 20, 90, 80))
+
+    face = person.sub_crop(-5, 10, 20, 30, label="face", confidence=0.9)
+
+    assert face.frame_id == 7
+    assert face.bbox == (30, 30, 50, 50)
+    x1, y1, x2, y2 = face.bbox
+    assert np.array_equal(face.image, frame[y1:y2, x1:x2])
+
+
+class _FakeSSD:
+    """
+    Reports one face per image: the centre quarter of its letterboxed input
+    """
+
+    def __init__(self):
+        self.shapes = []
+
+    def setInput(self, blob):
+        self.blob = blob
+        self.shapes.append(blob.shape)
+
+    def forward(self):
+        n = self.blob.shape[0]
+        rows = np.zeros((1, 1, n, 7), dtype=np.float32)
+        for i in range(n):
+            rows[0, 0, i] = [i, 1, 0.9, 0.375, 0.375, 0.625, 0.625]
+        return rows
+
+
+def test_faces_searched_in_upper_person_boxes_in_batches(monkeypatch):
+    from modules.face_detection import face_detector
+
+    net = _FakeSSD()
+    monkeypatch.setattr(face_detector, "load_face_model", lambda: net)
+
+    frame = np.zeros((400, 600, 3), dtype=np.uint8)
+    persons = [
+        FrameCrop(frame[100:340, 40:120], 3, (40, 100, 120, 340), label="person"),
+        FrameCrop(frame[50:290, 300:380], 3, (300, 50, 380, 290), label="person"),
+        FrameCrop(frame[0:100, 400:600], 3, (400, 0, 600, 100)),   # plain ROI: whole image
+    ]
+
+    faces = face_detector.detect_and_extract_faces(persons, save_to_disk=False, batch_size=2)
+
+    assert [shape[0] for shape in net.shapes] == [2, 1]
+    assert all(shape[2:] == (300, 300) for shape in net.shapes)
+    # Person: 80x120 upper half → square side 120, centre quarter = 30 px
+    x1, y1, x2, y2 = faces[0].bbox
+    assert (x1, y1, x2, y2) == (40 + 25, 100 + 45, 40 + 55, 100 + 75)
+    assert faces[1].bbox[0] == 300 + 25 and faces[1].bbox[1] == 50 + 45
+    # Wide ROI letterboxed, not squashed: the face box stays square
+    x1, y1, x2, y2 = faces[2].bbox
+    assert (x2 - x1) == (y2 - y1) == 50
+    assert all(f.frame_id == 3 and f.label == "face" for f in faces)
+
+
+def test_face_search_region_is_inside_the_detected_person_box(monkeypatch):
+    import sys
+    import types
+
+    # Stand-in for the audio alarm package; Phase 2 only calls trigger_alarm
+    alarm = types.ModuleType("modules.alarm.alarm")
+    alarm.trigger_alarm = lambda img: None
+    monkeypatch.setitem(sys.modules, "modules.alarm", types.ModuleType("modules.alarm"))
+    monkeypatch.setitem(sys.modules, "modules.alarm.alarm", alarm)
+
+    from modules.face_detection import face_detector
+    from modules.object_detection import yolo_detector
+
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    roi = FrameCrop(frame[40:440, 100:500], 9, (100, 40, 500, 440))   # motion ROI
+
+    # YOLO: one person in the lower right part of the ROI, one dog
+    monkeypatch.setattr(yolo_detector, "get_yolo", lambda weights: None)
+    monkeypatch.setattr(yolo_detector, "detect_batched", lambda model, images, **kw: [
+        [("person", 0.9, (250, 150, 330, 390)), ("dog", 0.8, (10, 300, 90, 380))]
+    ])
+    result = yolo_detector.run_object_detection([roi], save_to_disk=False)
+
+    assert result["person_found"]
+    (person,) = result["persons"]
+    assert person.bbox == (350, 190, 430, 430) and person.frame_id == 9
+    assert person.confidence == 0.9
+
+    net = _FakeSSD()
+    monkeypatch.setattr(face_detector, "load_face_model", lambda: net)
+    region = face_detector.face_region(person)
+    assert region.shape[:2] == (120, 80)   # upper half of the person, not of the ROI
+
+    (face,) = face_detector.detect_and_extract_faces(result["persons"], save_to_disk=False)
+    x1, y1, x2, y2 = face.bbox
+    px1, py1, px2, py2 = person.bbox
+    assert px1 <= x1 < x2 <= px2 and py1 <= y1 < y2 <= py1 + 120
@@ -0,0 +1,126 @@
+import numpy as np
+
+from modules.face_recognition.face_index import FaceIndex
+
+
+def _unit(v):
+    v = np.asarray(v, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+def test_search_aggregates_max_per_identity_and_ranks():
+    index = FaceIndex.from_records([
+        {"info": {"name": "a"}, "embeddings": [_unit([1, 0, 0]), _unit([0, 1, 0])]},
+        {"info": {"name": "b"}, "embeddings": [_unit([0, 0, 1])]},
+        {"info": {"name": "c"}, "embeddings": [_unit([1, 1, 0]), _unit([1, 0, 1])]},
+    ])
+    assert index.matrix.shape == (5, 3)
+
+    queries = np.stack([_unit([0, 1, 0]), _unit([0, 0, 1])])
+    matches = index.search(queries, top_k=2)
+
+    assert [(info["name"], round(s, 3)) for info, s in matches[0]] == [("a", 1.0), ("c", 0.707)]
+    assert [(info["name"], round(s, 3)) for info, s in matches[1]] == [("b", 1.0), ("c", 0.707)]
+
+
+def test_empty_index_returns_no_candidates():
+    index = FaceIndex.from_records([])
+    assert index.search(_unit([1, 0]), top_k=3) == [[]]
+
+
+def test_embedding_cache_reuses_unchanged_files(tmp_path):
+    import os
+    from modules.face_recognition.embedding_cache import EmbeddingCache
+
+    img_a, img_b = tmp_path / "a.jpg", tmp_path / "b.jpg"
+    img_a.write_bytes(b"a")
+    img_b.write_bytes(b"b")
+    cache_dir = str(tmp_path / "cache")
+
+    cache = EmbeddingCache("Facenet", cache_dir).load()
+    assert cache.lookup(str(img_a)) == (False, None)
+    cache.store(str(img_a), _unit([1, 2, 3]))
+    cache.store(str(img_b), None)   # failed embedding is remembered
+    cache.save()
+
+    cache = EmbeddingCache("Facenet", cache_dir).load()
+    found, emb = cache.lookup(str(img_a))
+    assert found and np.allclose(emb, _unit([1, 2, 3]))
+    assert cache.lookup(str(img_b)) == (True, None)
+
+    img_a.write_bytes(b"changed")
+    os.utime(img_a, ns=(1, 1))
+    assert EmbeddingCache("Facenet", cache_dir).load().lookup(str(img_a)) == (False, None)
+    assert EmbeddingCache("Other", cache_dir).load().lookup(str(img_b)) == (False, None)
+
+
+class _FakeFacenet:
+    input_shape = (160, 160)
+
+    class model:
+        @staticmethod
+        def predict_on_batch(batch):
+            if np.any(np.isnan(batch)):
+                raise ValueError("bad input")
+            return batch.reshape(len(batch), -1)[:, :4] + 1.0
+
+
+def test_batch_embeddings_keep_order_and_skip_failures():
+    from modules.face_recognition.batch_embedder import get_face_embeddings
+
+    faces = [
+        np.full((50, 40, 3), 10, dtype=np.uint8),
+        np.zeros((0, 0, 3), dtype=np.uint8),
+        np.full((80, 80, 3), 200, dtype=np.uint8),
+    ]
+    embeddings = get_face_embeddings(faces, batch_size=2, model=_FakeFacenet)
+
+    assert embeddings[1] is None
+    assert embeddings[0] is not None and embeddings[2] is not None
+    assert np.isclose(np.linalg.norm(embeddings[0]), 1.0)
+
+
+def test_database_and_query_faces_share_one_embedding_path(monkeypatch):
+    from modules.face_detection import face_detector
+    from modules.face_recognition import batch_embedder, face_recognizer
+    from modules.utils.frame_crop import FrameCrop
+
+    class _SSD:
+        # One face per image, in the upper middle of its letterboxed input
+        def setInput(self, blob):
+            self.n = blob.shape[0]
+
+        def forward(self):
+            rows = np.zeros((1, 1, self.n, 7), dtype=np.float32)
+            for i in range(self.n):
+                rows[0, 0, i] = [i, 1, 0.95, 0.4, 0.2, 0.6, 0.45]
+            return rows
+
+    class _Facenet:
+        input_shape = (32, 32)
+
+        class model:
+            projection = np.random.default_rng(0).normal(size=(32 * 32 * 3, 16))
+
+            @classmethod
+            def predict_on_batch(cls, batch):
+                return batch.reshape(len(batch), -1) @ cls.projection
+
+    monkeypatch.setattr(face_detector, "load_face_model", lambda: _SSD())
+    monkeypatch.setattr(face_recognizer, "load_face_model", lambda: _SSD())
+    monkeypatch.setattr(batch_embedder, "get_facenet", lambda: _Facenet())
+
+    photo = np.random.default_rng(1).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+
+    # Database side
+    database = face_recognizer.get_face_embedding(photo, align=False)
+    # Query side: Phase 3 detection on the same image, then batched embedding
+    faces = face_detector.detect_and_extract_faces(
+        [FrameCrop(photo, 1, (0, 0, 320, 240))], save_to_disk=False
+    )
+    query = batch_embedder.get_face_embeddings([faces[0].image], align=False)[0]
+
+    assert float(database @ query) > 0.999
+    # An unaligned database embedding of the full photo would not match
+    full = batch_embedder.get_face_embeddings([photo], align=False)[0]
+    assert float(full @ query) < float(database @ query)
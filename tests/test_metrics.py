@@ -0,0 +1,55 @@
+import urllib.request
+
+from core.metrics import Metrics, quantile
+
+
+def test_spans_counters_and_gauges_render_as_prometheus_text():
+    metrics = Metrics()
+
+    with metrics.span("inference", model="yolo"):
+        pass
+    metrics.observe("inference", 0.2, model="yolo")
+    metrics.inc("capture_frames", 3, camera="0")
+    metrics.set_gauge("inference_fps", 12.5)
+
+    text = metrics.render()
+    assert 'bordersecurity_capture_frames_total{camera="0"} 3' in text
+    assert "bordersecurity_inference_fps 12.5" in text
+    assert 'bordersecurity_inference_seconds_count{model="yolo"} 2' in text
+    assert 'bordersecurity_inference_seconds_bucket{model="yolo",le="0.25"} 2' in text
+    assert "bordersecurity_process_resident_memory_bytes" in text
+
+    summary = metrics.summary()
+    assert "inference[yolo] n=2" in summary and "capture_frames[0]" in summary
+    # Interval based: nothing new since the last summary
+    assert "inference[yolo]" not in metrics.summary()
+
+
+def test_owned_gauges_follow_their_owner():
+    from modules.pipeline.queues import BoundedQueue
+
+    metrics = Metrics()
+    q = BoundedQueue(4, name="faces")
+    metrics.gauge_fn("queue_depth", len, owner=q, queue="faces")
+    q.put(1)
+    q.put(2)
+    assert 'bordersecurity_queue_depth{queue="faces"} 2.0' in metrics.render()
+
+    del q
+    assert "queue_depth{" not in metrics.render()
+
+
+def test_quantile_and_http_endpoint():
+    assert quantile([0, 0, 10, 0], 0.95) == 0.005
+    assert quantile([], 0.5) == 0.0
+
+    metrics = Metrics()
+    metrics.inc("alarms")
+    server = metrics.serve(port=0)   # loopback unless runtime.metrics_host says otherwise
+    assert server.server_address[0] == "127.0.0.1"
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        body = urllib.request.urlopen(url, timeout=5).read().decode()
+        assert "bordersecurity_alarms_total 1" in body
+    finally:
+        metrics.stop()
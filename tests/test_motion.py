@@ -0,0 +1,244 @@
+import numpy as np
+
+from modules.motion_detection.motion_detector import extract_big_roi
+
+
+def _moving_square_clip(n_frames=40, size=(240, 320), width=60):
+    frames = []
+    for i in range(n_frames):
+        frame = np.zeros((*size, 3), dtype=np.uint8)
+        x = 20 + i * 3
+        frame[80:160, x:x + width] = 255
+        frames.append(frame)
+    return frames
+
+
+def test_extract_big_roi_in_memory_keeps_frame_coordinates():
+    frames = _moving_square_clip()
+    rois = extract_big_roi(frames, save_to_disk=False)
+
+    assert rois
+    for roi in rois:
+        x1, y1, x2, y2 = roi.bbox
+        frame = frames[roi.frame_id - 1]
+        assert np.array_equal(roi.image, frame[y1:y2, x1:x2])
+
+
+def test_camera_stream_buffers_video_file(tmp_path):
+    import cv2
+    from modules.capture.camera_stream import CameraStream
+
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 100, (320, 240))
+    for frame in _moving_square_clip(n_frames=30):
+        writer.write(frame)
+    writer.release()
+
+    stream = CameraStream(path, buffer_seconds=1).start()
+    try:
+        ids = []
+        last_id = 0
+        while True:
+            entry = stream.read(after_id=last_id, timeout=2)
+            if entry is None:
+                break
+            last_id = entry[0]
+            ids.append(last_id)
+
+        assert ids == list(range(1, 31))
+        assert stream.latest()[0] == 30
+        window = stream.window(0)
+        assert [entry[0] for entry in window] == list(range(1, 31))
+    finally:
+        stream.stop()
+
+
+class _ListStream:
+    """
+    CameraStream stand-in serving pre-made frames at 10 fps timestamps
+    """
+
+    def __init__(self, frames):
+        self.entries = [(i + 1, i / 10, f) for i, f in enumerate(frames)]
+        self.fps = 10
+        self.width, self.height = frames[0].shape[1], frames[0].shape[0]
+        self.ended = False
+
+    def read(self, after_id=0, timeout=1.0):
+        if after_id < len(self.entries):
+            return self.entries[after_id]
+        self.ended = True
+        return None
+
+    def window(self, start, end=None):
+        return [e for e in self.entries if start <= e[1] <= end]
+
+    def stop(self):
+        self.ended = True
+
+
+def test_motion_monitor_extracts_rois_online_with_pre_roll():
+    from modules.motion_detection import motion_detector
+    from modules.motion_detection.motion_detector import MotionMonitor
+
+    background = [np.zeros((240, 320, 3), dtype=np.uint8) for _ in range(30)]
+    frames = background + _moving_square_clip(n_frames=70, width=80)
+
+    monitor = MotionMonitor(_ListStream(frames), camera_id="cam0", show=False)
+    monitor.keyframes = None   # every ROI of the event
+    rois = monitor.wait_for_event(save_rois=False)
+
+    trigger_id = 31
+    record_frames = motion_detector.RECORD_SECONDS * 10
+    assert rois
+    assert all(roi.camera_id == "cam0" for roi in rois)
+    assert rois[0].frame_id <= trigger_id
+    assert rois[-1].frame_id == trigger_id + record_frames
+
+
+def test_keyframe_selector_drops_near_duplicates():
+    from modules.motion_detection.keyframes import KeyframeSelector
+    from modules.utils.frame_crop import FrameCrop
+
+    rng = np.random.default_rng(0)
+    texture = rng.integers(0, 255, (80, 60, 3), dtype=np.uint8)
+    other = rng.integers(0, 255, (80, 60, 3), dtype=np.uint8)
+
+    still = [FrameCrop(texture, i, (100, 80, 160, 160)) for i in range(1, 31)]
+    moved = [FrameCrop(other, i, (200, 80, 260, 160)) for i in range(31, 41)]
+
+    kept = KeyframeSelector(max_rois=5, min_spacing=3).select(still + moved)
+
+    assert [c.frame_id for c in kept] == [1, 31]
+
+    capped = KeyframeSelector(max_rois=3, min_spacing=1, iou_threshold=2.0).select(still)
+    assert len(capped) == 3
+    assert capped[0].frame_id == 1 and capped[-1].frame_id == 30
+
+
+def test_keyframe_selector_keeps_sharpest_when_all_blurry():
+    from modules.motion_detection.keyframes import KeyframeSelector
+    from modules.utils.frame_crop import FrameCrop
+
+    flat = [FrameCrop(np.zeros((40, 40, 3), dtype=np.uint8), i, (0, 0, 40, 40)) for i in range(5)]
+    assert len(KeyframeSelector().select(flat)) == 1
+
+
+def test_motion_monitor_idles_on_static_scene_and_wakes_for_motion():
+    from modules.motion_detection import motion_detector
+    from modules.motion_detection.motion_detector import MotionMonitor
+
+    quiet = 200
+    background = [np.zeros((240, 320, 3), dtype=np.uint8) for _ in range(quiet)]
+    frames = background + _moving_square_clip(n_frames=100, width=80)
+
+    monitor = MotionMonitor(_ListStream(frames), camera_id="cam0", show=False, adaptive=True)
+    rois = monitor.wait_for_event(save_rois=False)
+
+    assert rois
+    assert monitor.wakeups == 1
+    frames_late, seconds_late = monitor.wake_latency
+    assert 0 < frames_late <= motion_detector.IDLE_FRAME_SKIP
+    assert abs(seconds_late - frames_late / 10) < 1e-6
+    # Full rate until idle, then only sparse probes / refreshes
+    assert monitor.frames_seen < len(frames) // 2
+    assert monitor.analysis_rate == 10 / motion_detector.FRAME_SKIP
+
+
+def test_motion_engines_report_resolution_independent_fractions():
+    import cv2
+    import pytest
+    from modules.motion_detection.engines import ENGINES, MotionEngine, create_engine
+
+    clip = [np.zeros((240, 320, 3), dtype=np.uint8) for _ in range(30)] + _moving_square_clip(n_frames=10)
+    large = [cv2.resize(f, (640, 480), interpolation=cv2.INTER_NEAREST) for f in clip]
+
+    for name in ENGINES:
+        fractions = []
+        for frames, scale in ((clip, 1.0), (large, 0.5)):
+            engine = create_engine(name, scale)
+            results = [engine.apply(f) for f in frames]
+            assert results[29][1] == 0   # static scene
+            fractions.append(results[-1][1])
+
+        # Moving 60x80 square on 320x240: same fraction at either resolution
+        assert all(0.01 < f < 0.2 for f in fractions), (name, fractions)
+        assert abs(fractions[0] - fractions[1]) < 0.02
+
+    assert create_engine("diff").apply(large[0])[0].shape[1] == 160
+    with pytest.raises(ValueError):
+        create_engine("optical_flow")
+    with pytest.raises(TypeError):
+        MotionEngine()   # abstract: every engine implements _subtract
+
+
+def test_zone_gating_ignores_motion_outside_the_zones():
+    from modules.motion_detection.engines import ENGINES, create_engine
+
+    # Zone: left half only; the square moves in the right half
+    zone_mask = np.zeros((240, 320), dtype=np.uint8)
+    zone_mask[:, :140] = 255
+    outside = [np.zeros((240, 320, 3), dtype=np.uint8) for _ in range(30)]
+    for i in range(10):
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        frame[80:160, 200 + i * 3:260 + i * 3] = 255
+        outside.append(frame)
+
+    for name in ENGINES:
+        gated = create_engine(name, 0.5)
+        gated.set_zone_mask(zone_mask)
+        fg_mask, fraction = [gated.apply(f) for f in outside][-1]
+        assert fraction == 0, name
+        assert fg_mask.shape[1] == create_engine(name, 0.5).apply(outside[0])[0].shape[1]
+
+        inside = create_engine(name, 0.5)
+        inside.set_zone_mask(zone_mask)
+        fg_mask, fraction = [inside.apply(f) for f in _moving_square_clip(n_frames=10)][-1]
+        assert fraction > 0, name
+        # Foreground lands in frame-grid coordinates, inside the zone
+        xs = np.nonzero(fg_mask)[1] / (fg_mask.shape[1] / 320)
+        assert xs.min() >= 20 and xs.max() < 140
+
+
+def test_camera_stream_stop_during_reconnect_does_not_read_released_capture(monkeypatch):
+    import threading
+    import time
+    from collections import deque
+    from modules.capture import camera_stream
+    from modules.capture.camera_stream import CameraStream
+
+    class _FailingCapture:
+        def __init__(self, *args):
+            self.released = False
+
+        def read(self):
+            assert not self.released, "read() on a released capture"
+            return False, None
+
+        def release(self):
+            self.released = True
+
+    monkeypatch.setattr(camera_stream, "RECONNECT_DELAY", 0.3)
+    monkeypatch.setattr(camera_stream.cv2, "VideoCapture", _FailingCapture)
+
+    stream = CameraStream("rtsp://camera")
+    stream.fps, stream.running = 20, True
+    stream.buffer = deque(maxlen=10)
+    stream.cap = _FailingCapture()
+    errors = []
+
+    def run():
+        try:
+            stream._run()
+        except Exception as e:   # surfaced below
+            errors.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    time.sleep(0.05)                     # reader is now sleeping in the reconnect path
+    stream._thread = None                # stop() without joining: the join timed out
+    stream.stop()
+    thread.join(timeout=2)
+
+    assert not errors and not thread.is_alive()
+    assert stream.cap is None and stream.ended
@@ -0,0 +1,93 @@
+import time
+
+from modules.pipeline.inference_scheduler import InferenceScheduler
+
+
+def test_batches_are_fair_across_cameras():
+    scheduler = InferenceScheduler(lambda items: items, batch_size=4, max_wait=0)
+    scheduler.running = True
+
+    for i in range(6):
+        scheduler.submit("busy", f"b{i}")
+    scheduler.submit("quiet", "q0")
+
+    batch = scheduler.next_batch(timeout=0)
+    items = [entry[2] for entry in batch]
+
+    assert len(items) == 4
+    assert "q0" in items
+    assert items.count("b0") == 1
+
+
+def test_stale_items_are_dropped():
+    scheduler = InferenceScheduler(lambda items: items, batch_size=4, max_wait=0)
+    scheduler.running = True
+    scheduler.add_camera("cam", latency_budget=0.01)
+
+    scheduler.submit("cam", "old")
+    time.sleep(0.05)
+
+    assert scheduler.next_batch(timeout=0) == []
+    assert scheduler.stats()["cam"]["dropped_stale"] == 1
+
+
+def test_worker_invokes_callbacks_with_results():
+    results = []
+    scheduler = InferenceScheduler(
+        lambda items: [item * 2 for item in items], batch_size=2, max_wait=0
+    ).start()
+    try:
+        for i in range(3):
+            scheduler.submit("cam", i, lambda result, latency: results.append(result))
+
+        deadline = time.time() + 2
+        while len(results) < 3 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        scheduler.stop()
+
+    assert sorted(results) == [0, 2, 4]
+
+
+def test_queue_overload_policies():
+    import pytest
+    from modules.pipeline.queues import BoundedQueue
+
+    oldest = BoundedQueue(2, "drop_oldest")
+    for i in range(3):
+        assert oldest.put(i)
+    assert [oldest.get(0), oldest.get(0)] == [1, 2]
+
+    newest = BoundedQueue(2, "drop_newest")
+    assert [newest.put(i) for i in range(3)] == [True, True, False]
+    assert newest.get(0) == 0
+
+    blocking = BoundedQueue(1, "block")
+    assert blocking.put("a")
+    assert not blocking.put("b", timeout=0.01)
+    assert blocking.stats()["dropped"] == 1
+
+    with pytest.raises(ValueError):
+        BoundedQueue(1, "random")
+
+
+def test_stages_forward_and_filter():
+    from modules.pipeline.queues import BoundedQueue
+    from modules.pipeline.stages import Stage
+
+    numbers, final = BoundedQueue(10), BoundedQueue(10)
+    source = Stage("source", lambda: iter(range(6)), outbox=numbers).start()
+    evens = Stage("evens", lambda x: x if x % 2 == 0 else None, numbers, final).start()
+
+    got = []
+    deadline = time.time() + 2
+    while len(got) < 3 and time.time() < deadline:
+        try:
+            got.append(final.get(timeout=0.1))
+        except Exception:
+            pass
+
+    source.stop()
+    evens.stop()
+    assert got == [0, 2, 4]
+    assert evens.stats()["processed"] == 6
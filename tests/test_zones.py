@@ -0,0 +1,88 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from modules.utils.roi_manager import ROIManager
+
+
+def _manager(tmp_path):
+    zones = ROIManager(str(tmp_path / "zones.json"))
+    zones.frame_size = (200, 100)
+    # Diagonal fence strip and a small high-severity gate inside its corner
+    zones.add_zone("fence", [(0, 60), (200, 20), (200, 50), (0, 90)], severity=1)
+    zones.add_zone("gate", [(0, 60), (40, 52), (40, 82), (0, 90)], severity=3)
+    return zones
+
+
+def test_overlap_matches_pixel_counts_for_many_boxes(tmp_path):
+    zones = _manager(tmp_path)
+    rng = np.random.default_rng(0)
+    xy = rng.integers(0, 180, (50, 2))
+    boxes = np.hstack([xy, xy + rng.integers(5, 60, (50, 2))])
+    boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, 100)
+    boxes = boxes[(boxes[:, 3] > boxes[:, 1])]
+
+    fractions = zones.overlap(boxes)
+
+    assert fractions.shape == (len(boxes), 2)
+    for (x1, y1, x2, y2), row in zip(boxes, fractions):
+        area = (x2 - x1) * (y2 - y1)
+        x2c = min(x2, 200)
+        expected = zones.masks[:, y1:y2, x1:x2c].sum(axis=(1, 2)) / area
+        assert np.allclose(row, expected)
+
+
+def test_classify_prefers_severity_and_persists(tmp_path):
+    zones = _manager(tmp_path)
+    boxes = [(5, 60, 30, 85), (120, 25, 150, 45), (100, 0, 140, 10)]
+
+    best, fractions = zones.classify(boxes)
+    assert [zones.zones[i].name if i >= 0 else None for i in best] == ["gate", "fence", None]
+    # Same boxes at twice the resolution
+    assert np.allclose(zones.overlap(np.asarray(boxes) * 2, frame_size=(400, 200)), fractions)
+    assert zones.inside(120, 25, 150, 45) and not zones.inside(100, 0, 140, 10)
+
+    reloaded = ROIManager(zones.path)
+    assert reloaded.frame_size == (200, 100)
+    assert [(z.name, z.severity) for z in reloaded.zones] == [("fence", 1), ("gate", 3)]
+    assert np.array_equal(reloaded.masks, zones.masks)
+
+    with pytest.raises(ValueError):
+        zones.add_zone("line", [(0, 0), (10, 10)])
+
+
+def test_legacy_rectangle_loads_as_default_zone(tmp_path, monkeypatch):
+    from modules.utils import roi_manager
+
+    (tmp_path / "roi.json").write_text(json.dumps({"x1": 10, "y1": 10, "x2": 50, "y2": 40}))
+    monkeypatch.setattr(roi_manager, "ROI_FILE", str(tmp_path / "roi.json"))
+    monkeypatch.setattr(roi_manager, "ZONES_FILE", str(tmp_path / "zones.json"))
+
+    zones = roi_manager.ROIManager(str(tmp_path / "zones.json"))
+    assert [z.name for z in zones.zones] == ["default"]
+    assert zones.inside(20, 20, 30, 30) and not zones.inside(60, 50, 70, 60)
+    assert cv2.countNonZero(zones.mask()) > 0
+
+
+def test_legacy_rectangle_is_not_rescaled_to_the_default_frame_size(tmp_path, monkeypatch):
+    from modules.utils import roi_manager
+
+    # Drawn on a 1080p camera: beyond the 1280x720 default reference
+    (tmp_path / "roi.json").write_text(json.dumps({"x1": 1400, "y1": 800, "x2": 1800, "y2": 1000}))
+    monkeypatch.setattr(roi_manager, "ROI_FILE", str(tmp_path / "roi.json"))
+    monkeypatch.setattr(roi_manager, "ZONES_FILE", str(tmp_path / "zones.json"))
+
+    zones = roi_manager.ROIManager(str(tmp_path / "zones.json"))
+    assert zones.native
+    assert zones.inside(1500, 850, 1600, 950)   # not clipped before a frame size is known
+
+    fractions = zones.overlap([(1500, 850, 1600, 950), (1300, 700, 1400, 800), (100, 100, 200, 200)],
+                              frame_size=(1920, 1080))
+    assert fractions[:, 0].tolist() == [1.0, 0.0, 0.0]
+    assert zones.frame_size == (1920, 1080)
+
+    mask = zones.mask(1920, 1080)
+    assert mask[900, 1600] == 255 and mask[700, 1300] == 0
+    assert cv2.countNonZero(mask) == 401 * 201   # fillPoly includes both edges, no resampling